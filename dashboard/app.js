@@ -13,8 +13,13 @@ const uiState = {
   cryptoSort: { key: "market_cap", dir: "desc" },
   cryptoCgLastFetchTs: 0,
   staticLastFetchTs: 0,
+  bundle: { version: 0, parts: null },
 };
 
+// 파이프라인이 발행하는 버전 번들 (scripts/snapshot_bundle.py). 매니페스트만 폴링하고 바뀐 부분만 받습니다.
+const BUNDLE_BASE = "./data/bundle";
+const STATIC_REFRESH_MS = 60_000;
+
 const STABLES = new Set(["USDT", "USDC", "DAI", "FDUSD", "TUSD", "USDE", "USDD", "FRAX"]);
 const MODE_A = {
   apiBase: window.PROJECT_MARK_API_BASE || "https://project-mark-gateway.workers.dev",
@@ -561,15 +566,17 @@ function applyHybridPricesToUniverse(priceMap) {
 }
 
 async function fetchCoinGeckoMarketMap() {
-  const endpoints = [1, 2, 3, 4].map(
-    (page) =>
-      `https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&page=${page}&sparkline=false&price_change_percentage=24h`,
-  );
-
-  const settled = await Promise.allSettled(endpoints.map((url) => fetchJson(url)));
-  const rows = settled
-    .filter((x) => x.status === "fulfilled" && Array.isArray(x.value))
-    .flatMap((x) => x.value);
+  // 시총/거래량은 scripts/update_crypto_data.py가 게시한 유니버스 스냅샷 사용 (브라우저에서 coins/markets 페이징 안 함).
+  const payload = await fetchSnapshotJson("./data/crypto_custom_universe.json");
+  const rows = (Array.isArray(payload?.assets) ? payload.assets : []).map((a) => ({
+    id: a?.coingecko_id,
+    symbol: a?.ticker,
+    name: a?.name,
+    current_price: a?.price,
+    price_change_percentage_24h: a?.change_24h,
+    market_cap: a?.market_cap,
+    total_volume: a?.volume_24h,
+  }));
 
   const bySymbol = new Map();
   const byName = new Map();
@@ -640,10 +647,33 @@ async function refreshCryptoFundamentalsIfNeeded() {
   }
 }
 
+const EXCHANGE_SNAPSHOT_MAX_AGE_MS = 5 * 60 * 1000;
+
+async function fetchExchangeTickerSnapshot(tickers) {
+  // scripts/update_exchange_tickers.py가 거래소 전체 티커 덤프에서 유니버스 심볼만 골라 게시한 스냅샷.
+  try {
+    const payload = await fetchSnapshotJson("./data/exchange_tickers.json", true);
+    const ts = Date.parse(payload?.updated_at || "");
+    if (!Number.isFinite(ts) || Date.now() - ts > EXCHANGE_SNAPSHOT_MAX_AGE_MS) return null;
+    const prices = payload?.prices || {};
+    const out = {};
+    tickers.forEach((t) => {
+      if (prices[t]) out[t] = prices[t];
+    });
+    return out;
+  } catch (_) {
+    return null;
+  }
+}
+
 async function fetchHybridPriceMapDirect(tickers) {
   const uniq = [...new Set((tickers || []).map((t) => String(t || "").trim().toUpperCase()).filter(Boolean))];
   if (uniq.length === 0) return {};
 
+  // 최신 스냅샷이 있으면 수 MB짜리 거래소 덤프를 브라우저에서 받지 않음.
+  const snapshot = await fetchExchangeTickerSnapshot(uniq);
+  if (snapshot) return snapshot;
+
   const priceMap = {};
   const byTicker = {};
   uniq.forEach((t) => {
@@ -948,6 +978,70 @@ async function fetchJson(url) {
   return response.json();
 }
 
+async function fetchSnapshotJson(url, compact = false) {
+  // compact: 파이프라인이 항상 `.min.json`을 함께 쓰는 파일(번들, 거래소 티커)만 압축본을 먼저 요청합니다.
+  // 커밋된 스냅샷은 변형 파일이 없거나 수동 편집으로 어긋날 수 있어 원본을 바로 받습니다.
+  if (!compact) return fetchJson(url);
+  try {
+    return await fetchJson(url.replace(/\.json$/, ".min.json"));
+  } catch (_) {
+    return fetchJson(url);
+  }
+}
+
+function decodePointer(path) {
+  return path
+    .split("/")
+    .slice(1)
+    .map((token) => token.replace(/~1/g, "/").replace(/~0/g, "~"));
+}
+
+function applyJsonPatch(doc, ops) {
+  // snapshot_bundle.diff 가 만드는 add/remove/replace 만 처리합니다.
+  let root = doc;
+  for (const op of ops || []) {
+    const keys = decodePointer(op.path);
+    if (!keys.length) {
+      root = op.value;
+      continue;
+    }
+    const last = keys.pop();
+    const parent = keys.reduce((node, key) => (node == null ? node : node[key]), root);
+    if (parent == null || typeof parent !== "object") throw new Error(`patch path not found: ${op.path}`);
+    if (op.op === "remove") {
+      if (Array.isArray(parent)) parent.splice(Number(last), 1);
+      else delete parent[last];
+    } else {
+      parent[last] = op.value;
+    }
+  }
+  return root;
+}
+
+async function loadBundleParts() {
+  const manifest = await fetchJson(`${BUNDLE_BASE}/manifest.json`);
+  const held = uiState.bundle;
+  if (held.parts && held.version === manifest.version) return held.parts;
+
+  // 보유 버전부터 최신 버전까지 델타가 끊김 없이 이어지고 전체 번들보다 작을 때만 델타를 적용합니다.
+  const chain = held.parts ? (manifest.deltas || []).filter((d) => d.to > held.version) : [];
+  const contiguous =
+    chain.length > 0 &&
+    chain.every((d, i) => d.from === (i === 0 ? held.version : chain[i - 1].to)) &&
+    chain[chain.length - 1].to === manifest.version;
+  const chainBytes = chain.reduce((sum, d) => sum + (d.bytes || 0), 0);
+
+  if (contiguous && chainBytes < (manifest.bundle?.bytes || Infinity)) {
+    const deltas = await Promise.all(chain.map((d) => fetchJson(`${BUNDLE_BASE}/${d.path}`)));
+    const parts = deltas.reduce((doc, d) => applyJsonPatch(doc, d.ops), structuredClone(held.parts));
+    uiState.bundle = { version: manifest.version, parts };
+  } else {
+    const bundle = await fetchSnapshotJson(`${BUNDLE_BASE}/${manifest.bundle.path}`, true);
+    uiState.bundle = { version: bundle.version, parts: bundle.parts };
+  }
+  return uiState.bundle.parts;
+}
+
 function detectPageType() {
   if (document.getElementById("pulseRows")) return "home";
   if (document.getElementById("cryptoCustomRows")) return "crypto";
@@ -983,14 +1077,24 @@ function normalizeGatewayPayload(payload) {
 }
 
 async function loadStatic() {
-  const [snapshot, news, etf, macro, universe, stocks] = await Promise.allSettled([
-    fetchJson("./data/snapshot.json"),
-    fetchJson("./data/news.json"),
-    fetchJson("./data/etf.json"),
-    fetchJson("./data/macro_snapshot.json"),
-    fetchJson("./data/crypto_custom_universe.json"),
-    fetchJson("./data/stocks_watchlist.json"),
-  ]);
+  const sources = [
+    ["snapshot", "./data/snapshot.json"],
+    ["news", "./data/news.json"],
+    ["etf", "./data/etf.json"],
+    ["macro", "./data/macro_snapshot.json"],
+    ["universe", "./data/crypto_custom_universe.json"],
+    ["stocks", "./data/stocks_watchlist.json"],
+  ];
+  let parts = null;
+  try {
+    parts = await loadBundleParts();
+  } catch (error) {
+    console.warn("bundle load failed, fetching snapshots one by one", error);
+  }
+  const results = parts
+    ? sources.map(([name]) => (parts[name] != null ? { status: "fulfilled", value: parts[name] } : { status: "rejected" }))
+    : await Promise.allSettled(sources.map(([, url]) => fetchSnapshotJson(url)));
+  const [snapshot, news, etf, macro, universe, stocks] = results;
 
   state.snapshot = snapshot.status === "fulfilled" ? snapshot.value : null;
   state.news = news.status === "fulfilled" ? news.value : { macro: [], crypto: [] };
@@ -1158,7 +1262,7 @@ async function fetchLive() {
   }
 
   try {
-    if (!uiState.staticLastFetchTs || Date.now() - uiState.staticLastFetchTs > 5 * 60 * 1000) {
+    if (!uiState.staticLastFetchTs || Date.now() - uiState.staticLastFetchTs > STATIC_REFRESH_MS) {
       await loadStatic();
     }
   } catch (error) {
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Regenerate past daily briefs from stored history, rendered in parallel.
+
+Inputs for every day in the range are assembled in one pass from history loaded once up front:
+  - rates and liquidity (SOFR/IORB/REPO/RRP/TGA, US10Y/US2Y) from the FRED series store,
+  - indices, commodities and watchlist equities from the columnar history store,
+  - any label whose local history does not reach back to --start (VIX and crypto always), plus the
+    correlation closes, from one Yahoo chart request per symbol covering the whole range,
+  - Fear & Greed from one alternative.me history request,
+  - headlines from the rolling news.json feed, where they fall on the day.
+With --offline nothing is fetched and missing inputs render as n/a.
+
+Each brief is rendered as of 09:27 KST (the launchd schedule) from observations dated before that
+day, by daily_macro_brief.render_markdown in a process pool. A checkpoint in the output directory
+records the renderer fingerprint and a digest of each day's inputs, so an interrupted run resumes
+where it stopped and a rerun only re-renders days whose template or inputs changed.
+
+Usage:
+  python scripts/backfill_briefs.py --start 2025-10-01 --end 2026-09-30
+  python scripts/backfill_briefs.py --start 2025-10-01 --output-dir reports --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cassette
+import daily_macro_brief as brief
+import fred_store
+import news_store
+from daily_macro_brief import Quote
+from fetch_stage import run_sources
+from history_store import HistoryStore
+from risk_engine import WINDOWS, RiskEngine, align_closes, log_returns
+from snapshot_io import read_json, write_atomic
+from update_macro_stocks_data import FRED_SERIES
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT_DIR = ROOT / "runtime" / "backfill" / "reports"
+CHECKPOINT_FILE = ".backfill_checkpoint.json"
+BRIEF_TIME = (9, 27)  # KST, as scheduled by install_daily_brief_launchd.sh
+RISK_LOOKBACK_DAYS = 200
+CHECKPOINT_EVERY_SEC = 1.0
+
+# Brief label -> history store metric.
+HISTORY_METRICS = {
+    "S&P500": "sp500",
+    "NASDAQ": "nasdaq",
+    "DXY": "dxy",
+    "GOLD": "gold",
+    "WTI": "wti",
+    "COPPER": "copper",
+    **{t: t for t in brief.EQUITY_SYMBOLS},
+}
+FRED_LABELS = {"US10Y": "us10y", "US2Y": "us2y"}
+CRYPTO_SYMBOLS = {t: f"{t}-USD" for t in brief.CRYPTO_TICKERS}
+LIQUIDITY_DIGITS = {"sofr": 2, "iorb": 2, "repo": 3, "rrp": 2, "tga": 0}
+YAHOO_RANGES = (("1y", 365), ("2y", 730), ("5y", 1826), ("10y", 3652))
+
+Series = Tuple[List[str], List[float]]  # ascending ISO dates, values
+
+
+@dataclass
+class DayInputs:
+    day: str
+    quotes: Dict[str, Quote]
+    macro_news: List[Dict[str, str]]
+    crypto_news: List[Dict[str, str]]
+    fear_greed: Optional[float]
+    liquidity: Dict[str, Any]
+    returns: List[List[float]]
+
+    def digest(self) -> str:
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+# --- bulk load -----------------------------------------------------------------------------------
+
+
+def _series(points: Dict[str, float]) -> Series:
+    dates = sorted(d for d, v in points.items() if isinstance(v, float) and math.isfinite(v))
+    return dates, [points[d] for d in dates]
+
+
+def yahoo_range(since: date) -> str:
+    span = (date.today() - since).days
+    return next((name for name, days in YAHOO_RANGES if days >= span), "max")
+
+
+def fetch_fear_greed_history(days: int) -> Dict[str, float]:
+    data = brief.fetch_json(f"https://api.alternative.me/fng/?limit={days}&format=json")
+    out: Dict[str, float] = {}
+    for row in (data or {}).get("data") or []:
+        try:
+            day = datetime.fromtimestamp(int(row["timestamp"]), timezone.utc).strftime("%Y-%m-%d")
+            out[day] = float(row["value"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return out
+
+
+def load_history(start: date, offline: bool) -> Tuple[Dict[str, Series], Dict[str, Series], Series, Dict[str, Series]]:
+    """(quote series by label, FRED series by key, fear-greed series, correlation closes by label)."""
+    since = start - timedelta(days=RISK_LOOKBACK_DAYS)
+    tz = brief.ensure_tz("Asia/Seoul")
+
+    if not offline:
+        run_sources(
+            {f"fred:{key}": (lambda sid=sid: fred_store.open_series(sid).update(), brief.TIMEOUT_SEC, 0) for key, sid in FRED_SERIES.items()},
+            deadline_sec=brief.RUN_DEADLINE_SEC,
+        )
+    fred = {key: (list(s.dates), list(s.values)) for key, s in ((k, fred_store.open_series(sid)) for k, sid in FRED_SERIES.items())}
+
+    store = HistoryStore()
+    start_dt = datetime(since.year, since.month, since.day, tzinfo=tz)
+    quotes: Dict[str, Series] = {label: fred[key] for label, key in FRED_LABELS.items()}
+    for label, metric in HISTORY_METRICS.items():
+        quotes[label] = _series(store.daily_last(metric, start_dt, tz=tz))
+
+    # A label is fetched when its local history starts after --start.
+    wanted = {label: sym for label, sym in {**brief.INDEX_SYMBOLS, **brief.COMMODITY_SYMBOLS, **brief.EQUITY_SYMBOLS}.items()
+              if not quotes.get(label, ([], []))[0] or quotes[label][0][0] > start.isoformat()}
+    wanted.update(CRYPTO_SYMBOLS)
+    corr_symbols = {f"corr:{label}": sym for label, sym in brief.CORRELATION_SYMBOLS.items()}
+    fear_greed: Series = ([], [])
+    corr: Dict[str, Series] = {}
+    if not offline:
+        range_ = yahoo_range(since)
+        symbols = {**{f"quote:{label}": sym for label, sym in wanted.items()}, **corr_symbols}
+        unique = sorted(set(symbols.values()))
+        sources: Dict[str, Any] = {sym: (lambda s=sym: brief.fetch_yahoo_closes(s, range_), brief.RUN_DEADLINE_SEC, {}) for sym in unique}
+        sources["fear-greed"] = (lambda: fetch_fear_greed_history((date.today() - since).days + 1), brief.TIMEOUT_SEC, {})
+        results = run_sources(sources, deadline_sec=brief.RUN_DEADLINE_SEC, max_workers=brief.QUOTE_CONCURRENCY)
+        failed = sorted(name for name, r in results.items() if not r.ok or not r.value)
+        if failed:
+            print(f"warn: backfill history unavailable for {', '.join(failed)}")
+        for key, sym in symbols.items():
+            closes = _series(results[sym].value)
+            if key.startswith("quote:"):
+                if closes[0]:
+                    quotes[key[6:]] = closes
+            else:
+                corr[key[5:]] = closes
+        fear_greed = _series(results["fear-greed"].value)
+    print(
+        f"backfill: history for {sum(1 for s in quotes.values() if s[0])} quote labels, "
+        f"{sum(1 for s in fred.values() if s[0])}/{len(fred)} FRED series, fear-greed {len(fear_greed[0])} days"
+    )
+    return quotes, fred, fear_greed, corr
+
+
+# --- per-day inputs ------------------------------------------------------------------------------
+
+
+def _before(series: Series, day: str) -> int:
+    """Index of the last observation dated before `day`, or -1."""
+    return bisect.bisect_left(series[0], day) - 1
+
+
+def quote_on(label: str, series: Series, day: str) -> Quote:
+    i = _before(series, day)
+    if i < 0:
+        return Quote(symbol=label, price=None, change_pct=None, source="history")
+    price = series[1][i]
+    prev = series[1][i - 1] if i >= 1 else None
+    change = (price - prev) / prev * 100.0 if prev else None
+    return Quote(symbol=label, price=price, change_pct=change, source="history")
+
+
+def liquidity_on(fred: Dict[str, Series], day: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key, digits in LIQUIDITY_DIGITS.items():
+        dates, values = fred.get(key, ([], []))
+        i = _before((dates, values), day)
+        if i < 0:
+            continue
+        week_ago = (date.fromisoformat(dates[i]) - timedelta(days=7)).isoformat()
+        j = bisect.bisect_right(dates, week_ago) - 1
+        out[key] = {
+            "value": values[i],
+            "delta": values[i] - values[i - 1] if i >= 1 else 0.0,
+            "delta_1w": values[i] - values[j] if j >= 0 else None,
+            "display": brief.fmt_price(values[i], digits),
+        }
+        out["as_of"] = max(out.get("as_of") or "", dates[i])
+    return out
+
+
+def news_by_window(items: Sequence[Dict[str, str]], start_ts: float, end_ts: float, limit: int = 3) -> List[Dict[str, str]]:
+    hits = [(news_store.pub_ts(n), n) for n in items if isinstance(n, dict) and n.get("title") and n.get("link")]
+    hits = sorted((h for h in hits if start_ts <= h[0] < end_ts), key=lambda h: h[0], reverse=True)
+    return [n for _, n in hits[:limit]]
+
+
+def build_inputs(days: List[date], quotes: Dict[str, Series], fred: Dict[str, Series], fear_greed: Series, corr: Dict[str, Series]) -> List[DayInputs]:
+    tz = brief.ensure_tz("Asia/Seoul")
+    feed = read_json(brief.DATA_DIR / "news.json", {})
+    corr_dates: List[str] = []
+    corr_returns: List[List[float]] = []
+    if corr and all(s[0] for s in corr.values()):
+        corr_dates, rows = align_closes({label: dict(zip(*corr[label])) for label in brief.CORRELATION_SYMBOLS})
+        corr_returns = log_returns(rows)
+        corr_dates = corr_dates[1:]  # returns[k] ends on dates[k + 1]
+    labels = (*brief.INDEX_LABELS, *brief.COMMODITY_SYMBOLS, *brief.EQUITY_SYMBOLS, *brief.CRYPTO_TICKERS)
+
+    out: List[DayInputs] = []
+    for d in days:
+        day = d.isoformat()
+        cutoff = datetime(d.year, d.month, d.day, *BRIEF_TIME, tzinfo=tz).timestamp()
+        k = bisect.bisect_left(corr_dates, day)
+        i = _before(fear_greed, day)
+        out.append(DayInputs(
+            day=day,
+            quotes={label: quote_on(label, quotes.get(label, ([], [])), day) for label in labels},
+            macro_news=news_by_window(feed.get("macro") or [], cutoff - 86400.0, cutoff),
+            crypto_news=news_by_window(feed.get("crypto") or [], cutoff - 86400.0, cutoff),
+            fear_greed=fear_greed[1][i] if i >= 0 else None,
+            liquidity=liquidity_on(fred, day),
+            returns=corr_returns[max(0, k - max(WINDOWS)):k],
+        ))
+    return out
+
+
+# --- rendering (worker processes) ----------------------------------------------------------------
+
+
+def render_fingerprint() -> str:
+    h = hashlib.sha1()
+    for name in ("daily_macro_brief.py", "risk_engine.py", pathlib.Path(__file__).name):
+        h.update((pathlib.Path(__file__).with_name(name)).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def render_days(batch: List[DayInputs], out_dir: str) -> List[Tuple[str, str, bool]]:
+    """Render and write each day's brief; returns (day, inputs digest, file changed)."""
+    tz = brief.ensure_tz("Asia/Seoul")
+    done: List[Tuple[str, str, bool]] = []
+    for inp in batch:
+        d = date.fromisoformat(inp.day)
+        risk = None
+        if len(inp.returns) >= 2:
+            risk = RiskEngine(list(brief.CORRELATION_SYMBOLS))
+            risk.seed(inp.returns)
+
+        doc = brief.render_markdown(
+            now_kst=datetime(d.year, d.month, d.day, *BRIEF_TIME, tzinfo=tz),
+            indices={label: inp.quotes[label] for label in brief.INDEX_LABELS},
+            commodities={label: inp.quotes[label] for label in brief.COMMODITY_SYMBOLS},
+            equities={label: inp.quotes[label] for label in brief.EQUITY_SYMBOLS},
+            crypto={label: inp.quotes[label] for label in brief.CRYPTO_TICKERS},
+            macro_news=inp.macro_news,
+            crypto_news=inp.crypto_news,
+            fear_greed=inp.fear_greed,
+            risk=risk,
+            liquidity=inp.liquidity,
+            run_mode="backfill",
+        )
+        path = pathlib.Path(out_dir) / f"daily_auto_briefing_{inp.day}.md"
+        data = (doc + "\n").encode("utf-8")
+        try:
+            changed = path.read_bytes() != data
+        except OSError:
+            changed = True
+        if changed:
+            write_atomic(path, data)
+        done.append((inp.day, inp.digest(), changed))
+    return done
+
+
+# --- driver --------------------------------------------------------------------------------------
+
+
+def read_checkpoint(path: pathlib.Path, fingerprint: str) -> Dict[str, str]:
+    payload = read_json(path, {})
+    if not isinstance(payload, dict) or payload.get("fingerprint") != fingerprint:
+        return {}
+    done = payload.get("done")
+    return dict(done) if isinstance(done, dict) else {}
+
+
+def write_checkpoint(path: pathlib.Path, fingerprint: str, done: Dict[str, str]) -> None:
+    payload = {"fingerprint": fingerprint, "done": dict(sorted(done.items()))}
+    write_atomic(path, (json.dumps(payload, indent=1) + "\n").encode("utf-8"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    yesterday = (datetime.now(brief.ensure_tz("Asia/Seoul")).date() - timedelta(days=1)).isoformat()
+    parser = argparse.ArgumentParser(description="Regenerate past daily briefs from stored history.")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="First brief date (YYYY-MM-DD, KST).")
+    parser.add_argument("--end", default=yesterday, type=date.fromisoformat, help="Last brief date (default: yesterday).")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Where briefs and the checkpoint are written.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 2, help="Render processes.")
+    parser.add_argument("--offline", action="store_true", help="Use local stores only; fetch nothing.")
+    parser.add_argument("--force", action="store_true", help="Ignore the checkpoint and re-render every day.")
+    cassette.add_arguments(parser)
+    args = parser.parse_args(argv)
+    cassette.apply(args)
+    if args.end < args.start:
+        parser.error("--end is before --start")
+
+    t0 = time.perf_counter()
+    days = [args.start + timedelta(days=n) for n in range((args.end - args.start).days + 1)]
+    quotes, fred, fear_greed, corr = load_history(args.start, args.offline)
+    inputs = build_inputs(days, quotes, fred, fear_greed, corr)
+    t_load = time.perf_counter() - t0
+
+    out_dir = pathlib.Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ckpt_path = out_dir / CHECKPOINT_FILE
+    fingerprint = render_fingerprint()
+    done = {} if args.force else read_checkpoint(ckpt_path, fingerprint)
+    todo = [inp for inp in inputs if done.get(inp.day) != inp.digest() or not (out_dir / f"daily_auto_briefing_{inp.day}.md").exists()]
+    print(f"backfill: {len(days)} days {args.start}..{args.end}, {len(days) - len(todo)} current per checkpoint, rendering {len(todo)}")
+
+    changed = 0
+    rendered = 0
+    last_ckpt = time.monotonic()
+    if todo:
+        jobs = max(1, min(args.jobs, len(todo)))
+        size = max(1, math.ceil(len(todo) / (jobs * 4)))
+        batches = [todo[i : i + size] for i in range(0, len(todo), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = {pool.submit(render_days, b, str(out_dir)) for b in batches}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    for day, digest, was_changed in fut.result():
+                        done[day] = digest
+                        rendered += 1
+                        changed += was_changed
+                if time.monotonic() - last_ckpt >= CHECKPOINT_EVERY_SEC or not pending:
+                    write_checkpoint(ckpt_path, fingerprint, done)
+                    last_ckpt = time.monotonic()
+                    print(f"backfill: {rendered}/{len(todo)} rendered ({rendered / (time.perf_counter() - t0):.0f} days/s)")
+    elif not ckpt_path.exists():
+        write_checkpoint(ckpt_path, fingerprint, done)
+
+    elapsed = time.perf_counter() - t0
+    print(f"backfill: {rendered} rendered, {changed} changed on disk, in {elapsed:.2f}s (history {t_load:.2f}s) -> {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
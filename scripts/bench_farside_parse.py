@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Parse-throughput benchmark for Farside flow pages: streaming parser vs. the old regex scan.
+
+Usage:
+  python scripts/bench_farside_parse.py [PAGE.html ...] [--repeat N] [--synthetic-rows N]
+
+Without page arguments, saved pages under pipelines/fixtures/farside/*.html are used; if there
+are none, a synthetic Farside-shaped page is generated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import re
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from update_etf_data import DATE_RE, clean_text, iter_chunks, parse_human_date, parse_total_inflow, parse_value
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+FIXTURE_GLOB = "pipelines/fixtures/farside/*.html"
+ISSUERS = ["IBIT", "FBTC", "BITB", "ARKB", "BTCO", "EZBC", "BRRR", "HODL", "BTCW", "MSBT", "GBTC", "BTC"]
+
+
+def regex_total_inflow(html_body: str) -> Tuple[Optional[str], Optional[float]]:
+    """Reference implementation: the re.findall scan this benchmark replaced."""
+    rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html_body, flags=re.IGNORECASE | re.DOTALL)
+    best_text, best_obj, best_value = None, None, None
+    for row in rows:
+        cells = re.findall(r"<t[dh][^>]*>(.*?)</t[dh]>", row, flags=re.IGNORECASE | re.DOTALL)
+        if len(cells) < 2:
+            continue
+        m = DATE_RE.search(clean_text(cells[0]))
+        if not m:
+            continue
+        d = parse_human_date(m.group(0))
+        if not d:
+            continue
+        value = None
+        for c in reversed(cells):
+            v = parse_value(clean_text(c))
+            if v is not None:
+                value = v
+                break
+        if best_obj is None or d > best_obj:
+            best_text, best_obj, best_value = m.group(0), d, value
+    return best_text, best_value
+
+
+def synthetic_page(rows: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    out: List[str] = ["<html><head><title>Bitcoin ETF Flow</title></head><body>", '<table class="etf">']
+    out.append("<tr><th>Date</th>" + "".join(f"<th><span>{i}</span></th>" for i in ISSUERS) + "<th>Total</th></tr>")
+    day = date(2024, 1, 11)
+    for _ in range(rows):
+        vals = [rng.uniform(-300, 500) for _ in ISSUERS]
+        cells = "".join(
+            f'<td><span class="{"red" if v < 0 else "green"}">{"(%.1f)" % -v if v < 0 else "%.1f" % v}</span></td>' for v in vals
+        )
+        total = sum(vals)
+        out.append(
+            f'<tr><td><span class="tabletext">{day.strftime("%d %b %Y")}</span></td>{cells}'
+            f'<td><span>{"(%.1f)" % -total if total < 0 else "%.1f" % total}</span></td></tr>'
+        )
+        day += timedelta(days=1 if day.weekday() < 4 else 3)
+    out.append("<tr><td>Total</td>" + "<td>1,234.5</td>" * (len(ISSUERS) + 1) + "</tr>")
+    out.append("<tr><td>Average</td>" + "<td>12.3</td>" * (len(ISSUERS) + 1) + "</tr>")
+    out.append("</table></body></html>")
+    return "\n".join(out).encode("utf-8")
+
+
+def _peak_kib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def bench(name: str, body: bytes, repeat: int) -> None:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        streamed = parse_total_inflow(iter_chunks(body))
+    t_stream = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        legacy = regex_total_inflow(body.decode("utf-8", errors="ignore"))
+    t_regex = (time.perf_counter() - t0) / repeat
+
+    mem_stream = _peak_kib(lambda: parse_total_inflow(iter_chunks(body)))
+    mem_regex = _peak_kib(lambda: regex_total_inflow(body.decode("utf-8", errors="ignore")))
+
+    mb = len(body) / 1e6
+    status = "match" if streamed == legacy else f"MISMATCH regex={legacy}"
+    print(
+        f"{name}: {len(body) / 1024:.0f} KiB  "
+        f"stream {t_stream * 1000:.1f}ms ({mb / t_stream:.1f} MB/s, peak {mem_stream:.0f} KiB)  "
+        f"regex {t_regex * 1000:.1f}ms ({mb / t_regex:.1f} MB/s, peak {mem_regex:.0f} KiB)  -> {streamed} [{status}]"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Farside page parsing throughput.")
+    parser.add_argument("pages", nargs="*", help="Saved Farside HTML pages.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic-rows", type=int, default=600, help="Rows in the generated page when no pages exist.")
+    args = parser.parse_args()
+
+    paths = [pathlib.Path(p) for p in args.pages] or sorted(ROOT.glob(FIXTURE_GLOB))
+    if not paths:
+        bench(f"synthetic[{args.synthetic_rows} rows]", synthetic_page(args.synthetic_rows), args.repeat)
+        return 0
+    for path in paths:
+        bench(path.name, path.read_bytes(), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the updater scripts against a local replay server, fully offline.
+
+Every upstream (Yahoo, FRED, er-api, Farside, DefiLlama, Google News, CoinGecko, alternative.me)
+is answered by ReplayServer: recorded fixtures under pipelines/fixtures/replay/ when present,
+otherwise deterministic synthetic responses of realistic shape and size. Latency, hangs,
+connection resets and 5xx errors can be injected globally or per host.
+
+Each script runs in its own process inside a throwaway copy of the tree, with http_client pointed
+at the server through PROJECT_MARK_UPSTREAM. Per run it reports end-to-end wall time, the
+fetch/parse/render/write stage times from fetch_stage, peak RSS, bytes received and written.
+
+Usage:
+  python scripts/bench_pipeline.py                          # every script, 3 cold runs each
+  python scripts/bench_pipeline.py --script etf --repeat 10 --state warm
+  python scripts/bench_pipeline.py --latency-ms 80 --fault farside.co.uk=timeout:1
+  python scripts/bench_pipeline.py --baseline runtime/bench/before.json --max-regression 0.2
+
+Fixtures use the cassette layout (cassette.py), so a cycle recorded with
+`scheduler.py --once --record DIR` can be benchmarked with `--fixtures DIR`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gzip
+import hashlib
+import http.server
+import importlib
+import json
+import math
+import os
+import pathlib
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import cassette
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+FIXTURE_DIR = ROOT / "pipelines" / "fixtures" / "replay"
+RESULTS_DIR = ROOT / "runtime" / "bench"
+RESULT_PREFIX = "BENCH_RESULT "
+
+# bench name -> (module, argv for main(); "{sandbox}" is substituted)
+SCRIPTS: Dict[str, Tuple[str, List[str]]] = {
+    "macro_stocks": ("update_macro_stocks_data", []),
+    "etf": ("update_etf_data", []),
+    "news": ("update_news_data", []),
+    "crypto": ("update_crypto_data", []),
+    "exchanges": ("update_exchange_tickers", []),
+    "daily_brief": ("daily_macro_brief", ["--output-dir", "{sandbox}/reports"]),
+    # The sandbox snapshots are whatever is checked in, so accept them regardless of age.
+    "daily_brief_snapshots": ("daily_macro_brief", ["--output-dir", "{sandbox}/reports", "--from-snapshots", "--max-age-min", "1e9"]),
+}
+SANDBOX_COPY = ("scripts", "dashboard/data", "dashboard/api", "pipelines", "runtime/history")
+WRITE_ROOTS = ("dashboard", "pipelines", "reports", "runtime/history")
+FAULT_KINDS = ("error", "timeout", "reset")
+
+
+# --- synthetic upstreams -------------------------------------------------------------------------
+
+
+def _seed(*parts: str) -> random.Random:
+    return random.Random(int(hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12], 16))
+
+
+def _weekdays(end: date, count: int) -> List[date]:
+    days: List[date] = []
+    d = end
+    while len(days) < count:
+        if d.weekday() < 5:
+            days.append(d)
+        d -= timedelta(days=1)
+    return days[::-1]
+
+
+def _walk(rng: random.Random, n: int, start: float, vol: float = 0.012) -> List[float]:
+    out, v = [], start
+    for _ in range(n):
+        v *= math.exp(rng.gauss(0.0, vol))
+        out.append(round(v, 4))
+    return out
+
+
+def _yahoo_quote(query: Dict[str, List[str]]) -> dict:
+    symbols = [s for s in (query.get("symbols") or [""])[0].split(",") if s]
+    result = []
+    for sym in symbols:
+        rng = _seed("quote", sym)
+        result.append({
+            "symbol": sym,
+            "regularMarketPrice": round(rng.uniform(5, 5000), 2),
+            "regularMarketChangePercent": round(rng.gauss(0, 1.2), 3),
+            "regularMarketPreviousClose": round(rng.uniform(5, 5000), 2),
+            "currency": "USD",
+            "marketState": "REGULAR",
+        })
+    return {"quoteResponse": {"result": result, "error": None}}
+
+
+def _yahoo_chart(symbol: str, query: Dict[str, List[str]]) -> dict:
+    n = {"5d": 5, "1mo": 22, "3mo": 66, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "max": 2520}.get((query.get("range") or ["5d"])[0], 22)
+    days = _weekdays(date.today() - timedelta(days=1), n)
+    rng = _seed("chart", symbol)
+    closes = _walk(rng, n, rng.uniform(20, 4000))
+    stamps = [int(datetime(d.year, d.month, d.day, 21, tzinfo=timezone.utc).timestamp()) for d in days]
+    return {"chart": {"result": [{"meta": {"symbol": symbol}, "timestamp": stamps, "indicators": {"quote": [{"close": closes}]}}], "error": None}}
+
+
+def _fear_greed(query: Dict[str, List[str]]) -> dict:
+    n = max(1, int((query.get("limit") or ["1"])[0] or 0) or 1)
+    rng = _seed("fng", str(n))
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    values = [54] + [rng.randint(10, 90) for _ in range(n - 1)]
+    return {
+        "name": "Fear and Greed Index",
+        "data": [
+            {"value": str(v), "value_classification": "Neutral", "timestamp": str(int((today - timedelta(days=i)).timestamp()))}
+            for i, v in enumerate(values)
+        ],
+    }
+
+
+def _fred_csv(query: Dict[str, List[str]]) -> str:
+    series = (query.get("id") or ["SERIES"])[0]
+    since = (query.get("cosd") or [""])[0]
+    days = _weekdays(date.today() - timedelta(days=1), 520)
+    values = _walk(_seed("fred", series), len(days), 4.0, vol=0.004)
+    lines = [f"observation_date,{series}"]
+    for d, v in zip(days, values):
+        iso = d.isoformat()
+        if iso >= since:
+            lines.append(f"{iso},{v:.2f}")
+    return "\n".join(lines) + "\n"
+
+
+def _rss(query: Dict[str, List[str]]) -> str:
+    q = (query.get("q") or [""])[0]
+    rng = _seed("rss", q)
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(40):
+        ts = (now - timedelta(minutes=17 * i + rng.randint(0, 9))).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        gid = hashlib.sha1(f"{q}|{i}".encode()).hexdigest()[:20]
+        items.append(
+            f"<item><title>{q.split(' OR ')[0].title()} headline {i} - Wire {rng.randint(1, 99)}</title>"
+            f"<link>https://news.example.com/articles/{gid}</link><guid isPermaLink=\"false\">{gid}</guid>"
+            f"<pubDate>{ts}</pubDate><description>&lt;a href=\"https://news.example.com/articles/{gid}\"&gt;"
+            f"{'lorem ipsum ' * 20}&lt;/a&gt;</description><source url=\"https://news.example.com\">Wire</source></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Google News</title>'
+        + "".join(items)
+        + "</channel></rss>"
+    )
+
+
+def _coingecko(query: Dict[str, List[str]]) -> dict:
+    ids = [i for i in (query.get("ids") or [""])[0].split(",") if i]
+    out = {}
+    for coin in ids:
+        rng = _seed("cg", coin)
+        out[coin] = {"usd": round(rng.uniform(0.5, 90000), 2), "usd_24h_change": round(rng.gauss(0, 3), 3)}
+    return out
+
+
+def _coingecko_markets(query: Dict[str, List[str]]) -> List[dict]:
+    ids = [i for i in (query.get("ids") or [""])[0].split(",") if i]
+    if not ids:
+        ids = ["bitcoin", "ethereum", "tether"] + [f"coin-{i}" for i in range(3, int((query.get("per_page") or ["100"])[0]))]
+    rows = []
+    for coin in ids:
+        rng = _seed("cg", coin)
+        price = round(rng.uniform(0.05, 90000), 4)
+        supply = rng.uniform(1e6, 1e11)
+        rows.append({
+            "id": coin,
+            "symbol": {"bitcoin": "btc", "ethereum": "eth", "tether": "usdt"}.get(coin, coin.split("-")[-1][:5]),
+            "name": coin.replace("-", " ").title(),
+            "current_price": price,
+            "market_cap": round(price * supply),
+            "market_cap_rank": None,
+            "total_volume": round(price * supply * rng.uniform(0.01, 0.2)),
+            "circulating_supply": supply,
+            "price_change_percentage_24h_in_currency": rng.gauss(0, 3),
+            "price_change_percentage_7d_in_currency": rng.gauss(0, 8),
+        })
+    rows.sort(key=lambda r: -r["market_cap"])
+    for rank, r in enumerate(rows, 1):
+        r["market_cap_rank"] = rank
+    return rows
+
+
+def _binance_funding() -> List[dict]:
+    return [
+        {"symbol": f"{base}USDT", "lastFundingRate": f"{_seed('funding', base).gauss(0, 0.0002):.8f}"}
+        for base in ("BTC", "ETH", "SOL", "XRP", "DOGE", "1000SHIB", "ADA", "LINK", "AVAX", "TRX")
+    ]
+
+
+def _exchange_bases() -> List[str]:
+    registry = json.loads((ROOT / "pipelines" / "symbol_registry.json").read_text(encoding="utf-8"))
+    return [r["ticker"] for r in registry.get("crypto", [])] + [f"ALT{i}" for i in range(2500)]
+
+
+def _exchange_dump(host: str) -> dict:
+    """Full spot ticker list in the exchange's own shape, a few MB like the real ones."""
+    rows = []
+    for base in _exchange_bases():
+        rng = _seed("ticker", host, base)
+        last = rng.uniform(0.001, 90000)
+        open_ = last / (1 + rng.gauss(0, 0.03))
+        for quote in ("USDT", "USDC", "BTC"):
+            if host == "api.binance.com":
+                rows.append({
+                    "symbol": f"{base}{quote}", "priceChange": f"{last - open_:.8f}", "priceChangePercent": f"{(last / open_ - 1) * 100:.3f}",
+                    "weightedAvgPrice": f"{last:.8f}", "prevClosePrice": f"{open_:.8f}", "lastPrice": f"{last:.8f}", "lastQty": "1.00000000",
+                    "bidPrice": f"{last:.8f}", "bidQty": "5.00000000", "askPrice": f"{last:.8f}", "askQty": "5.00000000", "openPrice": f"{open_:.8f}",
+                    "highPrice": f"{last * 1.02:.8f}", "lowPrice": f"{open_ * 0.98:.8f}", "volume": f"{rng.uniform(1e3, 1e8):.8f}",
+                    "quoteVolume": f"{rng.uniform(1e4, 1e9):.8f}", "openTime": 0, "closeTime": 0, "firstId": 1, "lastId": 2, "count": 1,
+                })
+            elif host == "api.bybit.com":
+                rows.append({
+                    "symbol": f"{base}{quote}", "bid1Price": f"{last:.6f}", "bid1Size": "1", "ask1Price": f"{last:.6f}", "ask1Size": "1",
+                    "lastPrice": f"{last:.6f}", "prevPrice24h": f"{open_:.6f}", "price24hPcnt": f"{last / open_ - 1:.4f}",
+                    "highPrice24h": f"{last * 1.02:.6f}", "lowPrice24h": f"{open_ * 0.98:.6f}", "turnover24h": f"{rng.uniform(1e4, 1e9):.4f}",
+                    "volume24h": f"{rng.uniform(1e3, 1e8):.4f}",
+                })
+            else:
+                rows.append({
+                    "instType": "SPOT", "instId": f"{base}-{quote}", "last": f"{last:.6f}", "lastSz": "1", "askPx": f"{last:.6f}", "askSz": "1",
+                    "bidPx": f"{last:.6f}", "bidSz": "1", "open24h": f"{open_:.6f}", "high24h": f"{last * 1.02:.6f}", "low24h": f"{open_ * 0.98:.6f}",
+                    "volCcy24h": f"{rng.uniform(1e4, 1e9):.4f}", "vol24h": f"{rng.uniform(1e3, 1e8):.4f}", "ts": "0", "sodUtc0": f"{open_:.6f}",
+                    "sodUtc8": f"{open_:.6f}",
+                })
+    if host == "api.binance.com":
+        return rows  # type: ignore[return-value]
+    if host == "api.bybit.com":
+        return {"retCode": 0, "retMsg": "OK", "result": {"category": "spot", "list": rows}, "time": 0}
+    return {"code": "0", "msg": "", "data": rows}
+
+
+def _defillama() -> str:
+    d = date.today() - timedelta(days=1)
+    return (
+        "<html><body><h2>Daily Stats</h2>"
+        f"<p>Last updated {d.strftime('%B')} {d.day}, {d.year}</p>"
+        "<div>Bitcoin Flows</div><div>+$123.4m</div><div>Ethereum Flows</div><div>-$5.6m</div>"
+        "</body></html>"
+    )
+
+
+def synthetic_response(host: str, path: str, query: Dict[str, List[str]]) -> Tuple[int, str, bytes]:
+    """(status, content type, body) for a known upstream endpoint; 404 otherwise."""
+    if host == "query1.finance.yahoo.com" and path.startswith("/v7/finance/quote"):
+        return 200, "application/json", json.dumps(_yahoo_quote(query)).encode()
+    if host == "query1.finance.yahoo.com" and path.startswith("/v8/finance/chart/"):
+        symbol = urllib.parse.unquote(path.rsplit("/", 1)[-1])
+        return 200, "application/json", json.dumps(_yahoo_chart(symbol, query)).encode()
+    if host == "fred.stlouisfed.org":
+        return 200, "text/csv", _fred_csv(query).encode()
+    if host == "open.er-api.com":
+        return 200, "application/json", json.dumps({"result": "success", "base_code": "USD", "rates": {"USD": 1, "KRW": 1387.25, "JPY": 151.2, "EUR": 0.92}}).encode()
+    if host == "farside.co.uk":
+        from bench_farside_parse import synthetic_page
+
+        return 200, "text/html; charset=utf-8", synthetic_page(600, seed=7 if "btc" in path else 11)
+    if host == "defillama.com":
+        return 200, "text/html; charset=utf-8", _defillama().encode()
+    if host == "news.google.com":
+        return 200, "application/rss+xml; charset=utf-8", _rss(query).encode()
+    if host == "api.coingecko.com" and path.startswith("/api/v3/coins/markets"):
+        return 200, "application/json", json.dumps(_coingecko_markets(query)).encode()
+    if host == "api.coingecko.com":
+        return 200, "application/json", json.dumps(_coingecko(query)).encode()
+    if host in ("api.binance.com", "api.bybit.com", "www.okx.com") and "ticker" in path:
+        return 200, "application/json", json.dumps(_exchange_dump(host)).encode()
+    if host == "fapi.binance.com":
+        return 200, "application/json", json.dumps(_binance_funding()).encode()
+    if host == "api.alternative.me":
+        return 200, "application/json", json.dumps(_fear_greed(query)).encode()
+    return 404, "text/plain", b"no fixture\n"
+
+
+# --- replay server -------------------------------------------------------------------------------
+
+
+@dataclass
+class Fault:
+    host: str  # fnmatch pattern
+    kind: str  # error | timeout | reset
+    rate: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Fault":
+        host, _, rest = spec.partition("=")
+        kind, _, rate = rest.partition(":")
+        if not host or kind not in FAULT_KINDS:
+            raise argparse.ArgumentTypeError(f"fault must be HOST=({'|'.join(FAULT_KINDS)})[:RATE], got {spec!r}")
+        return cls(host, kind, float(rate or 1.0))
+
+
+@dataclass
+class ReplayConfig:
+    fixture_dir: pathlib.Path = FIXTURE_DIR
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    hang_sec: float = 30.0
+    faults: List[Fault] = field(default_factory=list)
+    seed: int = 1
+
+
+class ReplayServer(http.server.ThreadingHTTPServer):
+    """Serves `GET /<host><path>?<query>` from fixtures or synthetic upstreams, with fault injection."""
+
+    daemon_threads = True
+    request_queue_size = 256  # the updaters open a connection per concurrent source at once
+
+    def __init__(self, config: ReplayConfig, port: int = 0):
+        super().__init__(("127.0.0.1", port), _ReplayHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._bodies: Dict[str, Tuple[int, Dict[str, str], bytes, Optional[bytes]]] = {}
+        self.fixtures = cassette.Player(config.fixture_dir) if config.fixture_dir.is_dir() else None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+    def count(self, host: str, key: str, n: int = 1) -> None:
+        with self.lock:
+            c = self.counters.setdefault(host, {"requests": 0, "bytes_out": 0, "faults": 0})
+            c[key] += n
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {h: dict(c) for h, c in self.counters.items()}
+
+    def pick_fault(self, host: str) -> Optional[str]:
+        with self.lock:
+            for f in self.config.faults:
+                if fnmatch.fnmatch(host, f.host) and self.rng.random() < f.rate:
+                    return f.kind
+            return None
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000.0
+
+    def resolve(self, host: str, target: str) -> Tuple[int, Dict[str, str], bytes, Optional[bytes]]:
+        """(status, headers, body, gzipped body) for an upstream request, memoised per URL."""
+        url = f"https://{host}{target}"
+        with self.lock:
+            hit = self._bodies.get(url)
+        if hit is not None:
+            return hit
+        ex = self.fixtures.find(url) if self.fixtures is not None else None
+        if ex is not None and ex.error is not None:
+            status, headers, body = ex.status or 502, {"content-type": "text/plain"}, (ex.error + "\n").encode()
+        elif ex is not None:
+            status, headers, body = ex.status or 200, dict(ex.headers), ex.body
+        else:
+            parts = urllib.parse.urlsplit(target)
+            status, ctype, body = synthetic_response(host, parts.path, urllib.parse.parse_qs(parts.query))
+            headers = {"content-type": ctype}
+        gz = gzip.compress(body, compresslevel=6, mtime=0) if len(body) > 512 else None
+        resolved = (status, headers, body, gz)
+        with self.lock:
+            self._bodies[url] = resolved
+        return resolved
+
+
+class _ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReplayServer
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - signature fixed by the base class
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        host, _, rest = self.path.lstrip("/").partition("/")
+        target = "/" + rest
+        srv = self.server
+        srv.count(host, "requests")
+
+        wait = srv.delay()
+        if wait:
+            time.sleep(wait)
+        fault = srv.pick_fault(host)
+        if fault:
+            srv.count(host, "faults")
+        if fault == "timeout":
+            time.sleep(srv.config.hang_sec)
+            self.close_connection = True
+            return
+        if fault == "reset":
+            self.close_connection = True
+            return
+        if fault == "error":
+            status, headers, body, gz = 503, {"content-type": "text/plain"}, b"injected error\n", None
+        else:
+            status, headers, body, gz = srv.resolve(host, target)
+
+        encoded = gz is not None and "gzip" in (self.headers.get("Accept-Encoding") or "")
+        payload = gz if encoded else body
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        if encoded:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        srv.count(host, "bytes_out", len(payload))
+
+
+# --- runs ----------------------------------------------------------------------------------------
+
+
+def child(name: str, sandbox: str) -> int:
+    """Runs inside the sandbox copy: execute one script's main() and print its measurements."""
+    import resource
+
+    import http_client
+    from fetch_stage import reset_stage_times, stage_times
+
+    module_name, argv = SCRIPTS[name]
+    module = importlib.import_module(module_name)
+    reset_stage_times()
+    t0 = time.perf_counter()
+    try:
+        rc = module.main([a.format(sandbox=sandbox) for a in argv])
+        error = None
+    except Exception as e:  # report, don't crash the bench
+        rc, error = 1, f"{type(e).__name__}: {e}"
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    http_client.close_all()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hosts = http_client.stats()
+    result = {
+        "rc": rc or 0,
+        "error": error,
+        "wall_ms": round(wall_ms, 2),
+        "stages_ms": {k: round(v, 2) for k, v in sorted(stage_times().items())},
+        "peak_rss_kib": rss // 1024 if sys.platform == "darwin" else rss,
+        "requests": sum(h["requests"] for h in hosts.values()),
+        "bytes_in": sum(h["bytes_in"] for h in hosts.values()),
+        "http": hosts,
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+    return 0
+
+
+def make_sandbox() -> pathlib.Path:
+    sandbox = pathlib.Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    for rel in SANDBOX_COPY:
+        src = ROOT / rel
+        if src.exists():
+            shutil.copytree(src, sandbox / rel, ignore=shutil.ignore_patterns("__pycache__", "fixtures"))
+    (sandbox / "reports").mkdir(exist_ok=True)
+    return sandbox
+
+
+def _file_stamps(sandbox: pathlib.Path) -> Dict[pathlib.Path, Tuple[int, int]]:
+    out = {}
+    for rel in WRITE_ROOTS:
+        for p in (sandbox / rel).rglob("*"):
+            if p.is_file():
+                st = p.stat()
+                # Inode, not mtime: write_atomic replaces the file, while an unchanged snapshot is only touched.
+                out[p] = (st.st_ino, st.st_size)
+    return out
+
+
+def run_script(name: str, sandbox: pathlib.Path, server: ReplayServer, warm: bool) -> dict:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PROJECT_MARK_")}
+    env["PROJECT_MARK_UPSTREAM"] = server.url
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    if not warm:
+        env["PROJECT_MARK_HTTP_CACHE"] = "0"
+        # A cold run starts without fetch history, so the planner treats every source as due.
+        cold_plan = sandbox / "runtime" / "cold_fetch_plan.json"
+        cold_plan.unlink(missing_ok=True)
+        env["PROJECT_MARK_FETCH_PLAN"] = str(cold_plan)
+
+    before_files = _file_stamps(sandbox)
+    before_srv = server.snapshot()
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(sandbox / "scripts" / "bench_pipeline.py"), "--child", name, "--sandbox", str(sandbox)],
+        cwd=sandbox,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    process_ms = (time.perf_counter() - t0) * 1000.0
+
+    line = next((l for l in proc.stdout.splitlines() if l.startswith(RESULT_PREFIX)), None)
+    if line is None:
+        result = {"rc": proc.returncode or 1, "error": (proc.stderr.strip().splitlines() or ["no result"])[-1]}
+    else:
+        result = json.loads(line[len(RESULT_PREFIX):])
+    result["process_ms"] = round(process_ms, 2)
+
+    after_srv = server.snapshot()
+    result["server_bytes_out"] = sum(c["bytes_out"] - before_srv.get(h, {}).get("bytes_out", 0) for h, c in after_srv.items())
+    result["server_faults"] = sum(c["faults"] - before_srv.get(h, {}).get("faults", 0) for h, c in after_srv.items())
+    after_files = _file_stamps(sandbox)
+    result["bytes_written"] = sum(size for p, (ino, size) in after_files.items() if before_files.get(p) != (ino, size))
+    return result
+
+
+def summarize(runs: List[dict]) -> dict:
+    ok = [r for r in runs if not r.get("rc") and "wall_ms" in r]
+    if not ok:
+        return {"ok_runs": 0}
+
+    def med(key: str) -> float:
+        return round(statistics.median(r[key] for r in ok), 2)
+
+    stages = sorted({s for r in ok for s in r.get("stages_ms", {})})
+    return {
+        "ok_runs": len(ok),
+        "wall_ms": med("wall_ms"),
+        "process_ms": med("process_ms"),
+        "stages_ms": {s: round(statistics.median(r["stages_ms"].get(s, 0.0) for r in ok), 2) for s in stages},
+        "peak_rss_kib": max(r["peak_rss_kib"] for r in ok),
+        "requests": med("requests"),
+        "bytes_in": med("bytes_in"),
+        "bytes_written": med("bytes_written"),
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> bool:
+    """Print median deltas against a previous results file; False if anything regressed past the limit."""
+    passed = True
+    for name, cur in current["scripts"].items():
+        base = baseline.get("scripts", {}).get(name, {}).get("summary")
+        now = cur["summary"]
+        if not base or not base.get("ok_runs") or not now.get("ok_runs"):
+            continue
+        for key in ("wall_ms", "peak_rss_kib", "bytes_in"):
+            if not base.get(key):
+                continue
+            ratio = now[key] / base[key]
+            flag = ""
+            if key != "bytes_in" and ratio > 1.0 + max_regression:
+                flag, passed = "  REGRESSION", False
+            print(f"compare: {name} {key} {base[key]} -> {now[key]} ({(ratio - 1) * 100:+.1f}%){flag}")
+    return passed
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the updater scripts.")
+    parser.add_argument("--script", action="append", choices=list(SCRIPTS), help="Scripts to run (repeatable; default all).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--state", choices=("cold", "warm"), default="cold",
+                        help="cold: fresh tree and no HTTP cache per run; warm: one primed tree per script, cache on.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every upstream response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random extra latency.")
+    parser.add_argument("--hang-sec", type=float, default=30.0, help="How long an injected timeout holds the request.")
+    parser.add_argument("--fault", action="append", type=Fault.parse, default=[], metavar="HOST=KIND[:RATE]",
+                        help=f"Inject faults for hosts matching the glob; KIND is one of {', '.join(FAULT_KINDS)}.")
+    parser.add_argument("--fixtures", default=str(FIXTURE_DIR), help="Recorded fixture directory.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Results JSON path (default runtime/bench/pipeline_<timestamp>.json).")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare medians against.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed wall/RSS growth vs baseline (0.25 = 25%%).")
+    parser.add_argument("--keep", action="store_true", help="Keep sandbox directories.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--sandbox", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return child(args.child, args.sandbox)
+
+    config = ReplayConfig(pathlib.Path(args.fixtures), args.latency_ms, args.jitter_ms, args.hang_sec, args.fault, args.seed)
+    server = ReplayServer(config).start()
+    print(f"replay server on {server.url} (fixtures: {config.fixture_dir})")
+
+    names = args.script or list(SCRIPTS)
+    results: Dict[str, dict] = {}
+    sandboxes: List[pathlib.Path] = []
+    try:
+        for name in names:
+            runs = []
+            sandbox = None
+            if args.state == "warm":
+                sandbox = make_sandbox()
+                sandboxes.append(sandbox)
+                run_script(name, sandbox, server, warm=True)  # prime stores and HTTP cache
+            for i in range(args.repeat):
+                if args.state == "cold":
+                    sandbox = make_sandbox()
+                    sandboxes.append(sandbox)
+                r = run_script(name, sandbox, server, warm=args.state == "warm")
+                runs.append(r)
+                stages = " ".join(f"{k}={v:.0f}" for k, v in r.get("stages_ms", {}).items())
+                status = "ok" if not r.get("rc") else f"failed ({r.get('error')})"
+                print(
+                    f"bench: {name} #{i + 1} {r.get('wall_ms', 0):.0f}ms [{stages}] rss={r.get('peak_rss_kib', 0)}KiB "
+                    f"in={r.get('bytes_in', 0)}B out={r.get('bytes_written', 0)}B {status}"
+                )
+            results[name] = {"summary": summarize(runs), "runs": runs}
+    finally:
+        server.shutdown()
+        if not args.keep:
+            for sandbox in sandboxes:
+                shutil.rmtree(sandbox, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "state": args.state,
+            "repeat": args.repeat,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "faults": [vars(f) for f in args.fault],
+            "seed": args.seed,
+        },
+        "scripts": results,
+    }
+    out = pathlib.Path(args.output) if args.output else RESULTS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    for name, r in results.items():
+        s = r["summary"]
+        if s.get("ok_runs"):
+            print(f"summary: {name} wall={s['wall_ms']:.0f}ms rss={s['peak_rss_kib']}KiB requests={s['requests']:.0f} in={s['bytes_in']:.0f}B")
+        else:
+            print(f"summary: {name} no successful runs")
+    print(f"wrote {out}")
+
+    failed = any(not r["summary"].get("ok_runs") for r in results.values())
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.max_regression):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
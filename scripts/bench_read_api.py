@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Load test for read_api.py: requests per second and latency percentiles under many keep-alive clients.
+
+By default it starts bench_pipeline's ReplayServer as the upstream (with --upstream-latency-ms
+added to every response), then read_api.py in a subprocess pointed at it with the HTTP cache
+off, so every live refresh reaches the replay server. Each of --concurrency clients holds one
+keep-alive connection and sends requests round-robin over --path until --requests have been
+sent in total; every client's first request goes out at once, so each cold live key is hit by
+hundreds of clients together. Afterwards it prints throughput, p50/p90/p99/max latency, status
+counts, the server's /health counters and, in spawn mode, the upstream request count per host.
+
+Usage:
+  python scripts/bench_read_api.py                                   # spawn, default paths
+  python scripts/bench_read_api.py --concurrency 1000 --requests 50000 --revalidate
+  python scripts/bench_read_api.py --url http://127.0.0.1:8787 --path /data/macro_snapshot.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import pathlib
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DEFAULT_PATHS = [
+    "/api/live",
+    "/api/crypto-prices?tickers=BTC,ETH,SOL,XRP,DOGE",
+    "/data/macro_snapshot.json",
+    "/data/bundle/manifest.json",
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1))]
+
+
+async def client(host: str, port: int, paths: List[str], budget: List[int], offset: int, gzip_ok: bool, revalidate: bool,
+                 latencies: List[float], statuses: Dict[int, int], totals: Dict[str, int], start: asyncio.Event) -> None:
+    etags: Dict[str, str] = {}
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
+    i = offset
+    await start.wait()
+    while budget[0] > 0:
+        budget[0] -= 1
+        path = paths[i % len(paths)]
+        i += 1
+        headers = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        if gzip_ok:
+            headers += "Accept-Encoding: gzip, br\r\n"
+        if revalidate and path in etags:
+            headers += f"If-None-Match: {etags[path]}\r\n"
+        t0 = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write((headers + "\r\n").encode("latin-1"))
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            resp = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in head[1:] if line)}
+            body = await reader.readexactly(int(resp.get("content-length") or 0))
+        except (OSError, asyncio.IncompleteReadError) as e:
+            totals["error"] = totals.get("error", 0) + 1
+            if totals["error"] <= 3:
+                print(f"warn: request {path} failed: {type(e).__name__}: {e}")
+            writer = None
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        status = int(head[0].split(" ", 2)[1])
+        statuses[status] = statuses.get(status, 0) + 1
+        totals["bytes"] += len(body)
+        if "etag" in resp:
+            etags[path] = resp["etag"]
+        if resp.get("connection", "").lower() == "close":
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(host: str, port: int, paths: List[str], concurrency: int, requests: int, gzip_ok: bool, revalidate: bool) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    totals: Dict[str, int] = {"bytes": 0}
+    budget = [requests]
+    start = asyncio.Event()
+    tasks = [
+        asyncio.create_task(client(host, port, paths, budget, n, gzip_ok, revalidate, latencies, statuses, totals, start))
+        for n in range(concurrency)
+    ]
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": totals.get("error", 0),
+        "elapsed_sec": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "bytes": totals["bytes"],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"read_api exited with {proc.returncode}")
+        try:
+            urllib.request.urlopen(url + "/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("read_api did not become ready")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test read_api.py.")
+    parser.add_argument("--url", help="Existing server (default: spawn read_api.py against a replayed upstream).")
+    parser.add_argument("--path", action="append", help="Request path (repeatable; default: live, crypto-prices, two snapshots).")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--no-gzip", action="store_true", help="Don't send Accept-Encoding.")
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match with each path's last ETag.")
+    parser.add_argument("--upstream-latency-ms", type=float, default=200.0)
+    args = parser.parse_args(argv)
+    paths = args.path or DEFAULT_PATHS
+
+    replay = proc = state = None
+    url = args.url
+    if url is None:
+        from bench_pipeline import ReplayConfig, ReplayServer
+
+        replay = ReplayServer(ReplayConfig(latency_ms=args.upstream_latency_ms)).start()
+        state = tempfile.mkdtemp(prefix="bench_read_api_")
+        port = free_port()
+        env = {k: v for k, v in os.environ.items() if not k.startswith("PROJECT_MARK_")}
+        env.update({
+            "PROJECT_MARK_UPSTREAM": replay.url,
+            "PROJECT_MARK_HTTP_CACHE": "0",
+            "PROJECT_MARK_SOURCE_HEALTH": str(pathlib.Path(state) / "source_health.json"),
+        })
+        log = open(pathlib.Path(state) / "read_api.log", "w")
+        proc = subprocess.Popen(
+            [sys.executable, str(ROOT / "scripts" / "read_api.py"), "--port", str(port)],
+            env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        url = f"http://127.0.0.1:{port}"
+        wait_ready(url, proc)
+
+    host, _, port_s = url.split("://", 1)[1].rstrip("/").partition(":")
+    try:
+        result = asyncio.run(load(host, int(port_s or 80), paths, args.concurrency, args.requests, not args.no_gzip, args.revalidate))
+        health = json.loads(urllib.request.urlopen(url + "/health", timeout=5).read())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if state is not None:
+            shutil.rmtree(state, ignore_errors=True)
+
+    lat = result["latency_ms"]
+    print(f"load: {result['requests']} requests over {args.concurrency} connections in {result['elapsed_sec']}s")
+    print(f"load: {result['rps']} req/s  p50={lat['p50']}ms p90={lat['p90']}ms p99={lat['p99']}ms max={lat['max']}ms")
+    print(f"load: statuses {result['statuses']}  bytes={result['bytes']}  errors={result['errors']}")
+    print(f"server: {json.dumps(health['live'])} not_modified={health['not_modified']}")
+    if replay is not None:
+        upstream = {h: c["requests"] for h, c in sorted(replay.counters.items())}
+        print(f"upstream: {sum(upstream.values())} requests {json.dumps(upstream)}")
+        replay.shutdown()
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""HTTP cassettes: record every exchange of a run to disk, then replay it with no network I/O.
+
+Layout of a cassette directory (also read by bench_pipeline.py as replay fixtures):
+  <dir>/<host>/<key>.json   {"url", "status", "headers", "error"}
+  <dir>/<host>/<key>.body   decoded response body (absent for network errors)
+where key = fixture_key(url). The same URL fetched twice in one recording keeps the last exchange.
+
+http_client consults the active cassette before its cache and the network. Activate one with
+`--record DIR` / `--replay DIR` on any updater (see add_arguments/apply), or with the
+PROJECT_MARK_RECORD / PROJECT_MARK_REPLAY environment variables.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+# Query parameters that depend on local state rather than on what is being asked for, e.g. the
+# FRED `cosd` start date derived from the series store. Replay falls back to ignoring them.
+VOLATILE_QUERY_PARAMS = frozenset({"cosd"})
+
+
+def fixture_key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _loose_key(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_QUERY_PARAMS]
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path, urllib.parse.urlencode(sorted(query)), ""))
+
+
+@dataclass
+class Exchange:
+    url: str
+    status: Optional[int]
+    headers: Dict[str, str]
+    body: bytes
+    error: Optional[str] = None
+
+
+def iter_exchanges(root: pathlib.Path) -> Iterator[Exchange]:
+    for meta_path in sorted(root.glob("*/*.json")):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if not isinstance(meta, dict) or "url" not in meta:
+            continue
+        body_path = meta_path.with_suffix(".body")
+        yield Exchange(
+            url=meta["url"],
+            status=meta.get("status"),
+            headers={k.lower(): v for k, v in (meta.get("headers") or {}).items()},
+            body=body_path.read_bytes() if body_path.exists() else b"",
+            error=meta.get("error"),
+        )
+
+
+class Recorder:
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def save(self, url: str, status: Optional[int], headers: Dict[str, str], body: bytes, error: Optional[str] = None) -> None:
+        host = (urllib.parse.urlsplit(url).hostname or "unknown").lower()
+        base = self.root / host / fixture_key(url)
+        # The body is stored decoded, so transfer headers no longer describe it.
+        kept = {k: v for k, v in headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        meta = {"url": url, "status": status, "headers": kept, "error": error}
+        with self.lock:
+            base.parent.mkdir(parents=True, exist_ok=True)
+            if error is None:
+                base.with_suffix(".body").write_bytes(body)
+            base.with_suffix(".json").write_text(json.dumps(meta, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+            self.count += 1
+
+
+class Player:
+    """A cassette loaded fully into memory."""
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.exact: Dict[str, Exchange] = {}
+        self.loose: Dict[str, Exchange] = {}
+        for ex in iter_exchanges(root):
+            self.exact[ex.url] = ex
+            self.loose[_loose_key(ex.url)] = ex
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def find(self, url: str) -> Optional[Exchange]:
+        ex = self.exact.get(url) or self.loose.get(_loose_key(url))
+        if ex is None:
+            self.misses += 1
+        return ex
+
+
+RECORDER: Optional[Recorder] = None
+PLAYER: Optional[Player] = None
+
+
+def record(root: os.PathLike | str) -> Recorder:
+    global RECORDER, PLAYER
+    PLAYER = None
+    RECORDER = Recorder(pathlib.Path(root))
+    return RECORDER
+
+
+def replay(root: os.PathLike | str) -> Player:
+    global RECORDER, PLAYER
+    path = pathlib.Path(root)
+    if not path.is_dir():
+        raise FileNotFoundError(f"cassette not found: {path}")
+    RECORDER = None
+    PLAYER = Player(path)
+    return PLAYER
+
+
+def stop() -> Tuple[Optional[Recorder], Optional[Player]]:
+    global RECORDER, PLAYER
+    active = (RECORDER, PLAYER)
+    RECORDER = PLAYER = None
+    return active
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR", help="Save every HTTP exchange of this run into a cassette directory.")
+    group.add_argument("--replay", metavar="DIR", help="Serve HTTP from a recorded cassette; no network I/O.")
+
+
+def apply(args: argparse.Namespace) -> None:
+    if getattr(args, "replay", None):
+        player = replay(args.replay)
+        print(f"cassette: replaying {len(player)} exchanges from {player.root}")
+    elif getattr(args, "record", None):
+        print(f"cassette: recording to {record(args.record).root}")
+
+
+if os.environ.get("PROJECT_MARK_REPLAY"):
+    replay(os.environ["PROJECT_MARK_REPLAY"])
+elif os.environ.get("PROJECT_MARK_RECORD"):
+    record(os.environ["PROJECT_MARK_RECORD"])
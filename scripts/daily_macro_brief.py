@@ -1,30 +1,115 @@
 #!/usr/bin/env python3
-"""Generate a daily macro + crypto markdown briefing."""
+"""Generate a daily macro + crypto markdown briefing.
+
+With --from-snapshots the quotes and headlines come from the dashboard/data snapshots the other
+updaters checked within --max-age-min (judged by file mtime, which snapshot_io bumps even when the
+content is unchanged), and only the missing or stale parts are fetched. The liquidity tables always
+read the FRED-backed entries in macro_snapshot.json, and US2Y is FRED DGS2 in both modes. The
+correlation closes and the Fear-Greed value only move once a day, so that mode reuses the copy in
+runtime/risk_inputs.json written earlier the same UTC day and otherwise refreshes just the last
+month of closes.
+"""
 
 from __future__ import annotations
 
 import argparse
 import json
 import math
+import os
 import pathlib
-import shutil
 import sys
-import urllib.error
+import time
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 try:
     from zoneinfo import ZoneInfo
 except ImportError:  # pragma: no cover
     ZoneInfo = None  # type: ignore
 
+import cassette
+import fred_store
+import http_cache
+import http_client
+import news_store
+import source_health
+import telemetry
+from fetch_stage import StageClock, log_timings, run_sources
+from risk_engine import RiskEngine, align_closes, log_returns
+from snapshot_io import read_json, write_atomic
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "dashboard" / "data"
 
 TIMEOUT_SEC = 10
-USER_AGENT = "project-mark-daily-brief/1.0"
+RUN_DEADLINE_SEC = 30
+QUOTE_CONCURRENCY = 6
+SNAPSHOT_MAX_AGE_MIN = 90
+RISK_INPUTS_PATH = pathlib.Path(os.environ.get("PROJECT_MARK_RISK_INPUTS") or ROOT / "runtime" / "risk_inputs.json")
+RISK_CLOSES_DAYS = 183  # the 6mo chart range fetch_risk_engine seeds from
+RISK_REFRESH_DAYS = 20  # cached closes at most this old are topped up with a 1mo chart
+
+INDEX_SYMBOLS = {
+    "S&P500": "^GSPC",
+    "NASDAQ": "^IXIC",
+    "DXY": "DX-Y.NYB",
+    "US10Y": "^TNX",
+    "VIX": "^VIX",
+}
+# Labels read from the FRED store instead of Yahoo (which has no 2-year yield), matching the
+# dashboard's macro_snapshot.json.
+FRED_INDEX_SERIES = {
+    "US2Y": "DGS2",
+}
+INDEX_LABELS = ("S&P500", "NASDAQ", "DXY", "US10Y", "US2Y", "VIX")
+COMMODITY_SYMBOLS = {
+    "GOLD": "GC=F",
+    "WTI": "CL=F",
+    "COPPER": "HG=F",
+}
+EQUITY_SYMBOLS = {
+    "AAPL": "AAPL",
+    "MSFT": "MSFT",
+    "NVDA": "NVDA",
+    "AMZN": "AMZN",
+    "META": "META",
+    "COIN": "COIN",
+    "MSTR": "MSTR",
+}
+CRYPTO_TICKERS = ("BTC", "ETH", "SOL", "XRP")
+NEWS_QUERIES = {
+    "macro": "US stocks OR treasury yields OR federal reserve when:1d",
+    "crypto": "bitcoin OR ethereum OR crypto regulation when:1d",
+}
+
+# Brief label -> (section, key) in macro_snapshot.json. "rates" deltas are absolute changes.
+SNAPSHOT_MACRO_KEYS = {
+    "S&P500": ("indices", "sp500"),
+    "NASDAQ": ("indices", "nasdaq"),
+    "DXY": ("fx", "dxy"),
+    "US10Y": ("rates", "us10y"),
+    "US2Y": ("rates", "us2y"),
+    "VIX": ("indices", "vix"),
+    "GOLD": ("commodities", "gold"),
+    "WTI": ("commodities", "wti"),
+    "COPPER": ("commodities", "copper"),
+}
+LIQUIDITY_KEYS = (("rates", "sofr"), ("rates", "iorb"), ("liquidity", "repo"), ("liquidity", "rrp"), ("liquidity", "tga"))
+SOFR_IORB_ALERT_BP = 5.0
+TGA_WEEKLY_ALERT_M = 50_000.0  # WTREGEN is in millions USD
+
+CORRELATION_SYMBOLS = {
+    "BTC": "BTC-USD",
+    "ETH": "ETH-USD",
+    "SOL": "SOL-USD",
+    "NASDAQ": "^IXIC",
+    "MSTR": "MSTR",
+}
+CORRELATION_PAIRS = (("BTC", "ETH"), ("BTC", "SOL"), ("BTC", "NASDAQ"), ("BTC", "MSTR"))
 
 
 @dataclass
@@ -36,35 +121,24 @@ class Quote:
 
 
 def _http_get(url: str) -> bytes:
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=TIMEOUT_SEC) as resp:
-        return resp.read()
+    return http_client.get(url, timeout=TIMEOUT_SEC).body
 
 
 def fetch_json(url: str) -> Optional[Dict[str, Any]]:
     try:
         raw = _http_get(url)
         return json.loads(raw.decode("utf-8"))
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, json.JSONDecodeError, UnicodeDecodeError):
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
         return None
 
 
-def fetch_rss(url: str) -> List[Dict[str, str]]:
+def fetch_rss(url: str, limit: int = 6) -> List[Dict[str, str]]:
     try:
-        raw = _http_get(url)
-        root = ET.fromstring(raw)
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, ET.ParseError):
+        resp = http_client.get(url, timeout=TIMEOUT_SEC)
+        return http_cache.parsed(resp, f"rss_items:{limit}", lambda: news_store.parse_rss(resp.body, limit))
+    except (OSError, ET.ParseError):
         return []
 
-    items: List[Dict[str, str]] = []
-    for item in root.findall(".//item")[:6]:
-        title = (item.findtext("title") or "").strip()
-        link = (item.findtext("link") or "").strip()
-        pub = (item.findtext("pubDate") or "").strip()
-        if title and link:
-            items.append({"title": title, "link": link, "pubDate": pub})
-    return items
-
 
 def fetch_yahoo_quote(yf_symbol: str, label: str) -> Quote:
     encoded = urllib.parse.quote(yf_symbol, safe="")
@@ -87,6 +161,156 @@ def fetch_yahoo_quote(yf_symbol: str, label: str) -> Quote:
         return Quote(symbol=label, price=None, change_pct=None, source="yahoo")
 
 
+def fetch_yahoo_batch(yf_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """One v7 /quote request for many symbols; returns raw quote dicts keyed by Yahoo symbol."""
+    joined = urllib.parse.quote(",".join(yf_symbols), safe=",")
+    data = fetch_json(f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={joined}")
+    if not data:
+        return {}
+    try:
+        results = data["quoteResponse"]["result"] or []
+    except (KeyError, TypeError):
+        return {}
+    return {item["symbol"]: item for item in results if isinstance(item, dict) and item.get("symbol")}
+
+
+def _quote_from_batch(item: Dict[str, Any], label: str) -> Optional[Quote]:
+    price = item.get("regularMarketPrice")
+    change = item.get("regularMarketChangePercent")
+    if not isinstance(price, (int, float)):
+        return None
+    return Quote(
+        symbol=label,
+        price=float(price),
+        change_pct=float(change) if isinstance(change, (int, float)) else None,
+        source="yahoo",
+    )
+
+
+def fetch_yahoo_quotes(symbol_map: Dict[str, str]) -> Dict[str, Quote]:
+    """Resolve {label: yahoo_symbol} with one batched request, then chart fallbacks for the gaps.
+
+    The per-symbol v8 /chart fallback runs with at most QUOTE_CONCURRENCY requests in flight.
+    """
+    started = time.monotonic()
+    batch = fetch_yahoo_batch(sorted(set(symbol_map.values())))
+    batch_ms = (time.monotonic() - started) * 1000.0
+
+    out: Dict[str, Quote] = {}
+    missing: Dict[str, str] = {}
+    for label, sym in symbol_map.items():
+        q = _quote_from_batch(batch[sym], label) if sym in batch else None
+        if q is None:
+            missing[label] = sym
+            continue
+        out[label] = q
+        print(f"quote: {label} ({sym}) batch {batch_ms:.0f}ms")
+
+    if missing:
+        results = run_sources(
+            {
+                label: (
+                    lambda s=sym, l=label: fetch_yahoo_quote(s, l),
+                    TIMEOUT_SEC,
+                    Quote(symbol=label, price=None, change_pct=None, source="yahoo"),
+                )
+                for label, sym in missing.items()
+            },
+            deadline_sec=RUN_DEADLINE_SEC,
+            max_workers=QUOTE_CONCURRENCY,
+        )
+        for label, r in results.items():
+            out[label] = r.value
+            status = "ok" if r.ok and r.value.price is not None else "n/a"
+            print(f"quote: {label} ({missing[label]}) chart {r.elapsed_ms:.0f}ms {status}")
+
+    return {label: out[label] for label in symbol_map}
+
+
+def fetch_yahoo_closes(yf_symbol: str, range_: str = "6mo") -> Dict[str, float]:
+    """Daily closes keyed by UTC date (YYYY-MM-DD) from the v8 chart endpoint."""
+    encoded = urllib.parse.quote(yf_symbol, safe="")
+    data = fetch_json(f"https://query1.finance.yahoo.com/v8/finance/chart/{encoded}?range={range_}&interval=1d")
+    if not data:
+        return {}
+    try:
+        result = data["chart"]["result"][0]
+        stamps = result["timestamp"]
+        closes = result["indicators"]["quote"][0]["close"]
+    except (KeyError, IndexError, TypeError):
+        return {}
+    out: Dict[str, float] = {}
+    for ts, close in zip(stamps, closes):
+        if isinstance(ts, (int, float)) and isinstance(close, (int, float)):
+            out[datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")] = float(close)
+    return out
+
+
+def fetch_risk_closes(cached: Optional[Dict[str, Dict[str, float]]] = None, today: Optional[date] = None) -> Dict[str, Dict[str, float]]:
+    """Daily closes per CORRELATION_SYMBOLS label for the last RISK_CLOSES_DAYS.
+
+    A label with recent `cached` closes only fetches the last month and merges it in; a label whose
+    fetch comes back empty is returned empty rather than with the old closes.
+    """
+    cached = cached or {}
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = (today - timedelta(days=RISK_CLOSES_DAYS)).isoformat()
+
+    def fetch(label: str, sym: str) -> Dict[str, float]:
+        prev = cached.get(label) or {}
+        recent = bool(prev) and (today - date.fromisoformat(max(prev))).days <= RISK_REFRESH_DAYS
+        fresh = fetch_yahoo_closes(sym, "1mo" if recent else "6mo")
+        if not fresh:
+            return {}
+        merged = {**prev, **fresh} if recent else fresh
+        return {d: v for d, v in sorted(merged.items()) if d >= cutoff}
+
+    results = run_sources(
+        {label: (lambda l=label, s=sym: fetch(l, s), TIMEOUT_SEC, {}) for label, sym in CORRELATION_SYMBOLS.items()},
+        deadline_sec=RUN_DEADLINE_SEC,
+        max_workers=QUOTE_CONCURRENCY,
+    )
+    return {label: r.value for label, r in results.items()}
+
+
+def build_risk_engine(closes: Dict[str, Dict[str, float]]) -> Optional[RiskEngine]:
+    """Seed a RiskEngine with aligned daily log returns for CORRELATION_SYMBOLS."""
+    if not all(closes.get(label) for label in CORRELATION_SYMBOLS):
+        return None
+    _, rows = align_closes({label: closes[label] for label in CORRELATION_SYMBOLS})
+    returns = log_returns(rows)
+    if len(returns) < 2:
+        return None
+    engine = RiskEngine(list(CORRELATION_SYMBOLS))
+    engine.seed(returns)
+    return engine
+
+
+def fetch_risk_engine() -> Optional[RiskEngine]:
+    return build_risk_engine(fetch_risk_closes())
+
+
+def load_risk_inputs(now: datetime) -> Tuple[Dict[str, Any], bool]:
+    """(cached risk inputs, whether they were written on the current UTC day).
+
+    The payload is {"date", "closes": {label: {YYYY-MM-DD: close}}, "fear_greed"}; {} if missing.
+    """
+    cached = read_json(RISK_INPUTS_PATH, None)
+    if not isinstance(cached, dict) or not isinstance(cached.get("closes"), dict):
+        return {}, False
+    fresh = cached.get("date") == now.astimezone(timezone.utc).strftime("%Y-%m-%d")
+    print(f"snapshot: {RISK_INPUTS_PATH.name} from {cached.get('date') or 'n/a'}{'' if fresh else ' (stale, refetching)'}")
+    return cached, fresh
+
+
+def save_risk_inputs(now: datetime, closes: Dict[str, Dict[str, float]], fear_greed: Optional[float]) -> None:
+    payload = {"date": now.astimezone(timezone.utc).strftime("%Y-%m-%d"), "closes": closes, "fear_greed": fear_greed}
+    try:
+        write_atomic(RISK_INPUTS_PATH, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    except OSError as e:
+        print(f"warn: could not save {RISK_INPUTS_PATH} ({e})")
+
+
 def fetch_coingecko_prices() -> Dict[str, Quote]:
     ids = "bitcoin,ethereum,solana,ripple"
     url = (
@@ -119,6 +343,20 @@ def fetch_coingecko_prices() -> Dict[str, Quote]:
     return out
 
 
+def fetch_fred_quote(label: str, series_id: str) -> Optional[Quote]:
+    """Latest observation from the local FRED store after an incremental update; change vs the previous one."""
+    store = fred_store.open_series(series_id)
+    try:
+        store.update(timeout=TIMEOUT_SEC)
+    except Exception as e:
+        print(f"warn: fred {series_id} update failed ({e}); using stored observations")
+    value, delta = store.latest()
+    if value is None:
+        return None
+    change = delta / (value - delta) * 100.0 if delta is not None and value != delta else None
+    return Quote(symbol=label, price=value, change_pct=change, source="fred")
+
+
 def fetch_fear_greed() -> Optional[float]:
     data = fetch_json("https://api.alternative.me/fng/?limit=1&format=json")
     if not data:
@@ -130,12 +368,101 @@ def fetch_fear_greed() -> Optional[float]:
         return None
 
 
+def _num(v: Any) -> Optional[float]:
+    return float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) else None
+
+
+def snapshot_age_min(path: pathlib.Path, now: datetime) -> Optional[float]:
+    """Minutes since an updater last wrote or confirmed `path` (its mtime); None if missing.
+
+    The as_of/updated_at stamps inside a snapshot only move when its content changes, so they
+    can't tell an unchanged snapshot (e.g. US equities after the close) from an abandoned one.
+    """
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    return (now.timestamp() - mtime) / 60.0
+
+
+def _read_snapshot(name: str, now: datetime, max_age_min: float) -> Optional[Dict[str, Any]]:
+    payload = read_json(DATA_DIR / name, None)
+    if not isinstance(payload, dict):
+        return None
+    age = snapshot_age_min(DATA_DIR / name, now)
+    fresh = age is not None and age <= max_age_min
+    print(f"snapshot: {name} {'n/a' if age is None else f'{age:.0f}min old'}{'' if fresh else ' (stale, refetching)'}")
+    return payload if fresh else None
+
+
+def load_snapshot_inputs(now: datetime, max_age_min: float) -> Tuple[Dict[str, Quote], Dict[str, List[Dict[str, str]]]]:
+    """Quotes and news buckets from the dashboard snapshots written within `max_age_min`.
+
+    Labels without a usable value are left out, so the caller fetches exactly those.
+    """
+    quotes: Dict[str, Quote] = {}
+    macro = _read_snapshot("macro_snapshot.json", now, max_age_min)
+    if macro:
+        for label, (section, key) in SNAPSHOT_MACRO_KEYS.items():
+            entry = (macro.get(section) or {}).get(key) or {}
+            value, delta = _num(entry.get("value")), _num(entry.get("delta"))
+            if value is None:
+                continue
+            if section == "rates" and delta is not None:
+                delta = delta / (value - delta) * 100.0 if value != delta else None
+            quotes[label] = Quote(symbol=label, price=value, change_pct=delta, source="snapshot")
+
+    stocks = _read_snapshot("stocks_watchlist.json", now, max_age_min)
+    if stocks:
+        rows = {r.get("ticker"): r for r in stocks.get("rows") or [] if isinstance(r, dict)}
+        for label, ticker in EQUITY_SYMBOLS.items():
+            price = _num((rows.get(ticker) or {}).get("price"))
+            if price is not None:
+                quotes[label] = Quote(symbol=label, price=price, change_pct=_num(rows[ticker].get("change")), source="snapshot")
+
+    crypto = _read_snapshot("crypto_top20.json", now, max_age_min)
+    if crypto:
+        assets = {a.get("symbol"): a for a in crypto.get("assets") or [] if isinstance(a, dict)}
+        for ticker in CRYPTO_TICKERS:
+            price = _num((assets.get(ticker) or {}).get("price_usd"))
+            if price is not None:
+                quotes[ticker] = Quote(symbol=ticker, price=price, change_pct=_num(assets[ticker].get("pct_24h")), source="snapshot")
+
+    news: Dict[str, List[Dict[str, str]]] = {}
+    feed = _read_snapshot("news.json", now, max_age_min)
+    if feed:
+        for bucket in NEWS_QUERIES:
+            items = [n for n in feed.get(bucket) or [] if isinstance(n, dict) and n.get("title") and n.get("link")]
+            if items:
+                news[bucket] = items[:3]
+    return quotes, news
+
+
+def load_liquidity() -> Dict[str, Any]:
+    """SOFR/IORB/REPO/RRP/TGA entries from macro_snapshot.json, whatever their age (FRED is daily/weekly)."""
+    macro = read_json(DATA_DIR / "macro_snapshot.json", None)
+    if not isinstance(macro, dict):
+        return {}
+    out: Dict[str, Any] = {"as_of": macro.get("as_of")}
+    for section, key in LIQUIDITY_KEYS:
+        entry = (macro.get(section) or {}).get(key)
+        if isinstance(entry, dict) and _num(entry.get("value")) is not None:
+            out[key] = entry
+    return out
+
+
 def fmt_price(v: Optional[float], digits: int = 2) -> str:
     if v is None or math.isnan(v):
         return "n/a"
     return f"{v:,.{digits}f}"
 
 
+def fmt_delta(v: Optional[float], digits: int = 2) -> str:
+    if v is None or math.isnan(v):
+        return "n/a"
+    return f"{v:+,.{digits}f}"
+
+
 def fmt_pct(v: Optional[float]) -> str:
     if v is None or math.isnan(v):
         return "n/a"
@@ -176,10 +503,36 @@ def score_sentiment(fear_greed: Optional[float]) -> int:
     return 0
 
 
+def _liq(liquidity: Dict[str, Any], key: str) -> Tuple[Optional[float], Optional[float], str]:
+    entry = liquidity.get(key) or {}
+    value = _num(entry.get("value"))
+    return value, _num(entry.get("delta")), entry.get("display") or fmt_price(value)
+
+
+def liquidity_signals(liquidity: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """(SOFR-IORB spread in bp, TGA change over a week in USD m) from load_liquidity() output."""
+    sofr, iorb = _liq(liquidity, "sofr")[0], _liq(liquidity, "iorb")[0]
+    spread_bp = (sofr - iorb) * 100.0 if sofr is not None and iorb is not None else None
+    tga = liquidity.get("tga") or {}
+    tga_week = _num(tga.get("delta_1w"))
+    if tga_week is None:
+        tga_week = _num(tga.get("delta"))
+    return spread_bp, tga_week
+
+
+def score_flow(spread_bp: Optional[float], tga_week: Optional[float]) -> int:
+    points = 0
+    if spread_bp is not None and spread_bp > 0:
+        points -= 1
+    if tga_week is not None and abs(tga_week) >= TGA_WEEKLY_ALERT_M:
+        points += -1 if tga_week > 0 else 1
+    return max(-1, min(1, points))
+
+
 def build_news_bucket(query: str) -> List[Dict[str, str]]:
     encoded_q = urllib.parse.quote(query)
     rss_url = f"https://news.google.com/rss/search?q={encoded_q}&hl=en-US&gl=US&ceid=US:en"
-    return fetch_rss(rss_url)[:3]
+    return fetch_rss(rss_url, limit=3)
 
 
 def ensure_tz(name: str):
@@ -188,6 +541,28 @@ def ensure_tz(name: str):
     return ZoneInfo(name)
 
 
+def integrity_lines(integrity: Optional[Dict[str, Any]], macro_news: List[Dict[str, str]], crypto_news: List[Dict[str, str]]) -> List[str]:
+    """Run Integrity bullets from a telemetry run summary."""
+    if not integrity:
+        return ["- Fetch: n/a", f"- News: macro {len(macro_news)} · crypto {len(crypto_news)}"]
+    sources = integrity.get("sources") or {}
+    totals = integrity.get("totals") or {}
+    top = {name: s for name, s in sources.items() if "/" not in name}
+    failed = [f"{name} ({(s.get('error') or 'failed').split(' (')[0]})" for name, s in top.items() if not s.get("ok")]
+    out = [f"- Fetch: {len(top) - len(failed)}/{len(top)} sources ok" + (f" · failed: {', '.join(failed)}" if failed else "")]
+    out.append(f"- News: macro {len(macro_news)} · crypto {len(crypto_news)}")
+    missing = integrity.get("missing") or []
+    n = totals.get("symbols", 0)
+    out.append(f"- Data: {n - len(missing)}/{n} live" + (f" · missing: {', '.join(missing[:8])}" if missing else ""))
+    slowest = max(top.items(), key=lambda kv: kv[1].get("elapsed_ms", 0.0), default=None)
+    out.append(
+        f"- Requests: {totals.get('requests', 0)} · {totals.get('bytes', 0) / 1024:.0f} KiB · "
+        f"retries {totals.get('retries', 0)} · cache hits {totals.get('cache_hits', 0)}"
+        + (f" · slowest {slowest[0]} {slowest[1].get('elapsed_ms', 0.0):.0f}ms" if slowest else "")
+    )
+    return out
+
+
 def render_markdown(
     now_kst: datetime,
     indices: Dict[str, Quote],
@@ -197,6 +572,11 @@ def render_markdown(
     macro_news: List[Dict[str, str]],
     crypto_news: List[Dict[str, str]],
     fear_greed: Optional[float],
+    risk: Optional[RiskEngine] = None,
+    integrity: Optional[Dict[str, Any]] = None,
+    escalations: Optional[List[Dict[str, Any]]] = None,
+    liquidity: Optional[Dict[str, Any]] = None,
+    run_mode: str = "full",
 ) -> str:
     direction = score_direction(indices["S&P500"].change_pct, indices["NASDAQ"].change_pct, indices["DXY"].change_pct)
     vol = score_vol(indices["VIX"].change_pct, crypto["ETH"].change_pct)
@@ -220,6 +600,37 @@ def render_markdown(
     sol = crypto["SOL"]
     xrp = crypto["XRP"]
 
+    liquidity = liquidity or {}
+    sofr, sofr_d, sofr_txt = _liq(liquidity, "sofr")
+    iorb, iorb_d, iorb_txt = _liq(liquidity, "iorb")
+    repo, repo_d, repo_txt = _liq(liquidity, "repo")
+    rrp, rrp_d, rrp_txt = _liq(liquidity, "rrp")
+    tga, _, tga_txt = _liq(liquidity, "tga")
+    spread_bp, tga_week = liquidity_signals(liquidity)
+    flow = score_flow(spread_bp, tga_week)
+
+    if sofr is None:
+        sofr_state = "미연결"
+    elif spread_bp is None:
+        sofr_state = "연결"
+    else:
+        sofr_state = "IORB 상회 (자금 압박)" if spread_bp > 0 else "IORB 이하 (안정)"
+    repo_state = "미연결" if repo is None else ("상설레포 이용 발생" if repo > 0 else "이용 없음")
+    if rrp is None:
+        rrp_state = "미연결"
+    else:
+        rrp_state = "잔고 감소 (유동성 방출)" if (rrp_d or 0) < 0 else ("잔고 증가 (유동성 흡수)" if (rrp_d or 0) > 0 else "보합")
+    if tga is None:
+        tga_state = "미연결"
+    else:
+        tga_state = "증가 (유동성 흡수)" if (tga_week or 0) > 0 else ("감소 (유동성 공급)" if (tga_week or 0) < 0 else "보합")
+    if spread_bp is None:
+        spread_alert = "n/a"
+    else:
+        spread_alert = "경계" if spread_bp >= SOFR_IORB_ALERT_BP else ("주의" if spread_bp > 0 else "보합")
+    tga_alert = "보합" if tga_week is None or abs(tga_week) < TGA_WEEKLY_ALERT_M else ("경계" if tga_week > 0 else "완화")
+    rrp_alert = "보합" if not rrp_d else ("감소" if rrp_d < 0 else "증가")
+
     lines: List[str] = []
     lines.append(f"# 🏦 Daily Auto Briefing ({now_kst.strftime('%Y-%m-%d %H:%M %Z')})")
     lines.append("")
@@ -237,11 +648,9 @@ def render_markdown(
     lines.append("")
     lines.append("### ✅ Run Integrity")
     lines.append(f"- Run Time (KST): {now_kst.strftime('%Y-%m-%d %H:%M %Z')}")
-    lines.append("- Run Mode: full")
+    lines.append(f"- Run Mode: {run_mode}")
     lines.append("- Today Mode: Decision Engine (KST 고정)")
-    lines.append("- Fetch: success")
-    lines.append("- News: success")
-    lines.append("- Macro: success")
+    lines.extend(integrity_lines(integrity, macro_news, crypto_news))
     lines.append("- Render: success")
     lines.append("- Upload: local")
     lines.append("")
@@ -256,35 +665,41 @@ def render_markdown(
     lines.append(f"- 변동성: {vol:+d} (VIX Δ {fmt_pct(vix.change_pct)} · ETH 24h {fmt_pct(eth.change_pct)})")
     lines.append(f"- 심리: {sentiment:+d} (Fear-Greed {fmt_price(fear_greed, 0)})")
     lines.append("- 포지셔닝: +0 (L/S 데이터 소스 미연결)")
-    lines.append("- 자금 흐름: +0 (SOFR/IORB/RRP/TGA 소스 미연결)")
+    if liquidity:
+        spread_txt = "n/a" if spread_bp is None else f"{spread_bp:+.0f}bp"
+        lines.append(f"- 자금 흐름: {flow:+d} (SOFR–IORB {spread_txt} · TGA 주간 Δ {fmt_delta(tga_week, 0)})")
+    else:
+        lines.append("- 자금 흐름: +0 (SOFR/IORB/RRP/TGA 소스 미연결)")
     lines.append(f"- Net Bias (합산): {net_bias:+.2f}")
     lines.append("- 금지: 편향된 한 방향 추종")
     lines.append("- 허용: 중립/양방향 대비")
     lines.append("")
     lines.append("### 1️⃣ Liquidity & QE 체크리스트")
+    if liquidity.get("as_of"):
+        lines.append(f"기준: {liquidity['as_of']} (FRED)")
     lines.append("#### 1-1. 단기 금리 / 기준금리")
     lines.append("| 항목 | 현재 | Δ | 상태 |")
     lines.append("| ---- | ---- | ---- | ---- |")
-    lines.append("| SOFR | n/a | n/a | 미연결 |")
-    lines.append("| IORB | n/a | n/a | 미연결 |")
+    lines.append(f"| SOFR | {sofr_txt} | {fmt_delta(sofr_d)} | {sofr_state} |")
+    lines.append(f"| IORB | {iorb_txt} | {fmt_delta(iorb_d)} | {'기준' if iorb is not None else '미연결'} |")
     lines.append("")
     lines.append("#### 1-2. 레포 / 연준 유동성 운영")
     lines.append("| 항목 | 현재 | Δ | 판단 |")
     lines.append("| ---- | ---- | ---- | ---- |")
-    lines.append("| REPO | n/a | n/a | 미연결 |")
-    lines.append("| RRP | n/a | n/a | 미연결 |")
+    lines.append(f"| REPO | {repo_txt} | {fmt_delta(repo_d, 3)} | {repo_state} |")
+    lines.append(f"| RRP | {rrp_txt} | {fmt_delta(rrp_d)} | {rrp_state} |")
     lines.append("")
     lines.append("#### 1-3. 미 재무부 일반계정(TGA)")
     lines.append("| 항목 | 현재 | 주간 Δ | 해석 |")
     lines.append("| ---- | ---- | ---- | ---- |")
-    lines.append("| TGA | n/a | n/a | 미연결 |")
+    lines.append(f"| TGA | {tga_txt} | {fmt_delta(tga_week, 0)} | {tga_state} |")
     lines.append("")
     lines.append("#### 1-4. Alert Rules")
     lines.append("| 항목 | 현재 판정 | 지표 | 설명 |")
     lines.append("| ---- | ---- | ---- | ---- |")
-    lines.append("| SOFR–IORB | 보합 | n/a | 스프레드 |")
-    lines.append("| RRP | 보합 | n/a | 차액 Δ |")
-    lines.append("| TGA | 보합 | n/a | 주간 변화 |")
+    lines.append(f"| SOFR–IORB | {spread_alert} | {'n/a' if spread_bp is None else f'{spread_bp:+.0f}bp'} | 스프레드 |")
+    lines.append(f"| RRP | {rrp_alert} | {fmt_delta(rrp_d)} | 차액 Δ |")
+    lines.append(f"| TGA | {tga_alert} | {fmt_delta(tga_week, 0)} | 주간 변화 |")
     lines.append("")
     lines.append("### 2️⃣ 오늘의 거시 포커스")
     lines.append(f"• 핵심 이벤트: {focus_event}")
@@ -298,13 +713,21 @@ def render_markdown(
     lines.append(f"  - DXY 추세: {fmt_price(dxy.price)} ({fmt_pct(dxy.change_pct)})")
     lines.append(f"  - US10Y 추세: {fmt_price(us10y.price)} ({fmt_pct(us10y.change_pct)})")
     lines.append(f"  - VIX 레벨/변화율: {fmt_price(vix.price)} ({fmt_pct(vix.change_pct)})")
-    lines.append("  - 위험자산 동행성 (BTC vs NASDAQ): n/a (상관 데이터 미연결)")
+    if risk is not None:
+        beta = risk.stats[30].beta("NASDAQ")["BTC"] if risk.ready(30) else None
+        lines.append(
+            "  - 위험자산 동행성 (BTC vs NASDAQ): "
+            + " · ".join(f"{w}d {fmt_price(risk.corr(w, 'BTC', 'NASDAQ'))}" for w in risk.stats)
+            + f" · β(30d) {fmt_price(beta)}"
+        )
+    else:
+        lines.append("  - 위험자산 동행성 (BTC vs NASDAQ): n/a (상관 데이터 미연결)")
     lines.append("")
     lines.append("### 3️⃣ 시장 랩 (전일 미국 정규장 종가 기준)")
     lines.append("#### 3-1. 지수 · 금리 · 환율 · 원자재")
     lines.append("| Item | Price | Change |")
     lines.append("| --- | ---: | ---: |")
-    for key in ("S&P500", "NASDAQ", "DXY", "US10Y", "US2Y", "VIX"):
+    for key in INDEX_LABELS:
         q = indices[key]
         lines.append(f"| {key} | {fmt_price(q.price)} | {fmt_pct(q.change_pct)} |")
     for key in ("GOLD", "WTI", "COPPER"):
@@ -345,7 +768,18 @@ def render_markdown(
     lines.append("")
     lines.append("### 7️⃣ Volatility & Correlation")
     lines.append("- BTC-ETH IV Spread: n/a (옵션 IV 소스 미연결)")
-    lines.append("- Correlations: BTC/ETH n/a · BTC/SOL n/a · BTC/NASDAQ n/a · BTC/MSTR n/a")
+    if risk is not None:
+        lines.append(
+            "- Correlations (30d): "
+            + " · ".join(f"{a}/{b} {fmt_price(risk.corr(30, a, b))}" for a, b in CORRELATION_PAIRS)
+        )
+        vols = risk.stats[30].realized_vol() if risk.ready(30) else {}
+        lines.append(
+            "- Realized Vol (30d, ann.): "
+            + " · ".join(f"{a} {fmt_price(vols[a] * 100.0, 1) + '%' if vols.get(a) is not None else 'n/a'}" for a in risk.assets)
+        )
+    else:
+        lines.append("- Correlations: BTC/ETH n/a · BTC/SOL n/a · BTC/NASDAQ n/a · BTC/MSTR n/a")
     lines.append("")
     lines.append("### 8️⃣ 시그널 요약 (압축)")
     lines.append(f"• 오늘 결론(1줄): {stance}. 레인지 대응 + 보수적 사이징 우선.")
@@ -365,9 +799,21 @@ def render_markdown(
     lines.append("- 붕괴 시 전략 변경: 방향성 포지션 축소 + 헤지 비중 확대")
     lines.append("")
     lines.append("### 11️⃣ 메모")
-    lines.append("- 데이터 소스 상태: warnings=0 · fetch_errors=0")
+    totals = (integrity or {}).get("totals") or {}
+    if integrity:
+        lines.append(f"- 데이터 소스 상태: warnings={totals.get('missing', 0)} · fetch_errors={totals.get('failed_sources', 0)}")
+    else:
+        lines.append("- 데이터 소스 상태: n/a")
+    missing_alerts = [e for e in escalations or [] if e.get("rule") == telemetry.MISSING_RATE_RULE]
+    latency_alerts = [e for e in escalations or [] if e.get("rule") == telemetry.LATENCY_RULE]
+    if missing_alerts:
+        flagged = ", ".join(f"{e.get('symbol')} {(e.get('missing_rate') or 0.0) * 100:.1f}%" for e in missing_alerts[:6])
+        lines.append(f"- 결측률 경보 ({telemetry.MISSING_RATE_RULE}): {flagged}")
+    if latency_alerts:
+        flagged = ", ".join(f"{e.get('source')} {e.get('request_ms_mean') or 0.0:.0f}ms" for e in latency_alerts[:6])
+        lines.append(f"- 지연 경보 ({telemetry.LATENCY_RULE}): {flagged}")
     lines.append(f"- focus_event: {focus_event}")
-    lines.append(f"- run_mode: full (run_ts: {now_kst.strftime('%Y-%m-%d %H:%M %Z')})")
+    lines.append(f"- run_mode: {run_mode} (run_ts: {now_kst.strftime('%Y-%m-%d %H:%M %Z')})")
     lines.append("")
     lines.append("---")
     lines.append("")
@@ -391,46 +837,94 @@ def render_markdown(
     return "\n".join(lines)
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Generate daily macro+crypto briefing markdown.")
     parser.add_argument("--output-dir", default="reports", help="Directory where reports are written.")
     parser.add_argument("--timezone", default="Asia/Seoul", help="Timezone for report timestamp.")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--from-snapshots",
+        action="store_true",
+        help="Take quotes and news from dashboard/data snapshots; fetch only what is missing or stale.",
+    )
+    parser.add_argument(
+        "--max-age-min",
+        type=float,
+        default=SNAPSHOT_MAX_AGE_MIN,
+        help="Snapshots older than this many minutes are refetched (with --from-snapshots).",
+    )
+    cassette.add_arguments(parser)
+    args = parser.parse_args(argv)
+    cassette.apply(args)
 
     tz = ensure_tz(args.timezone)
     now = datetime.now(tz)
-
-    index_symbols = {
-        "S&P500": "^GSPC",
-        "NASDAQ": "^IXIC",
-        "DXY": "DX-Y.NYB",
-        "US10Y": "^TNX",
-        "US2Y": "^IRX",
-        "VIX": "^VIX",
-    }
-    commodity_symbols = {
-        "GOLD": "GC=F",
-        "WTI": "CL=F",
-        "COPPER": "HG=F",
+    telemetry.start_run("daily_brief")
+    clock = StageClock()
+
+    snap_quotes: Dict[str, Quote] = {}
+    snap_news: Dict[str, List[Dict[str, str]]] = {}
+    risk_inputs: Dict[str, Any] = {}
+    risk_fresh = False
+    if args.from_snapshots:
+        snap_quotes, snap_news = load_snapshot_inputs(now, args.max_age_min)
+        risk_inputs, risk_fresh = load_risk_inputs(now)
+    yahoo_symbols = {
+        label: sym
+        for label, sym in {**INDEX_SYMBOLS, **COMMODITY_SYMBOLS, **EQUITY_SYMBOLS}.items()
+        if label not in snap_quotes
     }
-    equity_symbols = {
-        "AAPL": "AAPL",
-        "MSFT": "MSFT",
-        "NVDA": "NVDA",
-        "AMZN": "AMZN",
-        "META": "META",
-        "COIN": "COIN",
-        "MSTR": "MSTR",
-    }
-
-    indices = {name: fetch_yahoo_quote(sym, name) for name, sym in index_symbols.items()}
-    commodities = {name: fetch_yahoo_quote(sym, name) for name, sym in commodity_symbols.items()}
-    equities = {name: fetch_yahoo_quote(sym, name) for name, sym in equity_symbols.items()}
-    crypto = fetch_coingecko_prices()
-    fear_greed = fetch_fear_greed()
 
-    macro_news = build_news_bucket("US stocks OR treasury yields OR federal reserve when:1d")
-    crypto_news = build_news_bucket("bitcoin OR ethereum OR crypto regulation when:1d")
+    sources: Dict[str, Any] = {}
+    if yahoo_symbols:
+        sources["yahoo"] = (lambda: fetch_yahoo_quotes(yahoo_symbols), RUN_DEADLINE_SEC, {})
+    if any(t not in snap_quotes for t in CRYPTO_TICKERS):
+        sources["coingecko"] = (fetch_coingecko_prices, TIMEOUT_SEC, {})
+    for label, series_id in FRED_INDEX_SERIES.items():
+        if label not in snap_quotes:
+            sources[f"fred:{label}"] = (lambda l=label, sid=series_id: fetch_fred_quote(l, sid), TIMEOUT_SEC, None)
+    if not (risk_fresh and risk_inputs.get("fear_greed") is not None):
+        sources["fear-greed"] = (fetch_fear_greed, TIMEOUT_SEC, None)
+    for bucket, query in NEWS_QUERIES.items():
+        if bucket not in snap_news:
+            sources[f"news:{bucket}"] = (lambda q=query: build_news_bucket(q), TIMEOUT_SEC, [])
+    risk = build_risk_engine(risk_inputs["closes"]) if risk_fresh else None
+    if risk is None:
+        sources["risk"] = (lambda: fetch_risk_closes(risk_inputs.get("closes")), RUN_DEADLINE_SEC, {})
+    run_mode = "full"
+    if args.from_snapshots:
+        print(f"snapshot: {len(snap_quotes)} quotes, news {sorted(snap_news)} from local data; fetching {', '.join(sources) or 'nothing'}")
+        run_mode = f"snapshots (fetched: {', '.join(sources)})" if sources else "snapshots (no network)"
+
+    results = run_sources(sources, deadline_sec=RUN_DEADLINE_SEC)
+    log_timings(results)
+    liquidity = load_liquidity()
+    clock.lap("fetch")
+
+    def pick_quotes(symbols: Iterable[str], fetched: Dict[str, Quote], source: str) -> Dict[str, Quote]:
+        return {name: fetched.get(name) or Quote(symbol=name, price=None, change_pct=None, source=source) for name in symbols}
+
+    quotes = {**(results["yahoo"].value if "yahoo" in results else {}), **snap_quotes}
+    for label in FRED_INDEX_SERIES:
+        if f"fred:{label}" in results and results[f"fred:{label}"].value is not None:
+            quotes[label] = results[f"fred:{label}"].value
+    indices = pick_quotes(INDEX_LABELS, quotes, "yahoo")
+    commodities = pick_quotes(COMMODITY_SYMBOLS, quotes, "yahoo")
+    equities = pick_quotes(EQUITY_SYMBOLS, quotes, "yahoo")
+    crypto = pick_quotes(CRYPTO_TICKERS, {**(results["coingecko"].value if "coingecko" in results else {}), **snap_quotes}, "coingecko")
+    fear_greed = results["fear-greed"].value if "fear-greed" in results else risk_inputs.get("fear_greed")
+    if "risk" in results:
+        risk = build_risk_engine(results["risk"].value)
+        if risk is not None:
+            save_risk_inputs(now, results["risk"].value, fear_greed)
+    macro_news = snap_news.get("macro") or results["news:macro"].value
+    crypto_news = snap_news.get("crypto") or results["news:crypto"].value
+    for group in (indices, commodities, equities, crypto):
+        for label, q in group.items():
+            telemetry.observe(label, q.price is not None)
+    telemetry.observe("fear_greed", fear_greed is not None)
+    telemetry.observe("news:macro", bool(macro_news))
+    telemetry.observe("news:crypto", bool(crypto_news))
+    telemetry.observe("risk", risk is not None)
 
     doc = render_markdown(
         now_kst=now,
@@ -441,18 +935,29 @@ def main() -> int:
         macro_news=macro_news,
         crypto_news=crypto_news,
         fear_greed=fear_greed,
+        risk=risk,
+        integrity=telemetry.snapshot(),
+        escalations=telemetry.read_report().get("escalations"),
+        liquidity=liquidity,
+        run_mode=run_mode,
     )
+    clock.lap("render")
 
     out_dir = pathlib.Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     stamp = now.strftime("%Y-%m-%d")
     out_path = out_dir / f"daily_auto_briefing_{stamp}.md"
     latest_path = out_dir / "daily_auto_briefing_latest.md"
-    out_path.write_text(doc + "\n", encoding="utf-8")
-    shutil.copyfile(out_path, latest_path)
+    data = (doc + "\n").encode("utf-8")
+    write_atomic(out_path, data)
+    write_atomic(latest_path, data)
+    clock.lap("write")
+    telemetry.finish_run()
+    source_health.flush()
 
     print(f"Wrote {out_path}")
     print(f"Updated {latest_path}")
+    http_client.log_stats()
     return 0
 
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Per-issuer, per-day spot ETF flow history with O(1) rolling aggregates.
+
+For each asset (btc/eth) the store keeps:
+  pipelines/store/etf/<asset>_flows.csv    append-only `date,issuer,flow_usd_m` rows (TOTAL included)
+  pipelines/store/etf/<asset>_state.json   watermark date plus, per issuer, the last 60 flows,
+                                           5/20/60-day running sums and the current streak
+
+Only rows newer than the watermark are ingested, and each new day updates every running sum by
+adding the new flow and subtracting the one that left the window.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import pathlib
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STORE_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_ETF_STORE_DIR") or ROOT / "pipelines" / "store" / "etf")
+
+WINDOWS = (5, 20, 60)
+TOTAL = "TOTAL"
+
+# (ISO date, {issuer: flow in USD m or None}, TOTAL flow)
+FlowRow = Tuple[str, Dict[str, Optional[float]], float]
+
+
+class RollingFlow:
+    def __init__(self, values: Optional[List[float]] = None, streak: int = 0):
+        self.values: Deque[float] = deque(maxlen=max(WINDOWS))
+        self.sums = {w: 0.0 for w in WINDOWS}
+        self.streak = streak
+        for v in values or []:
+            self._add(v)
+
+    def _add(self, v: float) -> None:
+        n = len(self.values)
+        for w in WINDOWS:
+            if n >= w:
+                self.sums[w] -= self.values[-w]
+            self.sums[w] += v
+        self.values.append(v)
+
+    def push(self, v: float) -> None:
+        self._add(v)
+        if v > 0:
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+        elif v < 0:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+        else:
+            self.streak = 0
+
+    def summary(self) -> Dict[str, object]:
+        out: Dict[str, object] = {"latest": self.values[-1] if self.values else None}
+        for w in WINDOWS:
+            out[f"sum_{w}d"] = round(self.sums[w], 1) if len(self.values) >= w else None
+        out["streak"] = self.streak
+        return out
+
+    def to_json(self) -> Dict[str, object]:
+        return {"values": list(self.values), "streak": self.streak}
+
+
+class EtfFlowStore:
+    def __init__(self, asset: str):
+        self.asset = asset
+        self.csv_path = STORE_DIR / f"{asset}_flows.csv"
+        self.state_path = STORE_DIR / f"{asset}_state.json"
+        self.watermark: Optional[str] = None
+        self.series: Dict[str, RollingFlow] = {}
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        self.watermark = state.get("watermark")
+        for issuer, s in (state.get("series") or {}).items():
+            self.series[issuer] = RollingFlow(s.get("values"), int(s.get("streak") or 0))
+
+    def ingest(self, rows: List[FlowRow]) -> int:
+        """Append rows dated after the watermark (in date order); returns how many days were added."""
+        new_rows = sorted((r for r in rows if self.watermark is None or r[0] > self.watermark), key=lambda r: r[0])
+        if not new_rows:
+            return 0
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        is_new = not self.csv_path.exists()
+        with self.csv_path.open("a", encoding="utf-8", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            if is_new:
+                w.writerow(["date", "issuer", "flow_usd_m"])
+            for day, issuers, total in new_rows:
+                for issuer, flow in issuers.items():
+                    if flow is not None:
+                        w.writerow([day, issuer, flow])
+                w.writerow([day, TOTAL, total])
+                # Issuers seen before but blank today count as zero flow for the day.
+                for issuer in set(self.series) | set(issuers) | {TOTAL}:
+                    flow = total if issuer == TOTAL else issuers.get(issuer)
+                    self.series.setdefault(issuer, RollingFlow()).push(flow or 0.0)
+                self.watermark = day
+        self._save_state()
+        return len(new_rows)
+
+    def _save_state(self) -> None:
+        state = {
+            "asset": self.asset,
+            "watermark": self.watermark,
+            "series": {k: v.to_json() for k, v in sorted(self.series.items())},
+        }
+        tmp = self.state_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def aggregates(self) -> Dict[str, object]:
+        total = self.series.get(TOTAL)
+        return {
+            "through": self.watermark,
+            "total": total.summary() if total else None,
+            "issuers": {k: v.summary() for k, v in sorted(self.series.items()) if k != TOTAL},
+        }
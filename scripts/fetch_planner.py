@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Decide, before a run, which sources could possibly have new data.
+
+Market quotes are due while their venue's session is open (plus SETTLE_MIN for the closing
+print) and once more after a session ends if the last fetch was before that. FRED series are due
+once the next expected observation (from the series' cadence and the local store's last date)
+should have been published, retried at most every FredRelease.retry_min until it lands.
+
+State lives in runtime/fetch_plan.json: per metric the unix time of the last successful fetch
+(`fetched_at`) and of the observation it returned (`observed_at`). It changes on every run that
+fetches anything, so it is not committed; the data workflow restores it from actions/cache.
+
+Holiday lists cover the years written below; in an unlisted year only weekends count as closed,
+so a missing list costs extra requests rather than missed data.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dtime
+from typing import Dict, FrozenSet, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from snapshot_io import read_json, write_json
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PLAN_PATH = pathlib.Path(os.environ.get("PROJECT_MARK_FETCH_PLAN") or ROOT / "runtime" / "fetch_plan.json")
+
+SETTLE_MIN = 20
+SUN, MON, TUE, WED, THU, FRI = 6, 0, 1, 2, 3, 4
+WEEKDAYS = frozenset({MON, TUE, WED, THU, FRI})
+
+NYSE_HOLIDAYS = frozenset(date.fromisoformat(d) for d in (
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19", "2026-07-03",
+    "2026-09-07", "2026-11-26", "2026-12-25",
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18", "2027-07-05",
+    "2027-09-06", "2027-11-25", "2027-12-24",
+))
+KRX_HOLIDAYS = frozenset(date.fromisoformat(d) for d in (
+    "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02", "2026-05-01", "2026-05-05",
+    "2026-05-25", "2026-06-03", "2026-08-17", "2026-09-24", "2026-09-25", "2026-10-05", "2026-10-09",
+    "2026-12-25", "2026-12-31",
+))
+# Federal Reserve holidays (no FRED daily observations or releases). A holiday on a Saturday is not
+# moved: the Reserve Banks stay open the Friday before.
+FED_HOLIDAYS = frozenset(date.fromisoformat(d) for d in (
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-05-25", "2026-06-19", "2026-09-07", "2026-10-12",
+    "2026-11-11", "2026-11-26", "2026-12-25",
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-05-31", "2027-07-05", "2027-09-06", "2027-10-11",
+    "2027-11-11", "2027-11-25",
+))
+
+
+@dataclass(frozen=True)
+class Session:
+    """Regular trading hours: opens at `open` local time on `days`, closes at `close` (the next day if not after `open`)."""
+
+    tz: str
+    open: dtime
+    close: dtime
+    days: FrozenSet[int] = WEEKDAYS
+    holidays: FrozenSet[date] = frozenset()
+
+    def windows(self, now: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """(start, end) of the sessions opening in the 8 days up to `now`, oldest first."""
+        tz = ZoneInfo(self.tz)
+        today = now.astimezone(tz).date()
+        for back in range(8, -1, -1):
+            d = today - timedelta(days=back)
+            if d.weekday() not in self.days or d in self.holidays:
+                continue
+            start = datetime.combine(d, self.open, tz)
+            end = datetime.combine(d if self.close > self.open else d + timedelta(days=1), self.close, tz)
+            yield start, end
+
+
+SESSIONS: Dict[str, Session] = {
+    "krx": Session("Asia/Seoul", dtime(9, 0), dtime(15, 30), holidays=KRX_HOLIDAYS),
+    "nyse": Session("America/New_York", dtime(9, 30), dtime(16, 0), holidays=NYSE_HOLIDAYS),
+    # CME Globex metals/energy: Sunday-Thursday 17:00 CT to 16:00 CT the next day.
+    "cme": Session("America/Chicago", dtime(17, 0), dtime(16, 0), frozenset({SUN, MON, TUE, WED, THU})),
+    # ICE US dollar index: Sunday-Thursday 20:00 ET to 17:00 ET the next day.
+    "ice": Session("America/New_York", dtime(20, 0), dtime(17, 0), frozenset({SUN, MON, TUE, WED, THU})),
+    # Spot FX: continuous from Sunday 17:00 ET to Friday 17:00 ET.
+    "fx": Session("America/New_York", dtime(17, 0), dtime(17, 0), frozenset({SUN, MON, TUE, WED, THU})),
+}
+
+
+@dataclass(frozen=True)
+class FredRelease:
+    """Next observation after `last_date` appears `lag_days` business days later at `hour` ET; retried every `retry_min` until it does."""
+
+    weekly: bool = False
+    lag_days: int = 1
+    hour: int = 9
+    retry_min: int = 60
+
+
+FRED_RELEASES: Dict[str, FredRelease] = {
+    "DGS10": FredRelease(lag_days=0, hour=17),  # H.15, same evening
+    "DGS2": FredRelease(lag_days=0, hour=17),
+    "SOFR": FredRelease(lag_days=1, hour=8),  # NY Fed, next business morning
+    "IORB": FredRelease(lag_days=1, hour=9, retry_min=24 * 60),  # only moves at FOMC meetings
+    "RRPONTSYD": FredRelease(lag_days=0, hour=14),  # ON RRP results, same afternoon
+    "RPTTLD": FredRelease(lag_days=1, hour=9),
+    "WTREGEN": FredRelease(weekly=True, lag_days=1, hour=17),  # H.4.1, Thursday for Wednesday
+}
+ET = ZoneInfo("America/New_York")
+
+
+def is_business_day(d: date, holidays: FrozenSet[date] = frozenset()) -> bool:
+    return d.weekday() in WEEKDAYS and d not in holidays
+
+
+def next_business_day(d: date, holidays: FrozenSet[date] = frozenset()) -> date:
+    d += timedelta(days=1)
+    while not is_business_day(d, holidays):
+        d += timedelta(days=1)
+    return d
+
+
+def fred_publication_date(observed: date, lag_days: int) -> date:
+    """Business day on which an observation dated `observed` is published, `lag_days` Fed business days later."""
+    d = observed
+    while not is_business_day(d, FED_HOLIDAYS):
+        d += timedelta(days=1)
+    for _ in range(lag_days):
+        d = next_business_day(d, FED_HOLIDAYS)
+    return d
+
+
+class FetchPlanner:
+    def __init__(self, path: pathlib.Path = PLAN_PATH, now: Optional[datetime] = None, full: bool = False):
+        self.path = path
+        self.now = now or datetime.now(timezone.utc)
+        self.full = full
+        state = read_json(path, {})
+        metrics = state.get("metrics") if isinstance(state, dict) else None
+        self.metrics: Dict[str, Dict[str, float]] = {k: dict(v) for k, v in (metrics or {}).items() if isinstance(v, dict)}
+        self.reasons: Dict[str, str] = {}
+
+    def _fetched_at(self, key: str) -> float:
+        return float(self.metrics.get(key, {}).get("fetched_at") or 0.0)
+
+    def market_due(self, key: str, session: str) -> bool:
+        """True while `session` is open (plus SETTLE_MIN), or if its last close came after our last fetch."""
+        if self.full:
+            return True
+        spec = SESSIONS.get(session)
+        if spec is None:
+            return True
+        fetched = datetime.fromtimestamp(self._fetched_at(key), timezone.utc)
+        settle = timedelta(minutes=SETTLE_MIN)
+        last_end = None
+        for start, end in spec.windows(self.now):
+            if start <= self.now < end + settle:
+                return True
+            if end + settle <= self.now:
+                last_end = end + settle
+        if last_end is not None and fetched < last_end:
+            return True
+        self.reasons[key] = f"{session} closed"
+        return False
+
+    def fred_due(self, key: str, series_id: str, last_date: Optional[str]) -> bool:
+        """True once the observation after `last_date` should be out, at most every retry_min."""
+        if self.full or not last_date:
+            return True
+        spec = FRED_RELEASES.get(series_id, FredRelease())
+        last = date.fromisoformat(last_date)
+        nxt = last + timedelta(days=7) if spec.weekly else next_business_day(last, FED_HOLIDAYS)
+        available = datetime.combine(fred_publication_date(nxt, spec.lag_days), dtime(spec.hour), ET)
+        if self.now < available:
+            self.reasons[key] = f"next {series_id} after {available.astimezone(ET):%a %m-%d %H:%M} ET"
+            return False
+        if (self.now.timestamp() - self._fetched_at(key)) < spec.retry_min * 60:
+            self.reasons[key] = f"{series_id} checked < {spec.retry_min}min ago"
+            return False
+        return True
+
+    def mark_fetched(self, key: str, observed_at: Optional[float] = None) -> None:
+        entry = self.metrics.setdefault(key, {})
+        entry["fetched_at"] = round(self.now.timestamp())
+        if observed_at is not None:
+            entry["observed_at"] = round(observed_at)
+
+    def observed_at(self, key: str) -> Optional[float]:
+        value = self.metrics.get(key, {}).get("observed_at")
+        return float(value) if value else None
+
+    def flush(self) -> bool:
+        return write_json(self.path, {"metrics": dict(sorted(self.metrics.items()))})
+
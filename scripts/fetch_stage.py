@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Run independent source fetches concurrently under a shared run deadline.
+
+Also keeps process-wide per-stage timings (fetch/parse/render/write) for bench_pipeline.py, and
+feeds each one to the metrics stage histograms.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import metrics
+import telemetry
+
+
+@dataclass
+class SourceResult:
+    name: str
+    value: Any
+    ok: bool
+    elapsed_ms: float
+    error: Optional[str] = None
+    skipped: bool = False  # never started (a hedge the primary made unnecessary); not a failure
+
+
+# name -> (zero-arg fetch callable, per-source timeout in seconds, value used on failure/timeout)
+SourceSpec = Tuple[Callable[[], Any], float, Any]
+
+
+def run_sources(sources: Dict[str, SourceSpec], deadline_sec: float, max_workers: Optional[int] = None) -> Dict[str, SourceResult]:
+    """Start every source at once and collect results until each source's timeout or the run deadline.
+
+    A source that exceeds its budget is reported as failed with its fallback value; the worker thread
+    is abandoned (the callable's own socket timeout bounds how long it lingers). Each source runs
+    as a telemetry source of the same name.
+    """
+    if not sources:
+        return {}
+
+    started = time.monotonic()
+    run_deadline = started + deadline_sec
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(sources), thread_name_prefix="fetch")
+    futures: Dict[Future, str] = {}
+    source_deadline: Dict[str, float] = {}
+    for name, (fn, timeout, _) in sources.items():
+        futures[pool.submit(telemetry.wrap(name, fn))] = name
+        source_deadline[name] = min(started + timeout, run_deadline)
+
+    results: Dict[str, SourceResult] = {}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            for fut in [f for f in pending if source_deadline[futures[f]] <= now]:
+                pending.discard(fut)
+                fut.cancel()
+                name = futures[fut]
+                results[name] = SourceResult(name, sources[name][2], False, (now - started) * 1000.0, "timeout")
+                telemetry.record_outcome(telemetry.qualified(name), False, (now - started) * 1000.0, "timeout")
+            if not pending:
+                break
+            next_deadline = min(source_deadline[futures[f]] for f in pending)
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = futures[fut]
+                elapsed_ms = (time.monotonic() - started) * 1000.0
+                try:
+                    results[name] = SourceResult(name, fut.result(), True, elapsed_ms)
+                except Exception as e:
+                    results[name] = SourceResult(name, sources[name][2], False, elapsed_ms, str(e))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {name: results[name] for name in sources}
+
+
+def run_hedged(primary: str, fallback: str, sources: Dict[str, SourceSpec], hedge_after_sec: float, deadline_sec: float) -> Dict[str, SourceResult]:
+    """Start `primary`, and `fallback` as well once primary fails or is still running after hedge_after_sec.
+
+    Returns as soon as either succeeds, or when both have failed or run out of time. Every source
+    gets a result: one abandoned after the other succeeded reports error "abandoned", and a fallback
+    that never had to start is marked `skipped`.
+    """
+    started = time.monotonic()
+    run_deadline = started + deadline_sec
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+    futures: Dict[Future, str] = {}
+    source_deadline: Dict[str, float] = {}
+    results: Dict[str, SourceResult] = {}
+
+    def start(name: str) -> None:
+        now = time.monotonic()
+        futures[pool.submit(telemetry.wrap(name, sources[name][0]))] = name
+        source_deadline[name] = min(now + sources[name][1], run_deadline)
+
+    def elapsed_ms() -> float:
+        return (time.monotonic() - started) * 1000.0
+
+    start(primary)
+    hedge_at = started + hedge_after_sec
+    try:
+        while True:
+            pending = {f for f in futures if futures[f] not in results}
+            now = time.monotonic()
+            for fut in [f for f in pending if source_deadline[futures[f]] <= now]:
+                pending.discard(fut)
+                name = futures[fut]
+                results[name] = SourceResult(name, sources[name][2], False, elapsed_ms(), "timeout")
+                telemetry.record_outcome(telemetry.qualified(name), False, elapsed_ms(), "timeout")
+            primary_failed = primary in results and not results[primary].ok
+            if fallback not in source_deadline and (primary_failed or (primary not in results and now >= hedge_at)):
+                print(f"fetch: {primary} {'failed' if primary_failed else f'slower than {hedge_after_sec * 1000:.0f}ms'}, starting {fallback}")
+                start(fallback)
+                continue
+            if any(r.ok for r in results.values()) or not pending:
+                break
+            wake = min(source_deadline[futures[f]] for f in pending)
+            if fallback not in source_deadline:
+                wake = min(wake, hedge_at)
+            done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = futures[fut]
+                try:
+                    results[name] = SourceResult(name, fut.result(), True, elapsed_ms())
+                except Exception as e:
+                    results[name] = SourceResult(name, sources[name][2], False, elapsed_ms(), str(e))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for name in (primary, fallback):
+        if name in results:
+            continue
+        if name in source_deadline:
+            results[name] = SourceResult(name, sources[name][2], False, elapsed_ms(), "abandoned")
+        else:
+            results[name] = SourceResult(name, sources[name][2], False, 0.0, skipped=True)
+    return results
+
+
+def log_timings(results: Dict[str, SourceResult]) -> None:
+    for r in sorted(results.values(), key=lambda x: x.elapsed_ms, reverse=True):
+        status = "ok" if r.ok else "skipped" if r.skipped else f"failed ({r.error})"
+        print(f"fetch: {r.name} {r.elapsed_ms:.0f}ms {status}")
+
+
+_STAGE_LOCK = threading.Lock()
+_STAGE_MS: Dict[str, float] = {}
+
+
+def add_stage_time(stage: str, ms: float) -> None:
+    with _STAGE_LOCK:
+        _STAGE_MS[stage] = _STAGE_MS.get(stage, 0.0) + ms
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the block's duration to `stage`. Time from worker threads is summed, so it can exceed wall time."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000.0
+        add_stage_time(stage, ms)
+        metrics.observe_stage(stage, ms / 1000.0, telemetry.current_source() or "main")
+
+
+class StageClock:
+    """Sequential stage timer for a script's main(): each lap() charges the time since the previous one."""
+
+    def __init__(self) -> None:
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        add_stage_time(stage, (now - self.last) * 1000.0)
+        metrics.observe_stage(stage, now - self.last)
+        self.last = now
+
+
+def stage_times() -> Dict[str, float]:
+    with _STAGE_LOCK:
+        return dict(_STAGE_MS)
+
+
+def reset_stage_times() -> None:
+    with _STAGE_LOCK:
+        _STAGE_MS.clear()
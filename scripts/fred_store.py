@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Local per-series FRED observation store with incremental (cosd=) updates.
+
+Each series lives in pipelines/store/fred/<SERIES>.csv as append-only `date,value` rows. After
+the first full backfill only observations newer than the last stored date are requested. Latest
+value and 1-step delta are O(1); longer deltas (1w/1m) are a bisect over the in-memory dates.
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import os
+import pathlib
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import http_cache
+import http_client
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STORE_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_FRED_STORE_DIR") or ROOT / "pipelines" / "store" / "fred")
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+
+DELTA_WINDOWS_DAYS = {"1w": 7, "1m": 30}
+
+
+class SeriesStore:
+    def __init__(self, series_id: str):
+        self.series_id = series_id
+        self.path = STORE_DIR / f"{series_id}.csv"
+        self.dates: List[str] = []
+        self.values: List[float] = []
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.path.open(encoding="utf-8", newline="") as f:
+                for row in csv.reader(f):
+                    if len(row) < 2 or row[0] == "date":
+                        continue
+                    try:
+                        value = float(row[1])
+                    except ValueError:
+                        continue
+                    self.dates.append(row[0])
+                    self.values.append(value)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.dates[-1] if self.dates else None
+
+    def latest(self) -> Tuple[Optional[float], Optional[float]]:
+        if not self.values:
+            return None, None
+        prev = self.values[-2] if len(self.values) >= 2 else self.values[-1]
+        return self.values[-1], self.values[-1] - prev
+
+    def delta_over(self, days: int) -> Optional[float]:
+        """Latest value minus the last observation on or before (last_date - days)."""
+        if not self.dates:
+            return None
+        cutoff = (date.fromisoformat(self.dates[-1]) - timedelta(days=days)).isoformat()
+        i = bisect.bisect_right(self.dates, cutoff) - 1
+        if i < 0:
+            return None
+        return self.values[-1] - self.values[i]
+
+    def deltas(self) -> Dict[str, Optional[float]]:
+        return {name: self.delta_over(days) for name, days in DELTA_WINDOWS_DAYS.items()}
+
+    def append(self, rows: List[Tuple[str, float]]) -> int:
+        """Append observations newer than last_date; returns how many were added."""
+        last = self.last_date
+        new_rows = [(d, v) for d, v in rows if last is None or d > last]
+        if not new_rows:
+            return 0
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists()
+        with self.path.open("a", encoding="utf-8", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            if is_new:
+                w.writerow(["date", "value"])
+            for d, v in new_rows:
+                w.writerow([d, repr(v)])
+        for d, v in new_rows:
+            self.dates.append(d)
+            self.values.append(v)
+        return len(new_rows)
+
+    def update(self, timeout: float = http_client.DEFAULT_TIMEOUT_SEC) -> int:
+        """Fetch observations since last_date (full history on first run) and append them."""
+        with self.lock:
+            url = FRED_CSV_URL.format(series_id=self.series_id)
+            if self.last_date:
+                url += f"&cosd={self.last_date}"
+            resp = http_client.get(url, timeout=timeout)
+            rows = http_cache.parsed(resp, "fred_rows", lambda: parse_fred_rows(resp.text(errors="ignore"), self.series_id))
+            return self.append([(d, v) for d, v in rows])
+
+
+def parse_fred_rows(text: str, series_id: str) -> List[Tuple[str, float]]:
+    rows: List[Tuple[str, float]] = []
+    reader = csv.reader(text.splitlines())
+    header = next(reader, None)
+    if not header:
+        return rows
+    col = header.index(series_id) if series_id in header else (header.index("VALUE") if "VALUE" in header else 1)
+    for row in reader:
+        if len(row) <= col:
+            continue
+        raw = row[col].strip()
+        if not raw or raw == ".":
+            continue
+        try:
+            rows.append((row[0].strip(), float(raw)))
+        except ValueError:
+            continue
+    return rows
+
+
+_STORES: Dict[str, SeriesStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_series(series_id: str) -> SeriesStore:
+    """Process-wide SeriesStore instance, loaded from disk once."""
+    with _STORES_LOCK:
+        store = _STORES.get(series_id)
+        if store is None:
+            store = _STORES[series_id] = SeriesStore(series_id)
+        return store
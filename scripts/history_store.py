@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Append-only columnar store of per-run metric values, chunked per month.
+
+Closed months live in pipelines/store/history/<YYYY-MM>/ and are committed once. The month being
+appended to lives in runtime/history/<YYYY-MM>/ (not committed; the data workflow carries it in
+actions/cache), so a run doesn't turn every column file into a binary diff. The first append of a
+new month moves the finished chunk into the committed store.
+
+Layout of a chunk:
+  ts.i64          run timestamps (unix seconds, int64, ascending)
+  columns.json    metric names present in this chunk
+  <metric>.f64    one float64 per row, NaN where the metric was not observed
+
+Columns are written before ts.i64, so a crashed append leaves at most trailing column values
+beyond len(ts), which are ignored on read and truncated on the next append. Reads memory-map
+the chunk files and bisect the timestamp column, so a range read is a slice, not a scan.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import mmap
+import os
+import pathlib
+import re
+import shutil
+from array import array
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+HISTORY_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_HISTORY_DIR") or ROOT / "pipelines" / "store" / "history")
+OPEN_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_HISTORY_OPEN_DIR") or ROOT / "runtime" / "history")
+
+TS_FILE = "ts.i64"
+COLUMNS_FILE = "columns.json"
+NAN = float("nan")
+_SAFE_RE = re.compile(r"[^A-Za-z0-9_.=^-]")
+
+
+def _column_file(metric: str) -> str:
+    return _SAFE_RE.sub("_", metric) + ".f64"
+
+
+def _to_epoch(ts: datetime | int | float) -> int:
+    if isinstance(ts, datetime):
+        return int(ts.timestamp())
+    return int(ts)
+
+
+def _chunk_name(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m")
+
+
+def _mapped(path: pathlib.Path, typecode: str, count: int) -> memoryview:
+    """Read-only memoryview of the first `count` items of a column file (empty if missing)."""
+    itemsize = array(typecode).itemsize
+    try:
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < itemsize or count <= 0:
+                return memoryview(array(typecode))
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return memoryview(array(typecode))
+    n = min(count, size // itemsize)
+    return memoryview(mm)[: n * itemsize].cast(typecode)
+
+
+class HistoryStore:
+    def __init__(self, root: pathlib.Path = HISTORY_DIR, open_root: pathlib.Path = OPEN_DIR):
+        self.root = root
+        self.open_root = open_root
+
+    def chunks(self) -> List[str]:
+        names = set()
+        for base in (self.root, self.open_root):
+            if base.exists():
+                names.update(p.name for p in base.iterdir() if (p / TS_FILE).exists())
+        return sorted(names)
+
+    def _dir(self, chunk: str) -> pathlib.Path:
+        """The chunk's directory: the open copy if there is one, else the committed one."""
+        open_dir = self.open_root / chunk
+        return open_dir if (open_dir / TS_FILE).exists() else self.root / chunk
+
+    def _rotate(self, current: str) -> None:
+        """Seal open chunks of earlier months into the committed store; adopt `current` if it is there."""
+        if self.open_root.exists():
+            for p in sorted(self.open_root.iterdir()):
+                if p.name < current and (p / TS_FILE).exists() and not (self.root / p.name).exists():
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(p), str(self.root / p.name))
+                    print(f"history: sealed {p.name}")
+        committed = self.root / current
+        if committed.exists() and not (self.open_root / current).exists():
+            # Written before the open month moved to runtime/.
+            self.open_root.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(committed), str(self.open_root / current))
+
+    def _columns(self, chunk_dir: pathlib.Path) -> List[str]:
+        try:
+            return json.loads((chunk_dir / COLUMNS_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+
+    def _row_count(self, chunk_dir: pathlib.Path) -> int:
+        try:
+            return (chunk_dir / TS_FILE).stat().st_size // 8
+        except FileNotFoundError:
+            return 0
+
+    def metrics(self) -> List[str]:
+        names: Dict[str, None] = {}
+        for chunk in self.chunks():
+            names.update(dict.fromkeys(self._columns(self._dir(chunk))))
+        return list(names)
+
+    def append(self, ts: datetime | int | float, values: Dict[str, Optional[float]]) -> None:
+        """Append one row; metrics missing from `values` (or None) are stored as NaN."""
+        epoch = _to_epoch(ts)
+        chunk = _chunk_name(epoch)
+        self._rotate(chunk)
+        chunk_dir = self.open_root / chunk
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        n = self._row_count(chunk_dir)
+        if n:
+            last = _mapped(chunk_dir / TS_FILE, "q", n)[n - 1]
+            if epoch <= last:
+                raise ValueError(f"history rows must be appended in time order ({epoch} <= {last})")
+
+        columns = self._columns(chunk_dir)
+        new_columns = [m for m in values if m not in columns]
+        if new_columns:
+            columns.extend(new_columns)
+            (chunk_dir / COLUMNS_FILE).write_text(json.dumps(columns, ensure_ascii=False) + "\n", encoding="utf-8")
+
+        for metric in columns:
+            path = chunk_dir / _column_file(metric)
+            with path.open("ab") as f:
+                size = f.tell()
+                have = size // 8
+                if have > n:
+                    f.truncate(n * 8)
+                    f.seek(n * 8)
+                elif have < n:
+                    array("d", [NAN] * (n - have)).tofile(f)
+                v = values.get(metric)
+                array("d", [NAN if v is None else float(v)]).tofile(f)
+
+        with (chunk_dir / TS_FILE).open("ab") as f:
+            array("q", [epoch]).tofile(f)
+
+    def _chunk_range(self, chunk: str, metric: str, start: int, end: int) -> Iterator[Tuple[int, float]]:
+        chunk_dir = self._dir(chunk)
+        n = self._row_count(chunk_dir)
+        ts = _mapped(chunk_dir / TS_FILE, "q", n)
+        lo = bisect.bisect_left(ts, start)
+        hi = bisect.bisect_right(ts, end)
+        if lo >= hi or metric not in self._columns(chunk_dir):
+            return
+        col = _mapped(chunk_dir / _column_file(metric), "d", n)
+        times = ts[lo:hi].tolist()
+        vals = col[lo:min(hi, len(col))].tolist()
+        for t, v in zip(times, vals):
+            if not math.isnan(v):
+                yield t, v
+
+    def read(self, metric: str, start: datetime | int | float = 0, end: Optional[datetime | int | float] = None) -> Tuple[List[int], List[float]]:
+        """Observed (timestamp, value) pairs for `metric` with start <= ts <= end, NaNs dropped."""
+        lo = _to_epoch(start)
+        hi = _to_epoch(end) if end is not None else 2 ** 62
+        first, last = _chunk_name(max(lo, 0)), _chunk_name(min(hi, 253402300799))
+        times: List[int] = []
+        values: List[float] = []
+        for chunk in self.chunks():
+            if chunk < first or chunk > last:
+                continue
+            for t, v in self._chunk_range(chunk, metric, lo, hi):
+                times.append(t)
+                values.append(v)
+        return times, values
+
+    def daily_last(self, metric: str, start: datetime | int | float = 0, end: Optional[datetime | int | float] = None, tz: tzinfo = timezone.utc) -> Dict[str, float]:
+        """Last observed value per calendar day (YYYY-MM-DD in `tz`) within the range."""
+        out: Dict[str, float] = {}
+        times, values = self.read(metric, start, end)
+        for t, v in zip(times, values):
+            out[datetime.fromtimestamp(t, tz).strftime("%Y-%m-%d")] = v
+        return out
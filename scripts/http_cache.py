@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Persistent conditional-GET response cache used by http_client.get.
+
+Each entry is `<key>.body` (decoded payload) plus `<key>.json` (validators, timestamps and any
+parsed results memoised by `parsed`). Freshness is per host (SOURCE_TTL_SEC); once stale the entry
+is revalidated with If-None-Match / If-Modified-Since. The directory is capped at MAX_BYTES and
+evicted least-recently-used first.
+
+Environment:
+  PROJECT_MARK_HTTP_CACHE=0              disable the cache entirely
+  PROJECT_MARK_HTTP_CACHE_DIR=<path>     override the cache directory
+  PROJECT_MARK_HTTP_STALE_ON_ERROR=1     serve a stale entry when the network request fails
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from fetch_stage import timed
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+CACHE_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_HTTP_CACHE_DIR") or ROOT / "runtime" / "http_cache")
+MAX_BYTES = 64 * 1024 * 1024
+ENABLED = os.environ.get("PROJECT_MARK_HTTP_CACHE", "1") != "0"
+STALE_ON_ERROR = os.environ.get("PROJECT_MARK_HTTP_STALE_ON_ERROR", "0") == "1"
+
+DEFAULT_TTL_SEC = 60
+SOURCE_TTL_SEC = {
+    "fred.stlouisfed.org": 50 * 60,  # below fetch_planner retry_min; the planner decides when to ask
+    "farside.co.uk": 3600,
+    "defillama.com": 3600,
+    "open.er-api.com": 3600,
+    "news.google.com": 15 * 60,
+    "api.alternative.me": 15 * 60,
+    "query1.finance.yahoo.com": 60,
+    "api.coingecko.com": 60,
+    "fapi.binance.com": 60,
+}
+
+_LOCK = threading.Lock()
+
+
+@dataclass
+class Entry:
+    key: str
+    url: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    parsed: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def body_path(self) -> pathlib.Path:
+        return CACHE_DIR / f"{self.key}.body"
+
+    @property
+    def meta_path(self) -> pathlib.Path:
+        return CACHE_DIR / f"{self.key}.json"
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.stored_at) < ttl_for(self.url)
+
+    def validators(self) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        if self.etag:
+            out["If-None-Match"] = self.etag
+        if self.last_modified:
+            out["If-Modified-Since"] = self.last_modified
+        return out
+
+    def read_body(self) -> bytes:
+        return self.body_path.read_bytes()
+
+
+def ttl_for(url: str) -> float:
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    for suffix, ttl in SOURCE_TTL_SEC.items():
+        if host == suffix or host.endswith("." + suffix):
+            return ttl
+    return DEFAULT_TTL_SEC
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _write_meta(entry: Entry) -> None:
+    meta = {
+        "url": entry.url,
+        "stored_at": entry.stored_at,
+        "etag": entry.etag,
+        "last_modified": entry.last_modified,
+        "headers": entry.headers,
+        "parsed": entry.parsed,
+    }
+    tmp = entry.meta_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, entry.meta_path)
+
+
+def lookup(url: str) -> Optional[Entry]:
+    key = cache_key(url)
+    meta_path = CACHE_DIR / f"{key}.json"
+    with _LOCK:
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not (CACHE_DIR / f"{key}.body").exists():
+            return None
+        try:
+            os.utime(meta_path)  # LRU access stamp
+        except OSError:
+            pass
+    return Entry(
+        key=key,
+        url=url,
+        stored_at=float(meta.get("stored_at") or 0.0),
+        etag=meta.get("etag"),
+        last_modified=meta.get("last_modified"),
+        headers=meta.get("headers") or {},
+        parsed=meta.get("parsed") or {},
+    )
+
+
+def store(url: str, body: bytes, headers: Dict[str, str]) -> Entry:
+    entry = Entry(
+        key=cache_key(url),
+        url=url,
+        stored_at=time.time(),
+        etag=headers.get("etag"),
+        last_modified=headers.get("last-modified"),
+        headers={k: v for k, v in headers.items() if k in ("content-type", "etag", "last-modified")},
+    )
+    with _LOCK:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = entry.body_path.with_suffix(".body.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, entry.body_path)
+        _write_meta(entry)
+        _evict()
+    return entry
+
+
+def refresh(entry: Entry) -> None:
+    """Mark a revalidated (304) entry fresh again; parsed results stay valid."""
+    entry.stored_at = time.time()
+    with _LOCK:
+        _write_meta(entry)
+
+
+def parsed(resp: Any, name: str, parse: Callable[[], Any]) -> Any:
+    """Return the memoised `name` parse of a cached response, or run `parse` and memoise it.
+
+    Cache hits, 304 revalidations and stale serves reuse the stored result, so the payload is
+    not re-parsed. The result must be JSON-serialisable.
+    """
+    entry: Optional[Entry] = getattr(resp, "cache_entry", None)
+    if entry is not None and getattr(resp, "cache_status", None) in ("hit", "revalidated", "stale") and name in entry.parsed:
+        return entry.parsed[name]
+    with timed("parse"):
+        value = parse()
+    if entry is None:
+        return value
+    entry.parsed[name] = value
+    with _LOCK:
+        if entry.meta_path.exists():
+            _write_meta(entry)
+    return value
+
+
+def _evict() -> None:
+    entries = []
+    total = 0
+    for meta in CACHE_DIR.glob("*.json"):
+        body = meta.with_suffix(".body")
+        try:
+            size = meta.stat().st_size + (body.stat().st_size if body.exists() else 0)
+            atime = meta.stat().st_mtime
+        except OSError:
+            continue
+        entries.append((atime, size, meta, body))
+        total += size
+    if total <= MAX_BYTES:
+        return
+    for _, size, meta, body in sorted(entries, key=lambda x: x[0]):
+        for p in (meta, body):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+        total -= size
+        if total <= MAX_BYTES:
+            break
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""Shared HTTP client for the updater scripts: per-host keep-alive pool, gzip/deflate, retries.
+
+Responses pass through the on-disk conditional-GET cache in http_cache unless `use_cache=False`.
+Network requests go through the host's circuit breaker in source_health.
+
+An active cassette (see cassette.py) takes precedence over both: replay answers from memory,
+record bypasses the cache and saves every exchange.
+
+Setting PROJECT_MARK_UPSTREAM=http://host:port sends every request to that server instead, as
+`GET /<original host><path>?<query>` (see bench_pipeline.py's replay server).
+
+Per-host counters are kept for the whole process and, after scope_stats(), for the calling
+context as well (inherited by fetch workers), so scheduler.py can report each job's own traffic.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import cassette
+import http_cache
+import source_health
+import telemetry
+from fetch_stage import timed
+
+USER_AGENT = "project-mark-dashboard/1.0"
+DEFAULT_TIMEOUT_SEC = 20
+DEFAULT_RETRIES = 1
+RETRY_BACKOFF_SEC = 0.5
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 4
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+UPSTREAM_OVERRIDE = os.environ.get("PROJECT_MARK_UPSTREAM", "").rstrip("/")
+
+
+class HttpError(OSError):
+    """Non-2xx response, or a protocol failure surfaced by http.client."""
+
+    def __init__(self, url: str, status: Optional[int], reason: str):
+        super().__init__(f"HTTP {status}: {reason} ({url})" if status else f"{reason} ({url})")
+        self.url = url
+        self.status = status
+
+
+@dataclass
+class Response:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    elapsed_ms: float
+    reused: bool
+    retries: int = 0
+    wire_bytes: int = 0
+    cache_status: Optional[str] = None  # hit | revalidated | stale | miss | replay
+    cache_entry: Optional[http_cache.Entry] = None
+
+    def text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return self.body.decode(encoding, errors=errors)
+
+    def json(self) -> Any:
+        with timed("parse"):
+            return json.loads(self.body.decode("utf-8"))
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    opened: int = 0
+    reused: int = 0
+    retries: int = 0
+    bytes_in: int = 0
+    cache_hits: int = 0
+    cache_revalidated: int = 0
+    cache_stale: int = 0
+
+
+PoolKey = Tuple[str, str, int]
+
+
+@dataclass
+class _Pool:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    idle: Dict[PoolKey, List[http.client.HTTPConnection]] = field(default_factory=dict)
+    stats: Dict[str, HostStats] = field(default_factory=dict)
+
+
+_POOL = _Pool()
+_SCOPE: contextvars.ContextVar[Optional[Dict[str, HostStats]]] = contextvars.ContextVar("http_stats_scope", default=None)
+
+
+def _pool_key(parts: urllib.parse.SplitResult) -> PoolKey:
+    scheme = parts.scheme.lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return scheme, (parts.hostname or "").lower(), port
+
+
+def _host_stats(host: str) -> List[HostStats]:
+    """The process-wide counters for `host`, plus the current scope's. Call with _POOL.lock held."""
+    out = []
+    for table in (_POOL.stats, _SCOPE.get()):
+        if table is not None:
+            st = table.get(host)
+            if st is None:
+                st = table[host] = HostStats()
+            out.append(st)
+    return out
+
+
+def _checkout(key: PoolKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+    with _POOL.lock:
+        idle = _POOL.idle.get(key) or []
+        conn = idle.pop() if idle else None
+    if conn is not None:
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+    scheme, host, port = key
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return cls(host, port, timeout=timeout), False
+
+
+def _checkin(key: PoolKey, conn: http.client.HTTPConnection) -> None:
+    with _POOL.lock:
+        idle = _POOL.idle.setdefault(key, [])
+        if len(idle) < MAX_IDLE_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    encoding = encoding.strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def _request_once(url: str, timeout: float, headers: Dict[str, str]) -> Response:
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise HttpError(url, None, f"unsupported scheme {parts.scheme!r}")
+    key = _pool_key(parts)
+    target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+    host = key[1]
+    if UPSTREAM_OVERRIDE:
+        key = _pool_key(urllib.parse.urlsplit(UPSTREAM_OVERRIDE))
+        target = f"/{parts.netloc}{target}"
+    req_headers = {
+        "Host": parts.netloc,
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        **headers,
+    }
+
+    started = time.monotonic()
+    conn, reused = _checkout(key, timeout)
+    try:
+        try:
+            conn.request("GET", target, headers=req_headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive socket; redo on a fresh connection.
+            conn.close()
+            conn, reused = _checkout(key, timeout)
+            conn.request("GET", target, headers=req_headers)
+            resp = conn.getresponse()
+        raw = resp.read()
+    except http.client.HTTPException as e:
+        conn.close()
+        raise HttpError(url, None, f"{type(e).__name__}: {e}") from e
+    except BaseException:
+        conn.close()
+        raise
+
+    if resp.will_close:
+        conn.close()
+    else:
+        _checkin(key, conn)
+
+    body = _decode_body(raw, resp.getheader("Content-Encoding") or "")
+    with _POOL.lock:
+        for st in _host_stats(host):
+            st.requests += 1
+            st.bytes_in += len(raw)
+            if reused:
+                st.reused += 1
+            else:
+                st.opened += 1
+
+    return Response(
+        url=url,
+        status=resp.status,
+        headers={k.lower(): v for k, v in resp.getheaders()},
+        body=body,
+        elapsed_ms=(time.monotonic() - started) * 1000.0,
+        reused=reused,
+        wire_bytes=len(raw),
+    )
+
+
+def get(
+    url: str,
+    timeout: float = DEFAULT_TIMEOUT_SEC,
+    retries: int = DEFAULT_RETRIES,
+    headers: Optional[Dict[str, str]] = None,
+    use_cache: bool = True,
+) -> Response:
+    """GET `url` over a pooled connection, following redirects and retrying transient failures.
+
+    Raises HttpError for non-2xx responses and OSError subclasses for network failures. Every call
+    is reported to telemetry.
+    """
+    started = time.monotonic()
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    try:
+        resp = _get(url, timeout, retries, headers, use_cache)
+    except OSError as e:
+        telemetry.record_request(
+            host, getattr(e, "status", None), (time.monotonic() - started) * 1000.0, 0, getattr(e, "retries", 0), None, str(e)
+        )
+        raise
+    telemetry.record_request(host, resp.status, (time.monotonic() - started) * 1000.0, resp.wire_bytes, resp.retries, resp.cache_status)
+    return resp
+
+
+def _get(url: str, timeout: float, retries: int, headers: Optional[Dict[str, str]], use_cache: bool) -> Response:
+    if cassette.PLAYER is not None:
+        return _from_cassette(cassette.PLAYER, url)
+    if cassette.RECORDER is not None:
+        return _get_recorded(cassette.RECORDER, url, timeout, retries, dict(headers or {}))
+
+    entry = http_cache.lookup(url) if use_cache and http_cache.ENABLED else None
+    if entry is not None and entry.is_fresh():
+        return _from_cache(entry, "hit")
+
+    extra = dict(headers or {})
+    if entry is not None:
+        extra.update(entry.validators())
+    try:
+        resp = _get_guarded(url, timeout, retries, extra)
+    except OSError:
+        if entry is not None and http_cache.STALE_ON_ERROR:
+            return _from_cache(entry, "stale")
+        raise
+
+    if resp.status == 304:
+        if entry is None:
+            raise HttpError(url, 304, "not modified without a cached entry")
+        http_cache.refresh(entry)
+        cached = _from_cache(entry, "revalidated")
+        cached.elapsed_ms, cached.reused, cached.retries, cached.wire_bytes = resp.elapsed_ms, resp.reused, resp.retries, resp.wire_bytes
+        return cached
+    if use_cache and http_cache.ENABLED:
+        resp.cache_entry = http_cache.store(url, resp.body, resp.headers)
+        resp.cache_status = "miss"
+    return resp
+
+
+def _from_cassette(player: cassette.Player, url: str) -> Response:
+    ex = player.find(url)
+    if ex is None:
+        raise HttpError(url, None, "not in cassette")
+    if ex.error is not None:
+        raise HttpError(url, ex.status, ex.error)
+    return Response(url=url, status=ex.status or 200, headers=dict(ex.headers), body=ex.body, elapsed_ms=0.0, reused=False, cache_status="replay")
+
+
+def _get_recorded(recorder: cassette.Recorder, url: str, timeout: float, retries: int, extra: Dict[str, str]) -> Response:
+    try:
+        resp = _get_network(url, timeout, retries, extra)
+    except OSError as e:
+        recorder.save(url, getattr(e, "status", None), {}, b"", error=str(e))
+        raise
+    recorder.save(url, resp.status, resp.headers, resp.body)
+    return resp
+
+
+def _from_cache(entry: http_cache.Entry, status: str) -> Response:
+    with _POOL.lock:
+        for st in _host_stats((urllib.parse.urlsplit(entry.url).hostname or "").lower()):
+            if status == "hit":
+                st.cache_hits += 1
+            elif status == "revalidated":
+                st.cache_revalidated += 1
+            else:
+                st.cache_stale += 1
+    return Response(
+        url=entry.url,
+        status=200,
+        headers=dict(entry.headers),
+        body=entry.read_body(),
+        elapsed_ms=0.0,
+        reused=False,
+        cache_status=status,
+        cache_entry=entry,
+    )
+
+
+def _get_guarded(url: str, timeout: float, retries: int, extra: Dict[str, str]) -> Response:
+    """_get_network behind the host's circuit breaker; the outcome is reported to source_health.
+
+    An open breaker raises source_health.CircuitOpenError without touching the network. Errors
+    with a non-retryable status (e.g. 404) still show the host is up and count as successes.
+    """
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    probe_timeout = source_health.admit(host)
+    if probe_timeout is not None:
+        timeout, retries = min(timeout, probe_timeout), 0
+    started = time.monotonic()
+    try:
+        resp = _get_network(url, timeout, retries, extra)
+    except OSError as e:
+        status = getattr(e, "status", None)
+        if status is None or status in RETRY_STATUSES:
+            source_health.record_failure(host, str(e))
+        else:
+            source_health.record_success(host, (time.monotonic() - started) * 1000.0)
+        raise
+    source_health.record_success(host, (time.monotonic() - started) * 1000.0)
+    return resp
+
+
+def _get_network(url: str, timeout: float, retries: int, extra: Dict[str, str]) -> Response:
+    attempt = 0
+    while True:
+        try:
+            resp = _follow(url, timeout, extra)
+            if resp.status in RETRY_STATUSES:
+                raise HttpError(url, resp.status, "retryable status")
+            if not 200 <= resp.status < 300 and resp.status != 304:
+                raise HttpError(url, resp.status, "unexpected status")
+            resp.retries = attempt
+            return resp
+        except OSError as e:
+            status = getattr(e, "status", None)
+            if attempt >= retries or (status is not None and status not in RETRY_STATUSES):
+                e.retries = attempt  # type: ignore[attr-defined]
+                raise
+            attempt += 1
+            with _POOL.lock:
+                for st in _host_stats((urllib.parse.urlsplit(url).hostname or "").lower()):
+                    st.retries += 1
+            time.sleep(RETRY_BACKOFF_SEC * (2 ** (attempt - 1)))
+
+
+def _follow(url: str, timeout: float, headers: Dict[str, str]) -> Response:
+    for _ in range(MAX_REDIRECTS + 1):
+        resp = _request_once(url, timeout, headers)
+        location = resp.headers.get("location")
+        if resp.status not in REDIRECT_STATUSES or not location:
+            return resp
+        url = urllib.parse.urljoin(url, location)
+    raise HttpError(url, None, "too many redirects")
+
+
+def get_json(url: str, timeout: float = DEFAULT_TIMEOUT_SEC, retries: int = DEFAULT_RETRIES, use_cache: bool = True) -> Any:
+    return get(url, timeout=timeout, retries=retries, use_cache=use_cache).json()
+
+
+def scope_stats() -> None:
+    """Start counting this context's requests separately; stats() and log_stats() then report only those."""
+    _SCOPE.set({})
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    table = _SCOPE.get()
+    with _POOL.lock:
+        return {host: dict(vars(st)) for host, st in sorted((_POOL.stats if table is None else table).items())}
+
+
+def log_stats() -> None:
+    for host, st in stats().items():
+        print(
+            f"http: {host} requests={st['requests']} opened={st['opened']} "
+            f"reused={st['reused']} retries={st['retries']} bytes={st['bytes_in']} "
+            f"cache_hits={st['cache_hits']} revalidated={st['cache_revalidated']} stale={st['cache_stale']}"
+        )
+
+
+def close_all() -> None:
+    with _POOL.lock:
+        conns = [c for idle in _POOL.idle.values() for c in idle]
+        _POOL.idle.clear()
+    for conn in conns:
+        conn.close()
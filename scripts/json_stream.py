@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Pick a few records out of a large JSON list without building the whole object tree.
+
+Exchange ticker dumps are arrays of flat objects (no nested objects), e.g. Binance
+`[{"symbol": ...}, ...]`, Bybit `{"result": {"list": [{...}]}}` and OKX `{"data": [{...}]}`.
+The body is scanned `chunk_size` bytes at a time with one regex matching only the wanted key
+values; each hit is widened to its enclosing braces and decoded on its own. Memory is bounded
+by the chunk plus the kept records instead of the full document, and the scan runs at regex
+speed rather than json.loads building every record.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Dict, Mapping
+
+CHUNK_SIZE = 64 * 1024
+
+
+def select(body: bytes, key: str, wanted: Mapping[str, str], chunk_size: int = CHUNK_SIZE) -> Dict[str, dict]:
+    """Decode the flat objects whose string field `key` is in `wanted`; returns {wanted[value]: record}.
+
+    The first record per value wins. A record that fails to decode is skipped.
+    """
+    if not wanted:
+        return {}
+    values = sorted(wanted, key=len, reverse=True)
+    pattern = re.compile(
+        rb'"' + re.escape(key.encode()) + rb'"\s*:\s*"(' + b"|".join(re.escape(v.encode()) for v in values) + rb')"'
+    )
+    out: Dict[str, dict] = {}
+    view = memoryview(body)
+    buf = b""
+    for offset in range(0, len(view), chunk_size):
+        buf += view[offset : offset + chunk_size]
+        done = 0
+        for m in pattern.finditer(buf):
+            start = buf.rfind(b"{", done, m.start())
+            end = buf.find(b"}", m.end())
+            if start < 0 or end < 0:
+                break  # record runs past this chunk; rescan it with the next one
+            done = end + 1
+            name = wanted[m.group(1).decode()]
+            if name in out:
+                continue
+            try:
+                record = json.loads(buf[start:done])
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                out[name] = record
+        # Carry only the record in progress (from its opening brace) into the next chunk.
+        cut = buf.rfind(b"{", done)
+        buf = buf[cut:] if cut >= 0 else b""
+    return out
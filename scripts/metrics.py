@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Process-wide counters, gauges and histograms for the updaters, exported as OpenMetrics text.
+
+Scripts don't call this module directly: telemetry, fetch_stage and snapshot_io feed it from the
+hooks every updater already goes through. Every series carries the `job` label of the telemetry
+run it was recorded in (bound by telemetry.start_run and inherited by fetch workers).
+
+  pipeline_http_request_duration_seconds{job,host}          histogram  every http_client.get
+  pipeline_http_response_bytes_total{job,host}              counter    wire bytes received
+  pipeline_http_request_errors_total{job,host}              counter
+  pipeline_source_duration_seconds{job,source,outcome}      histogram  run_sources / telemetry.source
+  pipeline_source_stage_duration_seconds{job,source,stage}  histogram  fetch_stage.timed (parse per source)
+  pipeline_stage_duration_seconds{job,stage}                histogram  StageClock laps
+  pipeline_symbols_total{job,status}                        counter    live / fallback / missing / skipped
+  pipeline_payload_bytes{job,file}                          gauge      last size written per output file
+  pipeline_snapshot_writes_total{job,result}                counter    written / unchanged
+  pipeline_run_duration_seconds{job}                        histogram
+  pipeline_last_run_timestamp_seconds{job}                  gauge
+
+finish_job() writes the job's series to METRICS_DIR/<job>.prom (atomic rename) for a
+node_exporter textfile collector; the scheduler daemon can also serve them all on
+`http://127.0.0.1:<port>/metrics`. Latency buckets include 0.25 s, so the agents.yaml rule
+"체결 지연 평균 > 250ms" maps to an alert such as
+
+  rate(pipeline_http_request_duration_seconds_sum[30m])
+    / rate(pipeline_http_request_duration_seconds_count[30m]) > 0.25
+
+Environment:
+  PROJECT_MARK_METRICS=0             collect nothing
+  PROJECT_MARK_METRICS_DIR=<path>    override the textfile directory
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import http.server
+import math
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import snapshot_io
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+METRICS_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_METRICS_DIR") or ROOT / "runtime" / "metrics")
+ENABLED = os.environ.get("PROJECT_MARK_METRICS", "1") != "0"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RUN_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """One metric family; `kind` is counter, gauge or histogram. Series are keyed by label values."""
+
+    def __init__(self, name: str, kind: str, help_text: str, labels: Sequence[str], unit: str = "", buckets: Sequence[float] = ()):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.unit = unit
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.values: Dict[Labels, float] = {}
+        # histogram series: [per-bucket counts (non-cumulative, +Inf last), sum]
+        self.hist: Dict[Labels, List] = {}
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def set(self, labels: Labels, value: float) -> None:
+        with self.lock:
+            self.values[labels] = value
+
+    def observe(self, labels: Labels, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            h = self.hist.get(labels)
+            if h is None:
+                h = self.hist[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            h[0][i] += 1
+            h[1] += value
+
+    def render(self, job: Optional[str]) -> List[str]:
+        with self.lock:
+            values = sorted(self.values.items())
+            hist = sorted((k, (list(c), s)) for k, (c, s) in self.hist.items())
+        if job is not None:
+            values = [(k, v) for k, v in values if k[0] == job]
+            hist = [(k, h) for k, h in hist if k[0] == job]
+        if not values and not hist:
+            return []
+        lines = [f"# TYPE {self.name} {self.kind}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {_escape(self.help)}")
+        sample = f"{self.name}_total" if self.kind == "counter" else self.name
+        for key, value in values:
+            lines.append(f"{sample}{_labels(self.labels, key)} {_num(value)}")
+        for key, (counts, total) in hist:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels((*self.labels, 'le'), (*key, _num(bound)))} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_num(total)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+HTTP_SECONDS = Metric("pipeline_http_request_duration_seconds", "histogram", "http_client.get latency including retries and cache revalidation.", ("job", "host"), "seconds", LATENCY_BUCKETS)
+HTTP_BYTES = Metric("pipeline_http_response_bytes", "counter", "Wire bytes received per host.", ("job", "host"), "bytes")
+HTTP_ERRORS = Metric("pipeline_http_request_errors", "counter", "Requests that raised after retries.", ("job", "host"))
+SOURCE_SECONDS = Metric("pipeline_source_duration_seconds", "histogram", "Source fetch duration by outcome (ok, failed, timeout).", ("job", "source", "outcome"), "seconds", LATENCY_BUCKETS)
+SOURCE_STAGE_SECONDS = Metric("pipeline_source_stage_duration_seconds", "histogram", "Time spent in a timed stage (e.g. parse) per source.", ("job", "source", "stage"), "seconds", LATENCY_BUCKETS)
+STAGE_SECONDS = Metric("pipeline_stage_duration_seconds", "histogram", "Sequential script stage durations (fetch, render, write).", ("job", "stage"), "seconds", LATENCY_BUCKETS)
+SYMBOLS = Metric("pipeline_symbols", "counter", "Output metrics by status: live, fallback (previous value published), missing, skipped.", ("job", "status"))
+PAYLOAD_BYTES = Metric("pipeline_payload_bytes", "gauge", "Size of the last payload written per output file.", ("job", "file"), "bytes")
+SNAPSHOT_WRITES = Metric("pipeline_snapshot_writes", "counter", "snapshot_io.write_json calls by result (written, unchanged).", ("job", "result"))
+RUN_SECONDS = Metric("pipeline_run_duration_seconds", "histogram", "Wall time from telemetry.start_run to finish_run.", ("job",), "seconds", RUN_BUCKETS)
+LAST_RUN = Metric("pipeline_last_run_timestamp_seconds", "gauge", "Unix time the job last finished.", ("job",), "seconds")
+
+FAMILIES = (
+    HTTP_SECONDS, HTTP_BYTES, HTTP_ERRORS, SOURCE_SECONDS, SOURCE_STAGE_SECONDS, STAGE_SECONDS,
+    SYMBOLS, PAYLOAD_BYTES, SNAPSHOT_WRITES, RUN_SECONDS, LAST_RUN,
+)
+
+_JOB: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("metrics_job", default=None)
+
+
+def bind_job(job: Optional[str]) -> None:
+    _JOB.set(job)
+
+
+def _job() -> Optional[str]:
+    return _JOB.get() if ENABLED else None
+
+
+def observe_request(host: str, seconds: float, bytes_in: int, failed: bool) -> None:
+    job = _job()
+    if job is None:
+        return
+    HTTP_SECONDS.observe((job, host), seconds)
+    if bytes_in:
+        HTTP_BYTES.inc((job, host), bytes_in)
+    if failed:
+        HTTP_ERRORS.inc((job, host))
+
+
+def observe_source(source: str, seconds: float, outcome: str) -> None:
+    job = _job()
+    if job is not None:
+        SOURCE_SECONDS.observe((job, source, outcome), seconds)
+
+
+def observe_stage(stage: str, seconds: float, source: Optional[str] = None) -> None:
+    job = _job()
+    if job is None:
+        return
+    if source:
+        SOURCE_STAGE_SECONDS.observe((job, source, stage), seconds)
+    else:
+        STAGE_SECONDS.observe((job, stage), seconds)
+
+
+def count_symbol(status: str) -> None:
+    job = _job()
+    if job is not None:
+        SYMBOLS.inc((job, status))
+
+
+def record_write(sizes: Dict[pathlib.Path, int], written: bool) -> None:
+    """One write_json call: bytes per file actually written (empty when unchanged)."""
+    job = _job()
+    if job is None:
+        return
+    SNAPSHOT_WRITES.inc((job, "written" if written else "unchanged"))
+    for path, size in sizes.items():
+        try:
+            name = str(path.resolve().relative_to(ROOT))
+        except ValueError:
+            name = str(path)
+        PAYLOAD_BYTES.set((job, name), size)
+
+
+def render(job: Optional[str] = None) -> str:
+    """Every family in OpenMetrics text, limited to one job's series when `job` is given."""
+    lines: List[str] = []
+    for family in FAMILIES:
+        lines.extend(family.render(job))
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def finish_job(job: str, seconds: float, directory: pathlib.Path = METRICS_DIR) -> None:
+    """Record the run's duration and rewrite the job's textfile."""
+    if not ENABLED:
+        return
+    RUN_SECONDS.observe((job,), seconds)
+    LAST_RUN.set((job,), round(time.time(), 3))
+    try:
+        snapshot_io.write_atomic(directory / f"{job}.prom", render(job).encode("utf-8"))
+    except OSError as e:
+        print(f"warn: metrics: could not write {directory / f'{job}.prom'}: {e}")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 (http.server API)
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+    """Serve every job's series on http://host:port/metrics from a daemon thread."""
+    server = http.server.ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"metrics: serving http://{host}:{server.server_address[1]}/metrics")
+    return server
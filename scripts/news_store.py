@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Incremental RSS ingestion: a streaming item reader and a persistent seen-item index.
+
+The store keeps, under pipelines/store/news/:
+  seen.log     append-only `<unix ts>\t<bucket>\t<key>` lines, one per item key sighted; replayed
+               into a bounded LRU on load and compacted once it holds 2x the capacity
+  feeds.json   per-bucket digest of the last RSS body ingested, so an unchanged feed is skipped
+               without parsing
+
+An item's keys are its guid (or link) and its normalised title; it is new when none of them is
+in the index. The index is shared across buckets, so a story matched by both the macro and the
+crypto query is kept once, in the first bucket that saw it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from snapshot_io import write_atomic
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STORE_DIR = pathlib.Path(os.environ.get("PROJECT_MARK_NEWS_STORE_DIR") or ROOT / "pipelines" / "store" / "news")
+
+MAX_SEEN = 5000
+CHUNK_SIZE = 16 * 1024
+
+Item = Dict[str, str]
+
+
+def iter_rss_items(body: bytes, chunk_size: int = CHUNK_SIZE) -> Iterator[Item]:
+    """Yield {title, link, pubDate, guid} per <item>, feeding the parser `chunk_size` bytes at a time.
+
+    Parsing stops as soon as the caller stops iterating, so the rest of the document is never read.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        parser.feed(view[start : start + chunk_size])
+        for _, elem in parser.read_events():
+            if elem.tag != "item":
+                continue
+            title = (elem.findtext("title") or "").strip()
+            link = (elem.findtext("link") or "").strip()
+            pub_date = (elem.findtext("pubDate") or "").strip()
+            guid = (elem.findtext("guid") or "").strip()
+            elem.clear()
+            if title and link:
+                yield {"title": title, "link": link, "pubDate": pub_date, "guid": guid}
+    parser.close()
+
+
+def parse_rss(body: bytes, limit: int) -> List[Item]:
+    """The first `limit` items of a feed as {title, link, pubDate}."""
+    out: List[Item] = []
+    if limit <= 0:
+        return out
+    for item in iter_rss_items(body):
+        out.append(public(item))
+        if len(out) >= limit:
+            break
+    return out
+
+
+def public(item: Item) -> Item:
+    return {"title": item["title"], "link": item["link"], "pubDate": item.get("pubDate", "")}
+
+
+def _norm_title(title: str) -> str:
+    return re.sub(r"\W+", " ", title.lower()).strip()
+
+
+def item_keys(item: Item) -> Tuple[str, ...]:
+    ident = " ".join((item.get("guid") or item.get("link") or "").split())
+    title = _norm_title(item.get("title") or "")
+    return tuple(k for k in ((f"id:{ident}" if ident else ""), (f"t:{title}" if title else "")) if k)
+
+
+def pub_ts(item: Item) -> float:
+    try:
+        return parsedate_to_datetime(item.get("pubDate") or "").timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return 0.0
+
+
+class SeenIndex:
+    """Bounded LRU of item keys, persisted as an append-only log."""
+
+    def __init__(self, store_dir: pathlib.Path = STORE_DIR, capacity: int = MAX_SEEN):
+        self.path = store_dir / "seen.log"
+        self.feeds_path = store_dir / "feeds.json"
+        self.capacity = capacity
+        self.keys: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.pending: List[Tuple[float, str, str]] = []
+        self.log_lines = 0
+        self.feeds: Dict[str, str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t", 2)
+                    if len(parts) != 3:
+                        continue
+                    self.log_lines += 1
+                    try:
+                        ts = float(parts[0])
+                    except ValueError:
+                        continue
+                    self._put(parts[2], ts, parts[1])
+        except OSError:
+            pass
+        try:
+            feeds = json.loads(self.feeds_path.read_text(encoding="utf-8"))
+            self.feeds = {k: v for k, v in feeds.items() if isinstance(v, str)} if isinstance(feeds, dict) else {}
+        except (OSError, ValueError):
+            self.feeds = {}
+
+    def _put(self, key: str, ts: float, bucket: str) -> None:
+        self.keys[key] = (ts, bucket)
+        self.keys.move_to_end(key)
+        while len(self.keys) > self.capacity:
+            self.keys.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def seen(self, item: Item) -> bool:
+        return any(k in self.keys for k in item_keys(item))
+
+    def mark(self, item: Item, bucket: str, now: Optional[float] = None) -> None:
+        """Record a sighting; keys already in the index are refreshed rather than re-logged every run."""
+        now = time.time() if now is None else now
+        for key in item_keys(item):
+            prev = self.keys.get(key)
+            if prev is not None and now - prev[0] < 86400.0:
+                self.keys.move_to_end(key)
+                continue
+            self._put(key, now, bucket)
+            self.pending.append((now, bucket, key))
+
+    def take_new(self, body: bytes, bucket: str, limit: int, max_scan: int = 100) -> Tuple[List[Item], int]:
+        """Up to `limit` unseen items from `body` (feed order), marking everything scanned; returns (items, scanned).
+
+        The body's digest is recorded only once it has been read without error.
+        """
+        new: List[Item] = []
+        scanned = 0
+        for item in iter_rss_items(body):
+            scanned += 1
+            if not self.seen(item):
+                new.append(public(item))
+            self.mark(item, bucket)
+            if len(new) >= limit or scanned >= max_scan:
+                break
+        self.feeds[bucket] = hashlib.sha1(body).hexdigest()
+        return new, scanned
+
+    def feed_unchanged(self, bucket: str, body: bytes) -> bool:
+        return self.feeds.get(bucket) == hashlib.sha1(body).hexdigest()
+
+    def flush(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.log_lines + len(self.pending) > 2 * self.capacity:
+            lines = "".join(f"{ts:.0f}\t{bucket}\t{key}\n" for key, (ts, bucket) in self.keys.items())
+            write_atomic(self.path, lines.encode("utf-8"))
+            self.log_lines = len(self.keys)
+        elif self.pending:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("".join(f"{ts:.0f}\t{bucket}\t{key}\n" for ts, bucket, key in self.pending))
+            self.log_lines += len(self.pending)
+        self.pending.clear()
+        feeds = (json.dumps(dict(sorted(self.feeds.items())), indent=1) + "\n").encode("utf-8")
+        try:
+            current = self.feeds_path.read_bytes()
+        except OSError:
+            current = b""
+        if feeds != current:
+            write_atomic(self.feeds_path, feeds)
+
+
+def merge_feed(prev: Iterable[Item], new: List[Item], size: int) -> List[Item]:
+    """New items ahead of the previous feed, newest first, deduplicated and capped at `size`."""
+    out: List[Item] = []
+    keys: set = set()
+    for item in sorted(new, key=pub_ts, reverse=True) + [public(p) for p in prev if isinstance(p, dict) and p.get("link")]:
+        ks = item_keys(item)
+        if any(k in keys for k in ks):
+            continue
+        keys.update(ks)
+        out.append(item)
+        if len(out) >= size:
+            break
+    return out
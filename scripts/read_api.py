@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""Local read API: the dashboard snapshots and the gateway's live endpoints, served from memory.
+
+A stdlib asyncio HTTP/1.1 server (keep-alive; GET, HEAD and OPTIONS) that can stand in for
+workers/mode-a-gateway.js on a self-hosted setup:
+
+  /data/<file>, /api/<dir>/<file>   JSON files under dashboard/data and dashboard/api
+  /api/live                         BTC/ETH/SOL, dominance, fear & greed, USD/KRW, Upbit, Coinbase premium
+  /api/crypto-prices?tickers=A,B    spot quotes from Binance, then Bybit/OKX for tickers still missing
+  /health                           uptime plus cache and refresh counters
+
+Static files are held in memory with gzip (and brotli, when installed) bodies compressed once
+per load, and re-read when their (mtime, size) changes, checked at most every STAT_INTERVAL_SEC.
+Live payloads are cached for LIVE_TTL_SEC like the worker, then served stale for up to
+LIVE_STALE_SEC more while a refresh runs. Every representation has a strong ETag (one per content
+coding), and a matching If-None-Match gets a 304.
+
+Refreshes are single-flight: every request that finds a key missing or stale joins the one
+asyncio task refreshing it, so a thousand concurrent clients cause one set of upstream calls.
+Upstream calls go through http_client (keep-alive pool, circuit breakers) in worker threads.
+
+Usage:
+  python scripts/read_api.py --port 8787
+  # dashboard: window.PROJECT_MARK_API_BASE = "http://127.0.0.1:8787"
+  python scripts/bench_read_api.py            # load test against a replayed upstream
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import pathlib
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import http_client
+import update_exchange_tickers
+from fetch_stage import run_sources
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+# URL prefix -> directory served under it.
+STATIC_ROOTS = {
+    "/data/": ROOT / "dashboard" / "data",
+    "/api/": ROOT / "dashboard" / "api",
+}
+VERSIONED_FILE = re.compile(r"^(bundle|delta)-\d+\.")  # snapshot_bundle.py output never changes
+
+LIVE_TTL_SEC = 60
+LIVE_STALE_SEC = 30
+LIVE_MAX_KEYS = 256
+UPSTREAM_TIMEOUT_SEC = 10
+STAT_INTERVAL_SEC = 1.0
+IDLE_TIMEOUT_SEC = 15.0
+MAX_HEADER_BYTES = 16 * 1024
+MAX_TICKERS = 200
+MIN_COMPRESS_BYTES = 256
+
+CORS = {"Access-Control-Allow-Origin": "*"}
+JSON_TYPE = "application/json; charset=utf-8"
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 502: "Bad Gateway"}
+
+
+@dataclass(frozen=True)
+class Body:
+    """One resource with its encoded forms, each with its own strong ETag."""
+
+    identity: bytes
+    encoded: Dict[str, bytes]  # content coding -> body, only when smaller than identity
+    digest: str
+    content_type: str
+    cache_control: str
+
+    def pick(self, accept_encoding: str) -> Tuple[Optional[str], bytes, str]:
+        """(content coding or None, body, quoted ETag) for the request's Accept-Encoding."""
+        accepted = _accepted_codings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and coding in accepted:
+                return coding, self.encoded[coding], f'"{self.digest}-{coding}"'
+        return None, self.identity, f'"{self.digest}"'
+
+
+@functools.lru_cache(maxsize=64)
+def _accepted_codings(header: str) -> FrozenSet[str]:
+    out = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            out.add(name.strip().lower())
+    return frozenset(out)
+
+
+def make_body(data: bytes, content_type: str = JSON_TYPE, cache_control: str = "no-cache") -> Body:
+    encoded: Dict[str, bytes] = {}
+    if len(data) >= MIN_COMPRESS_BYTES:
+        gz = gzip.compress(data, compresslevel=6, mtime=0)
+        if len(gz) < len(data):
+            encoded["gzip"] = gz
+        if brotli is not None:
+            br = brotli.compress(data)
+            if len(br) < len(data):
+                encoded["br"] = br
+    return Body(data, encoded, hashlib.sha256(data).hexdigest()[:32], content_type, cache_control)
+
+
+def json_body(payload: Any, cache_control: str = "no-store") -> Body:
+    return make_body(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), JSON_TYPE, cache_control)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 specifies for If-None-Match."""
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+
+# --- static files --------------------------------------------------------------------------------
+
+
+class StaticFiles:
+    """Files under STATIC_ROOTS, loaded on first request and reloaded when they change on disk."""
+
+    def __init__(self, roots: Dict[str, pathlib.Path] = STATIC_ROOTS):
+        self.roots = {prefix: root.resolve() for prefix, root in roots.items()}
+        self.entries: Dict[pathlib.Path, Tuple[Tuple[int, int], float, Body]] = {}
+        self.reloads = 0
+
+    def resolve(self, url_path: str) -> Optional[pathlib.Path]:
+        for prefix, root in self.roots.items():
+            if not url_path.startswith(prefix):
+                continue
+            path = (root / urllib.parse.unquote(url_path[len(prefix):])).resolve()
+            if path.suffix == ".json" and path.is_relative_to(root):
+                return path
+        return None
+
+    def get(self, url_path: str) -> Optional[Body]:
+        path = self.resolve(url_path)
+        if path is None:
+            return None
+        now = time.monotonic()
+        hit = self.entries.get(path)
+        if hit is not None and now - hit[1] < STAT_INTERVAL_SEC:
+            return hit[2]
+        try:
+            st = path.stat()
+        except OSError:
+            self.entries.pop(path, None)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        if hit is not None and hit[0] == stamp:
+            self.entries[path] = (stamp, now, hit[2])
+            return hit[2]
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        cache = "public, max-age=31536000, immutable" if VERSIONED_FILE.match(path.name) else "no-cache"
+        body = make_body(data, JSON_TYPE, cache)
+        self.entries[path] = (stamp, now, body)
+        self.reloads += 1
+        return body
+
+
+# --- live endpoints ------------------------------------------------------------------------------
+
+
+class LiveCache:
+    """TTL cache with stale-while-revalidate and one in-flight refresh per key."""
+
+    def __init__(self, ttl: float = LIVE_TTL_SEC, stale: float = LIVE_STALE_SEC, max_keys: int = LIVE_MAX_KEYS):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_keys = max_keys
+        self.entries: "OrderedDict[str, Tuple[float, Body]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.refreshes: Dict[str, int] = {}
+        self.coalesced = 0
+        self.served_stale = 0
+        self.errors = 0
+
+    async def get(self, key: str, produce: Callable[[], Any]) -> Body:
+        hit = self.entries.get(key)
+        age = time.monotonic() - hit[0] if hit is not None else None
+        if hit is not None:
+            self.entries.move_to_end(key)
+            if age < self.ttl:
+                return hit[1]
+        task = self._refresh(key, produce)
+        if hit is not None and age < self.ttl + self.stale:
+            self.served_stale += 1
+            return hit[1]
+        try:
+            return await asyncio.shield(task)
+        except (OSError, ValueError):
+            if hit is None:
+                raise
+            self.served_stale += 1
+            return hit[1]
+
+    def _refresh(self, key: str, produce: Callable[[], Any]) -> asyncio.Task:
+        task = self.inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.get_running_loop().create_task(self._run(key, produce))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # background failures are counted, not logged
+        self.inflight[key] = task
+        return task
+
+    async def _run(self, key: str, produce: Callable[[], Any]) -> Body:
+        t0 = time.monotonic()
+        try:
+            payload = await asyncio.to_thread(produce)
+        except Exception as e:  # a malformed upstream payload is a failed refresh, not a crashed connection
+            self.errors += 1
+            print(f"warn: refresh {key} failed: {type(e).__name__}: {e}")
+            raise OSError(f"refresh {key} failed: {e}") from e
+        finally:
+            self.inflight.pop(key, None)
+        body = json_body(payload, f"public, max-age={int(self.ttl)}")
+        self.entries[key] = (time.monotonic(), body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+        self.refreshes[key] = self.refreshes.get(key, 0) + 1
+        print(f"refresh: {key} {(time.monotonic() - t0) * 1000.0:.0f}ms")
+        return body
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def to_num(value: Any) -> Optional[float]:
+    try:
+        return None if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+LIVE_SOURCES = {
+    "binance": "https://api.binance.com/api/v3/ticker/24hr?symbols=%5B%22BTCUSDT%22,%22ETHUSDT%22,%22SOLUSDT%22%5D",
+    "simple": "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum,solana&vs_currencies=usd&include_24hr_change=true",
+    "global": "https://api.coingecko.com/api/v3/global",
+    "fear_greed": "https://api.alternative.me/fng/?limit=1&format=json",
+    "fx": "https://open.er-api.com/v6/latest/USD",
+    "upbit": "https://api.upbit.com/v1/ticker?markets=KRW-BTC",
+    "coinbase": "https://api.coinbase.com/v2/prices/BTC-USD/spot",
+}
+
+
+def live_payload() -> Dict[str, Any]:
+    """Same shape as the worker's /api/live; each field falls back independently."""
+    results = run_sources(
+        {name: (lambda u=url: http_client.get_json(u, timeout=UPSTREAM_TIMEOUT_SEC), UPSTREAM_TIMEOUT_SEC, None) for name, url in LIVE_SOURCES.items()},
+        deadline_sec=UPSTREAM_TIMEOUT_SEC,
+    )
+    if not any(r.ok for r in results.values()):
+        raise OSError("every live source failed")
+    v = {name: r.value for name, r in results.items()}
+    ticker = {row.get("symbol"): row for row in v["binance"] or [] if isinstance(row, dict)} if isinstance(v["binance"], list) else {}
+    simple = v["simple"] or {}
+
+    def coin(symbol: str, cg_id: str) -> Dict[str, Any]:
+        price = to_num((ticker.get(f"{symbol}USDT") or {}).get("lastPrice"))
+        pct = to_num((ticker.get(f"{symbol}USDT") or {}).get("priceChangePercent"))
+        cg = simple.get(cg_id) or {}
+        return {
+            "price_usd": price if price is not None else to_num(cg.get("usd")),
+            "change_24h_pct": pct if pct is not None else to_num(cg.get("usd_24h_change")),
+            "source": "binance" if price is not None else "coingecko",
+        }
+
+    btc_cg = to_num((simple.get("bitcoin") or {}).get("usd"))
+    coinbase_spot = to_num(((v["coinbase"] or {}).get("data") or {}).get("amount"))
+    premium = (coinbase_spot - btc_cg) / btc_cg * 100 if coinbase_spot is not None and btc_cg else None
+    dominance = ((v["global"] or {}).get("data") or {}).get("market_cap_percentage") or {}
+    upbit = v["upbit"] if isinstance(v["upbit"], list) and v["upbit"] else [{}]
+    return {
+        "as_of": now_iso(),
+        "btc": {**coin("BTC", "bitcoin"), "upbit_krw": to_num(upbit[0].get("trade_price"))},
+        "eth": coin("ETH", "ethereum"),
+        "sol": coin("SOL", "solana"),
+        "dominance": {"btc": dominance.get("btc"), "eth": dominance.get("eth"), "source": "coingecko"},
+        "fear_greed": to_num((((v["fear_greed"] or {}).get("data") or [{}])[0]).get("value")) or None,
+        "fx": {"usdkrw": to_num(((v["fx"] or {}).get("rates") or {}).get("KRW"))},
+        "coinbase": {
+            "btc_usd": coinbase_spot,
+            "global_avg_usd": btc_cg,
+            "premium_pct": premium,
+            "source": "coinbase+coingecko-global" if coinbase_spot is not None and btc_cg is not None else None,
+        },
+    }
+
+
+def parse_tickers(raw: str) -> List[str]:
+    tickers = [t.strip().upper() for t in raw.split(",")]
+    return sorted({t for t in tickers if re.fullmatch(r"[A-Z0-9]+", t)})[:MAX_TICKERS]
+
+
+def crypto_prices_payload(tickers: List[str]) -> Dict[str, Any]:
+    """The worker's /api/crypto-prices: venues in update_exchange_tickers.VENUES order, each asked
+    only for the tickers the previous ones missed."""
+    records: Dict[str, Optional[Dict[str, dict]]] = {}
+    for name, (url, key, suffix, _) in update_exchange_tickers.VENUES.items():
+        missing = [t for t in tickers if not any(t in (r or {}) for r in records.values())]
+        if not missing:
+            break
+        try:
+            records[name] = update_exchange_tickers.fetch_dump(url, key, suffix, missing)
+        except (OSError, ValueError) as e:
+            print(f"warn: {name} tickers failed: {e}")
+            records[name] = None
+    if all(r is None for r in records.values()):
+        raise OSError("every exchange failed")
+    found = update_exchange_tickers.merge(tickers, records)
+    fields = ("price", "change_24h", "volume_24h", "source", "pair")
+    return {
+        "as_of": now_iso(),
+        "prices": {t: {f: found.get(t, {}).get(f) for f in fields} for t in tickers},
+        "sources": list(update_exchange_tickers.VENUES),
+    }
+
+
+# --- HTTP ----------------------------------------------------------------------------------------
+
+
+class ReadApi:
+    def __init__(self) -> None:
+        self.static = StaticFiles()
+        self.live = LiveCache()
+        self.started = time.time()
+        self.requests = 0
+        self.not_modified = 0
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "uptime_sec": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "static": {"files": len(self.static.entries), "loads": self.static.reloads},
+            "live": {
+                "keys": len(self.live.entries),
+                "refreshes": dict(sorted(self.live.refreshes.items())),
+                "coalesced": self.live.coalesced,
+                "served_stale": self.live.served_stale,
+                "errors": self.live.errors,
+            },
+        }
+
+    async def route(self, path: str, query: str) -> Tuple[int, Body]:
+        if path == "/health":
+            return 200, json_body(self.health())
+        if path == "/api/live":
+            return 200, await self.live.get("live", live_payload)
+        if path == "/api/crypto-prices":
+            tickers = parse_tickers(urllib.parse.parse_qs(query).get("tickers", [""])[0])
+            if not tickers:
+                return 200, json_body({"as_of": now_iso(), "prices": {}, "sources": list(update_exchange_tickers.VENUES)})
+            return 200, await self.live.get("crypto-prices:" + ",".join(tickers), lambda: crypto_prices_payload(tickers))
+        body = self.static.get(path)
+        if body is not None:
+            return 200, body
+        return 404, json_body({"error": "not found"})
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        self.requests += 1
+        if method == "OPTIONS":
+            return 204, {**CORS, "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS", "Access-Control-Allow-Headers": "content-type, if-none-match"}, b""
+        if method not in ("GET", "HEAD"):
+            return 405, {**CORS, "Allow": "GET, HEAD, OPTIONS"}, b""
+        parts = urllib.parse.urlsplit(target)
+        try:
+            status, body = await self.route(parts.path, parts.query)
+        except (OSError, ValueError) as e:
+            status, body = 502, json_body({"error": str(e)})
+
+        coding, data, etag = body.pick(headers.get("accept-encoding", ""))
+        out = {**CORS, "Cache-Control": body.cache_control, "Vary": "Accept-Encoding"}
+        if status == 200:
+            out["ETag"] = etag
+            if etag_matches(headers.get("if-none-match", ""), etag):
+                self.not_modified += 1
+                return 304, out, b""
+        out["Content-Type"] = body.content_type
+        if coding:
+            out["Content-Encoding"] = coding
+        out["Content-Length"] = str(len(data))
+        return status, out, b"" if method == "HEAD" else data
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT_SEC)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    return
+                if length:
+                    await reader.readexactly(length)  # no endpoint takes a body; drain it to keep the connection usable
+
+                status, out, data = await self.respond(method.upper(), target, headers)
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+                out["Connection"] = "keep-alive" if keep_alive else "close"
+                if status in (204, 304):
+                    out.pop("Content-Length", None)
+                elif "Content-Length" not in out:
+                    out["Content-Length"] = str(len(data))
+                head_out = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in out.items()) + "\r\n"
+                writer.write(head_out.encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    app = ReadApi()
+    server = await asyncio.start_server(app.handle, host, port, limit=MAX_HEADER_BYTES, backlog=4096)
+    bound = server.sockets[0].getsockname()
+    print(f"read_api: serving http://{bound[0]}:{bound[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve dashboard snapshots and live endpoints from memory.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_client.close_all()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Parser regression check over recorded cassettes, fanned out across processes.
+
+Every exchange in a cassette is replayed (from memory, no network) through the same fetch/parse
+functions the updaters use, and the normalised results are compared with the cassette's
+expected.json. Run with --update to (re)write expected.json after an intended parser change.
+
+Usage:
+  python scripts/replay_cassettes.py runtime/cassettes/            # every cassette under the dir
+  python scripts/replay_cassettes.py CASSETTE [CASSETTE ...] --jobs 8
+  python scripts/replay_cassettes.py runtime/cassettes/ --update
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import cassette
+
+EXPECTED_FILE = "expected.json"
+
+
+def probe(url: str) -> Any:
+    """Normalised parse result for one recorded URL, via the updaters' own fetch functions."""
+    import daily_macro_brief
+    import fred_store
+    import http_client
+    import news_store
+    import update_crypto_data
+    import update_etf_data
+    import update_exchange_tickers
+    import update_macro_stocks_data
+
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    query = urllib.parse.parse_qs(parts.query)
+
+    if host == "farside.co.uk":
+        date_text, value, rows = update_etf_data.fetch_farside_flows(url, None)
+        return {"date": date_text, "total": value, "rows": len(rows), "last": list(rows[-1]) if rows else None}
+    if host == "defillama.com":
+        return list(update_etf_data.latest_defillama_etf_flows())
+    if host == "fred.stlouisfed.org":
+        rows = fred_store.parse_fred_rows(http_client.get(url).text(errors="ignore"), query.get("id", [""])[0])
+        return {"rows": len(rows), "first": list(rows[0]) if rows else None, "last": list(rows[-1]) if rows else None}
+    if host == "query1.finance.yahoo.com" and parts.path.startswith("/v7/"):
+        symbols = query.get("symbols", [""])[0].split(",")
+        quotes = update_macro_stocks_data.fetch_yahoo_chunk(symbols)
+        return {sym: list(update_macro_stocks_data.get_quote_fields(quotes, sym)) for sym in symbols}
+    if host == "query1.finance.yahoo.com" and parts.path.startswith("/v8/"):
+        symbol = urllib.parse.unquote(parts.path.rsplit("/", 1)[-1])
+        closes = daily_macro_brief.fetch_yahoo_closes(symbol, query.get("range", ["5d"])[0])
+        last = max(closes) if closes else None
+        return {"points": len(closes), "last": [last, closes[last]] if last else None}
+    if host == "news.google.com":
+        return news_store.parse_rss(http_client.get(url).body, 8)
+    if host == "open.er-api.com":
+        return (http_client.get_json(url).get("rates") or {}).get("KRW")
+    if host == "api.coingecko.com" and parts.path.startswith("/api/v3/coins/markets"):
+        return {r["id"]: [r.get("current_price"), r.get("market_cap")] for r in update_crypto_data.fetch_markets(url)}
+    for venue_url, key, suffix, normalise in update_exchange_tickers.VENUES.values():
+        if url == venue_url:
+            records = update_exchange_tickers.fetch_dump(url, key, suffix, update_exchange_tickers.load_tickers())
+            return {t: normalise(r) for t, r in sorted(records.items())}
+    if host == "fapi.binance.com":
+        return update_crypto_data.fetch_funding()
+    if host == "api.coingecko.com":
+        return {k: [q.price, q.change_pct] for k, q in daily_macro_brief.fetch_coingecko_prices().items()}
+    if host == "api.alternative.me":
+        return daily_macro_brief.fetch_fear_greed()
+    return {"bytes": len(http_client.get(url).body)}
+
+
+def check(root: str, update: bool) -> Dict[str, Any]:
+    """Replay one cassette; returns {"cassette", "status", "exchanges", "changed", "elapsed_ms"}."""
+    path = pathlib.Path(root)
+    t0 = time.perf_counter()
+    player = cassette.replay(path)
+    results: Dict[str, Any] = {}
+    try:
+        for url in sorted(player.exact):
+            try:
+                results[url] = probe(url)
+            except Exception as e:
+                results[url] = {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        cassette.stop()
+    results = json.loads(json.dumps(results, ensure_ascii=False))
+
+    expected_path = path / EXPECTED_FILE
+    try:
+        expected = json.loads(expected_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        expected = None
+    changed = [] if expected is None else sorted(u for u in set(results) | set(expected) if results.get(u) != expected.get(u))
+    status = "new" if expected is None else ("changed" if changed else "ok")
+    if update and status != "ok":
+        expected_path.write_text(json.dumps(results, ensure_ascii=False, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    return {
+        "cassette": root,
+        "status": status,
+        "exchanges": len(results),
+        "changed": [(u, (expected or {}).get(u), results.get(u)) for u in changed],
+        "elapsed_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+
+
+def find_cassettes(paths: List[str]) -> List[str]:
+    out: List[str] = []
+    for p in map(pathlib.Path, paths):
+        if any(p.glob("*/*.json")) and not any(p.glob("*/*/*.json")):
+            out.append(str(p))
+        else:
+            out.extend(str(d) for d in sorted(p.iterdir()) if d.is_dir() and any(d.glob("*/*.json")))
+    return out
+
+
+def _short(v: Any, n: int = 160) -> str:
+    s = json.dumps(v, ensure_ascii=False)
+    return s if len(s) <= n else s[: n - 3] + "..."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded cassettes through the parsers and diff against expected.json.")
+    parser.add_argument("paths", nargs="+", help="Cassette directories, or directories containing cassettes.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 2, help="Worker processes.")
+    parser.add_argument("--update", action="store_true", help="Write expected.json for new or changed cassettes.")
+    args = parser.parse_args(argv)
+
+    roots = find_cassettes(args.paths)
+    if not roots:
+        print("no cassettes found", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    if args.jobs <= 1 or len(roots) == 1:
+        reports = [check(r, args.update) for r in roots]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            reports = list(pool.map(check, roots, [args.update] * len(roots), chunksize=max(1, len(roots) // (args.jobs * 4))))
+    elapsed = time.perf_counter() - t0
+
+    counts: Dict[str, int] = {}
+    for r in reports:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+        if r["status"] == "changed":
+            print(f"changed: {r['cassette']} ({len(r['changed'])} of {r['exchanges']} exchanges)")
+            for url, was, now in r["changed"][:5]:
+                print(f"  {url}\n    expected {_short(was)}\n    got      {_short(now)}")
+    exchanges = sum(r["exchanges"] for r in reports)
+    print(
+        f"replayed {len(reports)} cassettes / {exchanges} exchanges in {elapsed * 1000:.0f}ms "
+        f"({exchanges / elapsed:.0f} exchanges/s): " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    )
+    if args.update:
+        return 0
+    return 1 if counts.get("changed") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
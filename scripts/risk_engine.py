@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Rolling correlation, realized volatility and beta over fixed windows for many assets at once.
+
+RollingStats keeps running sums (Σx, Σx², Σxy for every pair) over the last `window` return
+vectors, so a batch seed is one pass per window and each new observation is an O(N²) update
+instead of a full recompute. RiskEngine holds one RollingStats per window (7/30/90 by default).
+"""
+
+from __future__ import annotations
+
+import math
+import operator
+from collections import deque
+from datetime import date
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+WINDOWS = (7, 30, 90)
+ANNUALIZATION = 252
+
+
+class RollingStats:
+    def __init__(self, assets: Sequence[str], window: int):
+        self.assets = list(assets)
+        self.window = window
+        n = len(self.assets)
+        self.rows: Deque[Tuple[float, ...]] = deque()
+        self.sx = [0.0] * n
+        self.sxx = [0.0] * n
+        # Upper triangle (i < j) of Σ x_i·x_j, row-major.
+        self.sxy = [[0.0] * n for _ in range(n)]
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
+
+    def seed(self, returns: Sequence[Sequence[float]]) -> None:
+        """Replace the window with the last `window` return vectors using column-wise sums."""
+        rows = [tuple(r) for r in returns[-self.window:]]
+        self.rows = deque(rows)
+        cols = list(zip(*rows)) if rows else [()] * len(self.assets)
+        n = len(self.assets)
+        self.sx = [math.fsum(c) for c in cols]
+        self.sxx = [sum(map(operator.mul, c, c)) for c in cols]
+        self.sxy = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            ci = cols[i]
+            row = self.sxy[i]
+            for j in range(i + 1, n):
+                row[j] = sum(map(operator.mul, ci, cols[j]))
+
+    def push(self, r: Sequence[float]) -> None:
+        """Add one return vector (same asset order), evicting the oldest once the window is full."""
+        r = tuple(r)
+        n = len(self.assets)
+        old = self.rows.popleft() if len(self.rows) >= self.window else None
+        self.rows.append(r)
+        for i in range(n):
+            ri = r[i]
+            self.sx[i] += ri
+            self.sxx[i] += ri * ri
+            row = self.sxy[i]
+            for j in range(i + 1, n):
+                row[j] += ri * r[j]
+        if old is not None:
+            for i in range(n):
+                oi = old[i]
+                self.sx[i] -= oi
+                self.sxx[i] -= oi * oi
+                row = self.sxy[i]
+                for j in range(i + 1, n):
+                    row[j] -= oi * old[j]
+
+    def _var(self, i: int) -> Optional[float]:
+        k = self.count
+        if k < 2:
+            return None
+        return max(0.0, (self.sxx[i] - self.sx[i] * self.sx[i] / k) / (k - 1))
+
+    def _cov(self, i: int, j: int) -> Optional[float]:
+        k = self.count
+        if k < 2:
+            return None
+        if i == j:
+            return self._var(i)
+        a, b = (i, j) if i < j else (j, i)
+        return (self.sxy[a][b] - self.sx[a] * self.sx[b] / k) / (k - 1)
+
+    def realized_vol(self) -> Dict[str, Optional[float]]:
+        """Annualized standard deviation of returns per asset."""
+        out: Dict[str, Optional[float]] = {}
+        for i, name in enumerate(self.assets):
+            var = self._var(i)
+            out[name] = math.sqrt(var * ANNUALIZATION) if var is not None else None
+        return out
+
+    def corr_matrix(self) -> List[List[Optional[float]]]:
+        n = len(self.assets)
+        sd = [self._var(i) for i in range(n)]
+        sd = [math.sqrt(v) if v else None for v in sd]
+        out: List[List[Optional[float]]] = [[None] * n for _ in range(n)]
+        for i in range(n):
+            if sd[i] is None:
+                continue
+            out[i][i] = 1.0
+            for j in range(i + 1, n):
+                if sd[j] is None:
+                    continue
+                c = max(-1.0, min(1.0, self._cov(i, j) / (sd[i] * sd[j])))
+                out[i][j] = out[j][i] = c
+        return out
+
+    def corr(self, a: str, b: str) -> Optional[float]:
+        i, j = self.assets.index(a), self.assets.index(b)
+        vi, vj = self._var(i), self._var(j)
+        if not vi or not vj:
+            return None
+        return max(-1.0, min(1.0, self._cov(i, j) / math.sqrt(vi * vj)))
+
+    def beta(self, benchmark: str) -> Dict[str, Optional[float]]:
+        b = self.assets.index(benchmark)
+        vb = self._var(b)
+        return {name: (self._cov(i, b) / vb if vb else None) for i, name in enumerate(self.assets)}
+
+
+class RiskEngine:
+    def __init__(self, assets: Sequence[str], windows: Sequence[int] = WINDOWS):
+        self.assets = list(assets)
+        self.stats = {w: RollingStats(self.assets, w) for w in windows}
+
+    def seed(self, returns: Sequence[Sequence[float]]) -> None:
+        for st in self.stats.values():
+            st.seed(returns)
+
+    def push(self, r: Sequence[float]) -> None:
+        for st in self.stats.values():
+            st.push(r)
+
+    def ready(self, window: int) -> bool:
+        return self.stats[window].count >= window
+
+    def corr(self, window: int, a: str, b: str) -> Optional[float]:
+        return self.stats[window].corr(a, b) if self.ready(window) else None
+
+    def snapshot(self, benchmark: Optional[str] = None) -> Dict[str, object]:
+        """JSON-ready view: per window, realized vol, beta and the correlation matrix."""
+        out: Dict[str, object] = {"assets": self.assets, "windows": {}}
+        for w, st in self.stats.items():
+            if not self.ready(w):
+                out["windows"][str(w)] = None
+                continue
+            out["windows"][str(w)] = {
+                "observations": st.count,
+                "vol": _rounded(st.realized_vol()),
+                "beta": _rounded(st.beta(benchmark)) if benchmark in self.assets else None,
+                "corr": [[None if c is None else round(c, 4) for c in row] for row in st.corr_matrix()],
+            }
+        return out
+
+
+def _rounded(d: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+    return {k: (None if v is None else round(v, 4)) for k, v in d.items()}
+
+
+def align_closes(series: Dict[str, Dict[str, float]], ffill: bool = False) -> Tuple[List[str], List[List[float]]]:
+    """Align {asset: {YYYY-MM-DD: close}} on shared weekday dates.
+
+    Without `ffill` only dates where every asset has a close are kept. With `ffill` the weekday
+    union is used and gaps (e.g. exchange holidays) carry the previous close forward, starting
+    from the first date where every asset has a value.
+    """
+    assets = list(series)
+    if not assets:
+        return [], []
+    if ffill:
+        dates = sorted({d for s in series.values() for d in s if date.fromisoformat(d).weekday() < 5})
+    else:
+        common = set.intersection(*(set(s) for s in series.values()))
+        dates = sorted(d for d in common if date.fromisoformat(d).weekday() < 5)
+
+    rows: List[List[float]] = []
+    last: List[Optional[float]] = [None] * len(assets)
+    kept: List[str] = []
+    for d in dates:
+        for i, a in enumerate(assets):
+            v = series[a].get(d)
+            if v is not None:
+                last[i] = v
+        if any(v is None for v in last):
+            continue
+        kept.append(d)
+        rows.append([float(v) for v in last])  # type: ignore[arg-type]
+    return kept, rows
+
+
+def log_returns(rows: Sequence[Sequence[float]]) -> List[List[float]]:
+    out: List[List[float]] = []
+    for prev, cur in zip(rows, rows[1:]):
+        out.append([math.log(c / p) if p > 0 and c > 0 else 0.0 for p, c in zip(prev, cur)])
+    return out
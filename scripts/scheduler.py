@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Run every dashboard updater inside one long-lived process on its own cron cadence.
+
+Modules are imported once, so HTTP keep-alive connections, the FRED series stores and the
+previous snapshots (snapshot_io) stay warm between runs. A job that is still running when it
+comes due again is skipped rather than overlapped. Each run logs its lateness (start time minus
+scheduled time) and duration. Jobs that write a dashboard boot snapshot republish the versioned
+bundle (snapshot_bundle.py) when they finish. A job with `after` dependencies (the brief, which
+reads the other jobs' snapshots) waits for any of them that is running or, with --once, still to
+run, so its inputs are never half-written.
+
+Usage:
+  python scripts/scheduler.py                      # daemon
+  python scripts/scheduler.py --metrics-port 9464  # daemon, serving /metrics on 127.0.0.1
+  python scripts/scheduler.py --once               # run every job once and exit (CI)
+  python scripts/scheduler.py --once --job news    # run selected jobs once
+  python scripts/scheduler.py --once --record DIR  # record a full cycle into a cassette
+  python scripts/scheduler.py --once --replay DIR  # replay it with no network I/O
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import os
+import pathlib
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import cassette
+import daily_macro_brief
+import http_client
+import metrics
+import snapshot_bundle
+import update_crypto_data
+import update_etf_data
+import update_exchange_tickers
+import update_macro_stocks_data
+import update_news_data
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+LOCK_PATH = ROOT / "runtime" / "scheduler.lock"
+
+
+def _cron_field(spec: str, lo: int, hi: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = end = int(part)
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """Minute/hour/day-of-month/month/day-of-week cron expression evaluated in UTC."""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minute = _cron_field(fields[0], 0, 59)
+        self.hour = _cron_field(fields[1], 0, 23)
+        self.day = _cron_field(fields[2], 1, 31)
+        self.month = _cron_field(fields[3], 1, 12)
+        self.weekday = {d % 7 for d in _cron_field(fields[4], 0, 7)}  # 0 and 7 are Sunday
+
+    def matches(self, t: datetime) -> bool:
+        return (
+            t.minute in self.minute
+            and t.hour in self.hour
+            and t.day in self.day
+            and t.month in self.month
+            and (t.isoweekday() % 7) in self.weekday
+        )
+
+    def next_after(self, t: datetime) -> datetime:
+        cur = t.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if cur.hour not in self.hour or cur.day not in self.day or cur.month not in self.month:
+                cur = cur.replace(minute=0) + timedelta(hours=1)
+                continue
+            if self.matches(cur):
+                return cur
+            cur += timedelta(minutes=1)
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
+
+def _set_event() -> threading.Event:
+    event = threading.Event()
+    event.set()
+    return event
+
+
+@dataclass
+class Job:
+    name: str
+    cron: Cron
+    run: Callable[[], int]
+    publishes_bundle: bool = False
+    after: Tuple[str, ...] = ()
+    next_due: Optional[datetime] = None
+    running: threading.Lock = field(default_factory=threading.Lock)
+    idle: threading.Event = field(default_factory=_set_event)
+    runs: int = 0
+    failures: int = 0
+    skipped_overlap: int = 0
+    max_lateness_ms: float = 0.0
+
+
+def default_jobs() -> List[Job]:
+    # Same cadences as .github/workflows/update-dashboard-data.yml and the launchd brief (09:27 KST),
+    # except exchange tickers: every minute here, every 30 minutes in CI.
+    return [
+        Job("macro_stocks", Cron("*/30 * * * *"), lambda: update_macro_stocks_data.main([]), publishes_bundle=True),
+        Job("etf", Cron("*/30 * * * *"), lambda: update_etf_data.main([]), publishes_bundle=True),
+        Job("crypto", Cron("*/30 * * * *"), lambda: update_crypto_data.main([]), publishes_bundle=True),
+        Job("exchanges", Cron("* * * * *"), lambda: update_exchange_tickers.main([])),
+        Job("news", Cron("0 */4 * * *"), lambda: update_news_data.main([]), publishes_bundle=True),
+        Job(
+            "daily_brief",
+            Cron("27 0 * * *"),
+            lambda: daily_macro_brief.main(["--output-dir", str(ROOT / "reports"), "--from-snapshots"]),
+            after=("macro_stocks", "crypto", "news"),
+        ),
+    ]
+
+
+def execute(job: Job, scheduled: Optional[datetime], deps: Sequence[Job] = ()) -> None:
+    """Run `job` once, after waiting for every job in `deps` to be idle."""
+    for dep in deps:
+        if not dep.idle.is_set():
+            print(f"job: {job.name} waiting for {dep.name}")
+            dep.idle.wait()
+    if not job.running.acquire(blocking=False):
+        job.skipped_overlap += 1
+        print(f"job: {job.name} still running, skipped run due {scheduled}")
+        return
+    job.idle.clear()
+    try:
+        http_client.scope_stats()
+        started = datetime.now(timezone.utc)
+        lateness_ms = (started - scheduled).total_seconds() * 1000.0 if scheduled else 0.0
+        job.max_lateness_ms = max(job.max_lateness_ms, lateness_ms)
+        t0 = time.monotonic()
+        try:
+            rc = job.run()
+            ok = not rc
+        except Exception as e:
+            print(f"job: {job.name} raised {type(e).__name__}: {e}")
+            ok = False
+        job.runs += 1
+        if not ok:
+            job.failures += 1
+        print(
+            f"job: {job.name} {'ok' if ok else 'failed'} late={lateness_ms:.0f}ms "
+            f"took={(time.monotonic() - t0) * 1000.0:.0f}ms runs={job.runs} failures={job.failures}"
+        )
+        if job.publishes_bundle and snapshot_bundle.ENABLED:
+            try:
+                snapshot_bundle.publish()
+            except (OSError, ValueError) as e:
+                print(f"warn: bundle publish after {job.name} failed: {e}")
+    finally:
+        job.idle.set()
+        job.running.release()
+
+
+def dependencies(job: Job, jobs: List[Job]) -> List[Job]:
+    return [dep for dep in jobs if dep.name in job.after]
+
+
+def run_once(jobs: List[Job]) -> int:
+    # Mark every job busy up front so a dependent job can't start before its producers have run.
+    for job in jobs:
+        job.idle.clear()
+
+    def run(job: Job) -> None:
+        try:
+            execute(job, None, dependencies(job, jobs))
+        finally:
+            job.idle.set()
+
+    threads = [threading.Thread(target=run, args=(job,), name=job.name) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    http_client.close_all()
+    return 1 if any(job.failures for job in jobs) else 0
+
+
+def run_forever(jobs: List[Job], stop: threading.Event) -> int:
+    now = datetime.now(timezone.utc)
+    for job in jobs:
+        job.next_due = job.cron.next_after(now)
+        print(f"job: {job.name} [{job.cron.expr}] next at {job.next_due.isoformat()}")
+
+    while not stop.is_set():
+        now = datetime.now(timezone.utc)
+        for job in jobs:
+            if job.next_due is not None and job.next_due <= now:
+                due = job.next_due
+                job.next_due = job.cron.next_after(now)
+                threading.Thread(target=execute, args=(job, due, dependencies(job, jobs)), name=job.name, daemon=True).start()
+        wake = min(job.next_due for job in jobs if job.next_due is not None)
+        stop.wait(max(0.0, min(60.0, (wake - datetime.now(timezone.utc)).total_seconds())))
+
+    http_client.close_all()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    jobs = default_jobs()
+    names = [job.name for job in jobs]
+    parser = argparse.ArgumentParser(description="In-process scheduler for the dashboard updaters.")
+    parser.add_argument("--once", action="store_true", help="Run the selected jobs once and exit.")
+    parser.add_argument("--job", action="append", choices=names, help="Limit to these jobs (repeatable).")
+    parser.add_argument("--metrics-port", type=int, default=int(os.environ.get("PROJECT_MARK_METRICS_PORT") or 0),
+                        help="Daemon only: serve OpenMetrics on http://127.0.0.1:PORT/metrics (0 = off).")
+    cassette.add_arguments(parser)
+    args = parser.parse_args(argv)
+    cassette.apply(args)
+
+    selected = [job for job in jobs if not args.job or job.name in args.job]
+    if args.once:
+        return run_once(selected)
+
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = LOCK_PATH.open("w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"scheduler already running (lock held: {LOCK_PATH})", file=sys.stderr)
+        return 1
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    return run_forever(selected, stop)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
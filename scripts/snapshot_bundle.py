@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Publish the dashboard's boot snapshots as one versioned bundle plus a chain of deltas.
+
+dashboard/data/bundle/ holds:
+  manifest.json            {version, hash, updated_at, bundle: {path, bytes}, deltas: [{from, to, path, bytes}]}
+  bundle-<v>.json          {version, parts: {snapshot, news, etf, macro, universe, stocks}} (+ .min.json)
+  delta-<v>.json           {from: v-1, to: v, ops: [...]}, JSON-Patch (RFC 6902) add/remove/replace ops on `parts`
+
+A new version is cut only when some part's content hash (volatile timestamps removed, as in
+snapshot_io.write_json) changed. The last MAX_DELTAS deltas
+are kept. A client holding version v polls the manifest, applies the deltas from v (when the chain
+is contiguous and smaller than the bundle), and otherwise fetches the full bundle. Versioned files
+never change once written, so they can be cached indefinitely.
+
+The bundle is a build output and is not committed: the Pages deploy workflow runs this script
+over the committed snapshots, carrying bundle/ between deploys in actions/cache so versions and
+the delta chain continue. scheduler.py also publishes after every snapshot job for a local
+dashboard; PROJECT_MARK_BUNDLE=0 turns that off (the data workflow sets it).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from snapshot_io import content_hash, read_json, write_atomic, write_json
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "dashboard" / "data"
+BUNDLE_DIR = DATA_DIR / "bundle"
+MANIFEST = BUNDLE_DIR / "manifest.json"
+
+# Bundle part name -> snapshot file, in dashboard/app.js loadStatic() order.
+PARTS = {
+    "snapshot": DATA_DIR / "snapshot.json",
+    "news": DATA_DIR / "news.json",
+    "etf": DATA_DIR / "etf.json",
+    "macro": DATA_DIR / "macro_snapshot.json",
+    "universe": DATA_DIR / "crypto_custom_universe.json",
+    "stocks": DATA_DIR / "stocks_watchlist.json",
+}
+MAX_DELTAS = 96  # two days of 30-minute updates
+ENABLED = os.environ.get("PROJECT_MARK_BUNDLE", "1") != "0"
+
+_LOCK = threading.Lock()
+
+
+def _pointer(path: str, key: Any) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """JSON-Patch ops turning `old` into `new`: objects are diffed per key, equal-length lists per
+    element; anything else that differs (including a list that grew or shrank) is replaced whole."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = [{"op": "remove", "path": _pointer(path, k)} for k in old if k not in new]
+        for k, v in new.items():
+            if k not in old:
+                ops.append({"op": "add", "path": _pointer(path, k), "value": v})
+            else:
+                ops.extend(diff(old[k], v, _pointer(path, k)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            ops.extend(diff(a, b, _pointer(path, i)))
+        return ops
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def _compact(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _prune(keep: List[str]) -> None:
+    """Remove bundle/delta files (and their variants) not listed in `keep`."""
+    for p in BUNDLE_DIR.glob("*-*.json*"):
+        base = p.name.split(".", 1)[0] + ".json"
+        if base not in keep:
+            p.unlink(missing_ok=True)
+
+
+def publish(now: Optional[datetime] = None) -> Optional[int]:
+    """Cut a new bundle version if any part changed; returns the new version, or None if unchanged."""
+    parts = {name: read_json(path, None) for name, path in PARTS.items()}
+    digest = content_hash({name: content_hash(part) for name, part in parts.items()})
+    with _LOCK:
+        manifest = read_json(MANIFEST, {})
+        if manifest.get("hash") == digest and (BUNDLE_DIR / manifest.get("bundle", {}).get("path", "")).is_file():
+            return None
+        prev_version = int(manifest.get("version") or 0)
+        version = prev_version + 1
+        deltas: List[Dict[str, Any]] = list(manifest.get("deltas") or [])
+
+        prev_bundle = read_json(BUNDLE_DIR / manifest["bundle"]["path"], None) if manifest.get("bundle") else None
+        if isinstance(prev_bundle, dict) and prev_bundle.get("version") == prev_version:
+            delta = {"from": prev_version, "to": version, "ops": diff(prev_bundle.get("parts") or {}, parts)}
+            body = _compact(delta)
+            write_atomic(BUNDLE_DIR / f"delta-{version}.json", body)
+            deltas.append({"from": prev_version, "to": version, "path": f"delta-{version}.json", "bytes": len(body)})
+        else:
+            deltas = []  # no usable base: clients holding older versions refetch the bundle
+        deltas = deltas[-MAX_DELTAS:]
+
+        bundle_path = BUNDLE_DIR / f"bundle-{version}.json"
+        bundle = {"version": version, "parts": parts}
+        bundle_bytes = len(_compact(bundle))
+        write_json(bundle_path, bundle, variants=True, force=True)
+        write_json(MANIFEST, {
+            "version": version,
+            "hash": digest,
+            "updated_at": (now or datetime.now(timezone.utc)).isoformat(timespec="seconds"),
+            "bundle": {"path": bundle_path.name, "bytes": bundle_bytes},
+            "deltas": deltas,
+        })
+        # The previous bundle stays one more version for clients that just read the old manifest.
+        previous = [manifest["bundle"]["path"]] if manifest.get("bundle") else []
+        _prune([bundle_path.name, *previous, *(d["path"] for d in deltas)])
+    delta_note = f"delta {deltas[-1]['bytes']} B, " if deltas and deltas[-1]["to"] == version else ""
+    print(f"bundle: v{version} ({delta_note}bundle {bundle_bytes} B)")
+    return version
+
+
+def main() -> int:
+    publish()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Snapshot JSON read/write shared by the updater scripts.
+
+Reads are memoised per path and revalidated by (mtime, size), so a long-running process (see
+scheduler.py) keeps the previous snapshots in memory instead of re-parsing them every run.
+Returned payloads are shared; callers must treat them as read-only.
+
+Writes are atomic (temp file + rename) and skipped when the payload's content hash, computed
+with volatile timestamp fields removed, matches what is already on disk. A skipped target still
+has its mtime bumped, so the mtime says when an updater last confirmed the content even though
+the stamps inside the payload stay at the last real change. Files the dashboard fetches in
+compact form (the snapshot bundle, exchange_tickers.json) also get a `<name>.min.json` copy;
+compression is left to the web server (GitHub Pages gzips on the fly). Writing any target also
+removes sibling `.min.json`/`.gz`/`.br` files it no longer needs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import metrics
+
+VOLATILE_KEYS = frozenset({"as_of", "asOf", "updated_at"})
+
+_MEMO: Dict[pathlib.Path, Tuple[Tuple[int, int], Any, Optional[str]]] = {}
+_LOCK = threading.Lock()
+
+PathArg = Union[pathlib.Path, Iterable[pathlib.Path]]
+
+
+def _stamp(path: pathlib.Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def content_hash(payload: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> str:
+    """sha256 of the canonical JSON form with top-level volatile keys removed."""
+    if isinstance(payload, dict):
+        skip = set(volatile)
+        payload = {k: v for k, v in payload.items() if k not in skip}
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def read_json(path: pathlib.Path, default: Any) -> Any:
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        return default
+    with _LOCK:
+        hit = _MEMO.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+    with _LOCK:
+        _MEMO[path] = (stamp, payload, None)
+    return payload
+
+
+def _stored_hash(path: pathlib.Path, volatile: Iterable[str]) -> Optional[str]:
+    payload = read_json(path, None)
+    if payload is None:
+        return None
+    with _LOCK:
+        hit = _MEMO.get(path)
+    if hit is not None and hit[2] is not None and hit[1] is payload:
+        return hit[2]
+    digest = content_hash(payload, volatile)
+    with _LOCK:
+        if hit is not None and hit[1] is payload:
+            _MEMO[path] = (hit[0], payload, digest)
+    return digest
+
+
+def write_atomic(path: pathlib.Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _touch(path: pathlib.Path) -> None:
+    """Bump `path`'s mtime to now, keeping its memoised payload valid."""
+    try:
+        os.utime(path)
+        stamp = _stamp(path)
+    except OSError:
+        return
+    with _LOCK:
+        memo = _MEMO.get(path)
+        if memo is not None:
+            _MEMO[path] = (stamp, memo[1], memo[2])
+
+
+def _compact_path(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(path.stem + ".min.json")
+
+
+def _drop_variants(path: pathlib.Path, keep_compact: bool) -> None:
+    """Remove variant files earlier versions wrote next to `path` that nothing reads any more."""
+    compact = _compact_path(path)
+    unused = [compact.with_name(compact.name + ".gz"), compact.with_name(compact.name + ".br")]
+    if not keep_compact:
+        unused.append(compact)
+    for p in unused:
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def write_json(
+    paths: PathArg,
+    payload: Any,
+    volatile: Iterable[str] = VOLATILE_KEYS,
+    variants: bool = False,
+    force: bool = False,
+) -> bool:
+    """Write `payload` to one or more paths; returns False when every target was already current.
+
+    The payload is serialised once and the same bytes go to every path. A target is current when
+    its content hash (ignoring `volatile` keys) matches the new payload's; current targets are only
+    touched.
+    """
+    targets = [paths] if isinstance(paths, pathlib.Path) else list(paths)
+    volatile = frozenset(volatile)
+    digest = content_hash(payload, volatile)
+    stale = [p for p in targets if force or _stored_hash(p, volatile) != digest]
+    if variants:
+        stale += [p for p in targets if p not in stale and not _compact_path(p).exists()]
+    for path in targets:
+        _drop_variants(path, variants)
+        if path not in stale:
+            _touch(path)
+    if not stale:
+        metrics.record_write({}, False)
+        return False
+
+    pretty = (json.dumps(payload, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+    compact = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if variants else b""
+    sizes: Dict[pathlib.Path, int] = {}
+    for path in stale:
+        write_atomic(path, pretty)
+        sizes[path] = len(pretty)
+        with _LOCK:
+            _MEMO[path] = (_stamp(path), payload, digest)
+        if variants:
+            min_path = _compact_path(path)
+            write_atomic(min_path, compact)
+            sizes[min_path] = len(compact)
+    metrics.record_write(sizes, True)
+    return True
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Per-host health for http_client: circuit breakers plus recent latencies for hedged fetches.
+
+State per host, persisted in runtime/source_health.json so it carries across runs (local state,
+not committed; the data workflow restores it from actions/cache):
+  state        closed | open | half_open
+  failures     consecutive failed requests (network errors, 429 and 5xx after retries)
+  trips        consecutive times the breaker opened without a success in between
+  opened_at    unix time the breaker last opened
+  latency_ms   the last LATENCY_SAMPLES successful request latencies
+
+A breaker opens after FAILURE_THRESHOLD consecutive failures; while open, requests to the host
+fail at once with CircuitOpenError. After the cooldown (COOLDOWN_SEC, doubled per consecutive
+trip up to COOLDOWN_MAX_SEC) a single request is let through as a half-open probe with at most
+PROBE_TIMEOUT_SEC; success closes the breaker, failure re-opens it.
+
+Environment:
+  PROJECT_MARK_CIRCUIT_BREAKERS=0        never open a breaker (latencies are still tracked)
+  PROJECT_MARK_SOURCE_HEALTH=<path>      override the state file
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import pathlib
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from snapshot_io import write_atomic
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+HEALTH_PATH = pathlib.Path(os.environ.get("PROJECT_MARK_SOURCE_HEALTH") or ROOT / "runtime" / "source_health.json")
+ENABLED = os.environ.get("PROJECT_MARK_CIRCUIT_BREAKERS", "1") != "0"
+
+FAILURE_THRESHOLD = 3
+COOLDOWN_SEC = 15 * 60
+COOLDOWN_MAX_SEC = 6 * 3600
+PROBE_TIMEOUT_SEC = 5.0
+LATENCY_SAMPLES = 50
+MIN_SAMPLES_FOR_P95 = 5
+HEDGE_FLOOR_SEC = 0.25
+
+
+class CircuitOpenError(OSError):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+    def __init__(self, host: str, retry_in_sec: float):
+        super().__init__(f"circuit open for {host} (next probe in {retry_in_sec:.0f}s)")
+        self.host = host
+        self.status = None
+
+
+@dataclass
+class HostHealth:
+    state: str = "closed"
+    failures: int = 0
+    trips: int = 0
+    opened_at: float = 0.0
+    last_error: Optional[str] = None
+    latency_ms: List[float] = field(default_factory=list)
+
+    def cooldown_sec(self) -> float:
+        return min(COOLDOWN_MAX_SEC, COOLDOWN_SEC * 2 ** max(0, self.trips - 1))
+
+
+_LOCK = threading.Lock()
+_HOSTS: Dict[str, HostHealth] = {}
+_PROBING: set = set()
+_loaded = False
+_dirty = False
+
+
+def _load() -> None:
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        raw = json.loads(HEALTH_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    for host, h in ((raw.get("hosts") or {}) if isinstance(raw, dict) else {}).items():
+        if not isinstance(h, dict):
+            continue
+        fields = {k: h[k] for k in HostHealth.__dataclass_fields__ if k in h}
+        try:
+            _HOSTS[host] = HostHealth(**fields)
+        except TypeError:
+            continue
+
+
+def _host(host: str) -> HostHealth:
+    _load()
+    h = _HOSTS.get(host)
+    if h is None:
+        h = _HOSTS[host] = HostHealth()
+    return h
+
+
+def admit(host: str, now: Optional[float] = None) -> Optional[float]:
+    """Gate a request to `host`: raises CircuitOpenError while open; returns a timeout cap for a half-open probe."""
+    now = time.time() if now is None else now
+    with _LOCK:
+        h = _host(host)
+        if h.state == "closed" or not ENABLED:
+            return None
+        wait = h.opened_at + h.cooldown_sec() - now
+        if wait > 0 or host in _PROBING:
+            raise CircuitOpenError(host, max(0.0, wait))
+        _PROBING.add(host)
+        h.state = "half_open"
+    print(f"health: {host} half-open, probing")
+    return PROBE_TIMEOUT_SEC
+
+
+def record_success(host: str, elapsed_ms: float) -> None:
+    global _dirty
+    with _LOCK:
+        h = _host(host)
+        was = h.state
+        h.state, h.failures, h.trips, h.last_error = "closed", 0, 0, None
+        h.latency_ms = (h.latency_ms + [round(elapsed_ms, 1)])[-LATENCY_SAMPLES:]
+        _PROBING.discard(host)
+        _dirty = True
+    if was != "closed":
+        print(f"health: {host} recovered, circuit closed")
+        flush()
+
+
+def record_failure(host: str, error: str, now: Optional[float] = None) -> None:
+    global _dirty
+    now = time.time() if now is None else now
+    with _LOCK:
+        h = _host(host)
+        h.failures += 1
+        h.last_error = error
+        opened = ENABLED and (h.state == "half_open" or (h.state == "closed" and h.failures >= FAILURE_THRESHOLD))
+        if opened:
+            h.state, h.opened_at = "open", now
+            h.trips += 1
+        _PROBING.discard(host)
+        _dirty = True
+        cooldown = h.cooldown_sec()
+    if opened:
+        print(f"warn: health: {host} circuit open after {h.failures} failures ({error}); next probe in {cooldown / 60:.0f}min")
+    # Failures can land after the script's final flush (abandoned workers), so persist them at once.
+    flush()
+
+
+def p95_ms(host: str) -> Optional[float]:
+    with _LOCK:
+        samples = sorted(_host(host).latency_ms)
+    if len(samples) < MIN_SAMPLES_FOR_P95:
+        return None
+    return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+
+def hedge_delay_sec(host: str, default: float) -> float:
+    """How long to wait on `host` before also starting a fallback: its p95 latency, or `default`."""
+    p95 = p95_ms(host)
+    return default if p95 is None else max(HEDGE_FLOOR_SEC, p95 / 1000.0)
+
+
+def is_open(host: str) -> bool:
+    with _LOCK:
+        return ENABLED and _host(host).state != "closed"
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        _load()
+        return {host: asdict(h) for host, h in sorted(_HOSTS.items())}
+
+
+def flush(path: pathlib.Path = HEALTH_PATH) -> bool:
+    """Persist the state if anything changed since the last flush."""
+    global _dirty
+    with _LOCK:
+        if not _dirty:
+            return False
+        payload = {"hosts": {host: asdict(h) for host, h in sorted(_HOSTS.items())}}
+        _dirty = False
+    write_atomic(path, (json.dumps(payload, indent=1) + "\n").encode("utf-8"))
+    return True
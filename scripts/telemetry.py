@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Per-run fetch telemetry for the updater scripts, written to pipelines/data_quality_report.json.
+
+A script calls start_run(job) at the top of main() and finish_run() at the end. In between:
+  - http_client.get reports every request (latency, wire bytes, status, retries, cache status),
+    attributed to the source label set by run_sources or by `with telemetry.source(name):`;
+  - run_sources / source() record each source's outcome (ok, failed, timeout);
+  - the script calls observe(symbol, live) for every output metric, passing fallback="previous"
+    when the last published value was carried forward, or skip(symbol) when the fetch plan left
+    it out because nothing new could be published; skipped symbols don't count as missing.
+
+The run and source labels live in contextvars, so concurrent jobs in scheduler.py stay separate.
+finish_run() merges the run into the report: the latest run per job, a rolling live/missing
+window per symbol, and escalations for symbols above the agents.yaml missing-rate threshold and
+for sources whose mean request latency exceeds its latency threshold. Everything recorded here
+is also fed to metrics (OpenMetrics histograms and counters per job).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import pathlib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Set
+
+import metrics
+from snapshot_io import write_json
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+REPORT_PATH = pathlib.Path(os.environ.get("PROJECT_MARK_QUALITY_REPORT") or ROOT / "pipelines" / "data_quality_report.json")
+
+MISSING_WINDOW_RUNS = 200
+MISSING_RATE_LIMIT = 0.01
+MISSING_RATE_RULE = "데이터 결측률 > 1%"  # agents.yaml escalation_rules
+MISSING_RATE_ACTION = "해당 심볼 전략 비활성화, 파이프라인 복구 우선"
+LATENCY_MEAN_LIMIT_MS = 250.0
+LATENCY_RULE = "체결 지연 평균 > 250ms"  # agents.yaml escalation_rules, applied to upstream requests
+LATENCY_ACTION = "최적화 전문가와 리소스 모니터 즉시 튜닝"
+
+
+@dataclass
+class SourceStats:
+    ok: Optional[bool] = None
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+    requests: int = 0
+    failed_requests: int = 0
+    bytes_in: int = 0
+    retries: int = 0
+    request_ms_max: float = 0.0
+    request_ms_total: float = 0.0
+    status: Optional[int] = None
+    cache: Dict[str, int] = field(default_factory=dict)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok is not False and not self.failed_requests,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "bytes": self.bytes_in,
+            "retries": self.retries,
+            "request_ms_max": round(self.request_ms_max, 1),
+            "request_ms_mean": round(self.request_ms_total / self.requests, 1) if self.requests else None,
+            "status": self.status,
+            "cache": dict(sorted(self.cache.items())),
+            "error": self.error,
+        }
+
+
+@dataclass
+class Run:
+    job: str
+    started: float = field(default_factory=time.time)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    sources: Dict[str, SourceStats] = field(default_factory=dict)
+    observed: Dict[str, bool] = field(default_factory=dict)
+    fallbacks: Dict[str, str] = field(default_factory=dict)
+    skipped: Set[str] = field(default_factory=set)
+
+    def _source(self, name: str) -> SourceStats:
+        st = self.sources.get(name)
+        if st is None:
+            st = self.sources[name] = SourceStats()
+        return st
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            sources = {name: st.to_json() for name, st in sorted(self.sources.items())}
+            observed = dict(self.observed)
+            fallbacks = dict(sorted(self.fallbacks.items()))
+            skipped = sorted(self.skipped)
+        missing = sorted(k for k, live in observed.items() if not live)
+        return {
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+            "duration_ms": round((time.time() - self.started) * 1000.0, 1),
+            "sources": sources,
+            "totals": {
+                "sources": len(sources),
+                "failed_sources": sum(1 for s in sources.values() if not s["ok"]),
+                "requests": sum(s["requests"] for s in sources.values()),
+                "bytes": sum(s["bytes"] for s in sources.values()),
+                "retries": sum(s["retries"] for s in sources.values()),
+                "cache_hits": sum(s["cache"].get("hit", 0) for s in sources.values()),
+                "symbols": len(observed),
+                "missing": len(missing),
+                "fallbacks": len(fallbacks),
+                "skipped": len(skipped),
+            },
+            "missing": missing,
+            "fallbacks": fallbacks,
+            "skipped": skipped,
+        }
+
+
+_RUN: contextvars.ContextVar[Optional[Run]] = contextvars.ContextVar("telemetry_run", default=None)
+_SOURCE: contextvars.ContextVar[str] = contextvars.ContextVar("telemetry_source", default="")
+_REPORT_LOCK = threading.Lock()
+
+
+def start_run(job: str) -> Run:
+    run = Run(job)
+    _RUN.set(run)
+    metrics.bind_job(job)
+    return run
+
+
+def current_source() -> str:
+    return _SOURCE.get()
+
+
+def qualified(name: str) -> str:
+    parent = _SOURCE.get()
+    return f"{parent}/{name}" if parent else name
+
+
+@contextmanager
+def source(name: str) -> Iterator[str]:
+    """Attribute requests in the block to `name` (nested under any enclosing source) and record its outcome."""
+    label = qualified(name)
+    token = _SOURCE.set(label)
+    t0 = time.monotonic()
+    try:
+        yield label
+    except BaseException as e:
+        record_outcome(label, False, (time.monotonic() - t0) * 1000.0, f"{type(e).__name__}: {e}")
+        raise
+    else:
+        record_outcome(label, True, (time.monotonic() - t0) * 1000.0)
+    finally:
+        _SOURCE.reset(token)
+
+
+def record_outcome(label: str, ok: bool, elapsed_ms: float, error: Optional[str] = None) -> None:
+    """First outcome wins: a worker abandoned after a timeout can't overwrite the timeout."""
+    run = _RUN.get()
+    if run is None:
+        return
+    with run.lock:
+        st = run._source(label)
+        if st.ok is None:
+            st.ok, st.elapsed_ms = ok, elapsed_ms
+            st.error = error or st.error
+            metrics.observe_source(label, elapsed_ms / 1000.0, "ok" if ok else "timeout" if error == "timeout" else "failed")
+
+
+def record_request(
+    host: str,
+    status: Optional[int],
+    elapsed_ms: float,
+    bytes_in: int,
+    retries: int,
+    cache_status: Optional[str],
+    error: Optional[str] = None,
+) -> None:
+    run = _RUN.get()
+    if run is None:
+        return
+    metrics.observe_request(host, elapsed_ms / 1000.0, bytes_in, error is not None)
+    with run.lock:
+        st = run._source(_SOURCE.get() or host)
+        st.requests += 1
+        st.bytes_in += bytes_in
+        st.retries += retries
+        st.request_ms_max = max(st.request_ms_max, elapsed_ms)
+        st.request_ms_total += elapsed_ms
+        if status is not None:
+            st.status = status
+        if cache_status:
+            st.cache[cache_status] = st.cache.get(cache_status, 0) + 1
+        if error is not None:
+            st.failed_requests += 1
+            st.error = error
+
+
+def observe(symbol: str, live: bool, fallback: Optional[str] = None) -> None:
+    """Record whether `symbol` got a live value this run; `fallback` names what was published instead."""
+    run = _RUN.get()
+    if run is None:
+        return
+    with run.lock:
+        run.observed[symbol] = live
+        if not live and fallback:
+            run.fallbacks[symbol] = fallback
+    metrics.count_symbol("live" if live else "fallback" if fallback else "missing")
+
+
+def skip(symbol: str) -> None:
+    """Record that `symbol` was deliberately not fetched this run; its missing-rate window is left as is."""
+    run = _RUN.get()
+    if run is None:
+        return
+    with run.lock:
+        run.skipped.add(symbol)
+    metrics.count_symbol("skipped")
+
+
+def snapshot() -> Optional[Dict[str, Any]]:
+    """Summary of the current run so far, without writing the report."""
+    run = _RUN.get()
+    return run.summary() if run is not None else None
+
+
+def read_report(path: pathlib.Path = REPORT_PATH) -> Dict[str, Any]:
+    try:
+        report = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return report if isinstance(report, dict) else {}
+
+
+def finish_run(path: pathlib.Path = REPORT_PATH) -> Optional[Dict[str, Any]]:
+    """Merge the current run into the quality report and return the run summary."""
+    run = _RUN.get()
+    if run is None:
+        return None
+    summary = run.summary()
+    with _REPORT_LOCK:
+        report = read_report(path)
+        runs = report.get("runs") if isinstance(report.get("runs"), dict) else {}
+        runs[run.job] = summary
+
+        symbols = report.get("symbols") if isinstance(report.get("symbols"), dict) else {}
+        for sym, live in sorted(run.observed.items()):
+            key = f"{run.job}:{sym}"
+            prev = symbols.get(key) or {}
+            recent = (str(prev.get("recent") or "") + ("1" if live else "0"))[-MISSING_WINDOW_RUNS:]
+            symbols[key] = {
+                "recent": recent,
+                "runs": len(recent),
+                "missing_rate": round(recent.count("0") / len(recent), 4),
+                "last_live": summary["started_at"] if live else prev.get("last_live"),
+            }
+
+        escalations = [
+            {"rule": MISSING_RATE_RULE, "action": MISSING_RATE_ACTION, "symbol": key, "missing_rate": s["missing_rate"]}
+            for key, s in sorted(symbols.items())
+            if s["missing_rate"] > MISSING_RATE_LIMIT
+        ]
+        escalations += [
+            {"rule": LATENCY_RULE, "action": LATENCY_ACTION, "source": f"{job}:{name}", "request_ms_mean": st["request_ms_mean"]}
+            for job, r in sorted(runs.items())
+            for name, st in sorted((r.get("sources") or {}).items())
+            if (st.get("request_ms_mean") or 0.0) > LATENCY_MEAN_LIMIT_MS
+        ]
+        write_json(path, {
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "thresholds": {"missing_rate": MISSING_RATE_LIMIT, "window_runs": MISSING_WINDOW_RUNS, "request_ms_mean": LATENCY_MEAN_LIMIT_MS},
+            "runs": dict(sorted(runs.items())),
+            "symbols": dict(sorted(symbols.items())),
+            "escalations": escalations,
+        })
+    _RUN.set(None)
+    metrics.finish_job(run.job, time.time() - run.started)
+    metrics.bind_job(None)
+    return summary
+
+
+def wrap(name: str, fn):
+    """`fn` bound to a copy of the caller's context and run as source `name` (for worker threads)."""
+    ctx = contextvars.copy_context()
+
+    def call():
+        def inner():
+            with source(name):
+                return fn()
+
+        return ctx.run(inner)
+
+    return call
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Update crypto_top20.json and crypto_custom_universe.json from bulk market endpoints.
+
+One run issues a handful of concurrent requests: CoinGecko `coins/markets` for the top of the
+market, the same endpoint by id for the custom universe (pipelines/symbol_registry.json,
+"crypto"), and Binance's all-symbol perpetual premium index for funding rates. Coins missing from
+every response keep their previously published values.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import urllib.parse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import cassette
+import http_client
+import source_health
+import telemetry
+from fetch_stage import StageClock, log_timings, run_sources
+from snapshot_io import read_json, write_json
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "dashboard" / "data"
+API_DIR = ROOT / "dashboard" / "api" / "crypto"
+
+OUT_TOP20 = DATA_DIR / "crypto_top20.json"
+OUT_TOP20_API = API_DIR / "top20.json"
+OUT_UNIVERSE = DATA_DIR / "crypto_custom_universe.json"
+
+SYMBOL_REGISTRY = ROOT / "pipelines" / "symbol_registry.json"
+
+SOURCE_TIMEOUT_SEC = 20
+RUN_DEADLINE_SEC = 45
+KST = ZoneInfo("Asia/Seoul")
+
+MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+FUNDING_URL = "https://fapi.binance.com/fapi/v1/premiumIndex"
+TOP_PAGE_SIZE = 250  # one page covers the top 20 and every stablecoin that matters for the total
+IDS_PER_REQUEST = 100
+TOP_N = 20
+
+STABLECOIN_IDS = frozenset({
+    "tether", "usd-coin", "ethena-usde", "dai", "usds", "first-digital-usd", "paypal-usd",
+    "true-usd", "frax", "usd1-wlfi", "ripple-usd", "falcon-finance", "global-dollar", "binance-usd",
+})
+MEME_IDS = frozenset({
+    "shiba-inu", "pepe", "bonk", "dogwifcoin", "floki", "official-trump", "pudgy-penguins", "spx6900",
+})
+
+# Column name -> CoinGecko coins/markets field.
+MARKET_FIELDS = {
+    "price": "current_price",
+    "change_24h": "price_change_percentage_24h_in_currency",
+    "change_7d": "price_change_percentage_7d_in_currency",
+    "market_cap": "market_cap",
+    "volume_24h": "total_volume",
+    "circulating_supply": "circulating_supply",
+}
+
+
+def to_num(value: Any) -> Optional[float]:
+    try:
+        if value is None:
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def as_int(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(round(value))
+
+
+def load_universe(path: pathlib.Path = SYMBOL_REGISTRY) -> List[dict]:
+    """Custom universe rows ({ticker, name, coingecko_id, tags[, disable_ticker_feed]}) in display order."""
+    data = read_json(path, {})
+    return [dict(r, ticker=str(r["ticker"]).upper()) for r in data.get("crypto", []) if r.get("ticker")]
+
+
+def markets_url(**params: Any) -> str:
+    query = {"vs_currency": "usd", "sparkline": "false", "price_change_percentage": "24h,7d", **params}
+    return f"{MARKETS_URL}?{urllib.parse.urlencode(query, safe=',')}"
+
+
+def fetch_markets(url: str, timeout: int = SOURCE_TIMEOUT_SEC) -> List[dict]:
+    rows = http_client.get_json(url, timeout=timeout)
+    if not isinstance(rows, list):
+        raise ValueError("coins/markets: expected a list")
+    return [r for r in rows if isinstance(r, dict) and r.get("id")]
+
+
+def fetch_funding(timeout: int = SOURCE_TIMEOUT_SEC) -> Dict[str, float]:
+    """Last funding rate per base asset from every USDT perpetual ("1000SHIBUSDT" counts as SHIB)."""
+    out: Dict[str, float] = {}
+    for r in http_client.get_json(FUNDING_URL, timeout=timeout) or []:
+        symbol = str(r.get("symbol") or "")
+        rate = to_num(r.get("lastFundingRate"))
+        if not symbol.endswith("USDT") or rate is None:
+            continue
+        base = symbol[:-4]
+        for prefix in ("1000000", "1000"):
+            if base.startswith(prefix) and len(base) > len(prefix):
+                base = base[len(prefix):]
+                break
+        out.setdefault(base, rate)
+    return out
+
+
+def id_chunks(ids: List[str], size: int = IDS_PER_REQUEST) -> List[List[str]]:
+    return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+
+def fetch_all_sources(universe: List[dict]) -> Tuple[Optional[List[dict]], Dict[str, dict], Dict[str, float]]:
+    """Top-of-market page, universe rows by CoinGecko id and funding rates, fetched concurrently."""
+    ids = [r["coingecko_id"] for r in universe if r.get("coingecko_id")]
+    chunks = id_chunks(ids)
+    t = SOURCE_TIMEOUT_SEC
+    sources = {
+        "coingecko:top": (lambda: fetch_markets(markets_url(order="market_cap_desc", per_page=TOP_PAGE_SIZE, page=1)), t, None),
+        "binance:funding": (fetch_funding, t, {}),
+    }
+    for i, chunk in enumerate(chunks):
+        url = markets_url(ids=",".join(chunk), per_page=len(chunk), page=1)
+        sources[f"coingecko:ids[{i}]"] = (lambda u=url: fetch_markets(u), t, None)
+
+    results = run_sources(sources, deadline_sec=RUN_DEADLINE_SEC)
+    log_timings(results)
+
+    top = results["coingecko:top"].value
+    by_id = {r["id"]: r for r in top or []}
+    for i in range(len(chunks)):
+        by_id.update({r["id"]: r for r in results[f"coingecko:ids[{i}]"].value or []})
+    return top, by_id, results["binance:funding"].value
+
+
+def market_columns(rows: List[dict]) -> Dict[str, List[Optional[float]]]:
+    """MARKET_FIELDS as numeric columns plus `rank`, the 1-based market-cap rank within `rows`."""
+    cols: Dict[str, List[Optional[float]]] = {c: [to_num(r.get(f)) for r in rows] for c, f in MARKET_FIELDS.items()}
+    order = sorted(range(len(rows)), key=lambda i: -(cols["market_cap"][i] or 0.0))
+    rank: List[Optional[float]] = [None] * len(rows)
+    for pos, i in enumerate(order, 1):
+        rank[i] = pos
+    cols["rank"] = rank
+    return cols
+
+
+def round_or_none(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def price_round(value: Optional[float]) -> Optional[float]:
+    if value is None:
+        return None
+    return round(value, 2) if abs(value) >= 1 else float(f"{value:.4g}")
+
+
+def top_tags(coin_id: str, symbol: str) -> List[str]:
+    tags = [symbol.lower(), "dominance"] if symbol in ("BTC", "ETH") else []
+    if coin_id in STABLECOIN_IDS:
+        tags.append("stablecoin")
+    if coin_id in MEME_IDS:
+        tags.append("meme")
+    return tags
+
+
+def build_top20(top: List[dict], funding: Dict[str, float]) -> List[dict]:
+    cols = market_columns(top)
+    order = sorted(range(len(top)), key=lambda i: cols["rank"][i])[:TOP_N]
+    assets = []
+    for i in order:
+        symbol = str(top[i].get("symbol") or "").upper()
+        coin_id = top[i]["id"]
+        assets.append({
+            "rank": as_int(cols["rank"][i]),
+            "symbol": symbol,
+            "name": top[i].get("name") or symbol,
+            "price_usd": price_round(cols["price"][i]),
+            "pct_24h": round_or_none(cols["change_24h"][i], 2),
+            "pct_7d": round_or_none(cols["change_7d"][i], 2),
+            "market_cap_usd": as_int(cols["market_cap"][i]),
+            "volume_24h_usd": as_int(cols["volume_24h"][i]),
+            "circulating_supply": as_int(cols["circulating_supply"][i]),
+            "funding": None if coin_id in STABLECOIN_IDS else funding.get(symbol),
+            "tags": top_tags(coin_id, symbol),
+        })
+    return assets
+
+
+def resolve_rows(universe: List[dict], by_id: Dict[str, dict], top: Optional[List[dict]]) -> List[Optional[dict]]:
+    """Market row per universe entry: by CoinGecko id, else the largest-cap top-page coin with its ticker."""
+    by_symbol: Dict[str, dict] = {}
+    for r in top or []:
+        sym = str(r.get("symbol") or "").upper()
+        if sym and (to_num(r.get("market_cap")) or 0.0) > (to_num(by_symbol.get(sym, {}).get("market_cap")) or 0.0):
+            by_symbol[sym] = r
+    return [by_id.get(u.get("coingecko_id") or "") or by_symbol.get(u["ticker"]) for u in universe]
+
+
+def build_universe(universe: List[dict], rows: List[Optional[dict]], prev_assets: Dict[str, dict]) -> List[dict]:
+    live = [r for r in rows if r is not None]
+    cols = market_columns(live)
+    col_index = {id(r): i for i, r in enumerate(live)}
+    assets = []
+    for pos, (u, r) in enumerate(zip(universe, rows), 1):
+        telemetry.observe(u["ticker"], r is not None, "previous")
+        row: Dict[str, Any] = {"rank_in_custom": pos, "ticker": u["ticker"], "name": u["name"], "coingecko_id": u.get("coingecko_id")}
+        if r is not None:
+            i = col_index[id(r)]
+            row.update({
+                "price": price_round(cols["price"][i]),
+                "change_24h": round_or_none(cols["change_24h"][i], 2),
+                "change_7d": round_or_none(cols["change_7d"][i], 2),
+                "market_cap": as_int(cols["market_cap"][i]),
+                "volume_24h": as_int(cols["volume_24h"][i]),
+                "market_cap_rank": as_int(to_num(r.get("market_cap_rank"))),
+            })
+        else:
+            prev = prev_assets.get(u["ticker"], {})
+            row.update({k: prev.get(k) for k in ("price", "change_24h", "change_7d", "market_cap", "volume_24h", "market_cap_rank")})
+        if u.get("disable_ticker_feed"):
+            row["disable_ticker_feed"] = True
+        row["tags"] = list(u.get("tags") or [])
+        assets.append(row)
+    return assets
+
+
+def stablecoin_market_cap(top: List[dict]) -> int:
+    return as_int(sum(to_num(r.get("market_cap")) or 0.0 for r in top if r["id"] in STABLECOIN_IDS))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update crypto top-20 and custom universe snapshots for the dashboard.")
+    cassette.add_arguments(parser)
+    cassette.apply(parser.parse_args(argv))
+    telemetry.start_run("crypto")
+    prev_top = read_json(OUT_TOP20, {})
+    prev_universe = read_json(OUT_UNIVERSE, {})
+    universe = load_universe()
+    clock = StageClock()
+
+    top, by_id, funding = fetch_all_sources(universe)
+    clock.lap("fetch")
+
+    now = datetime.now(KST).strftime("%Y-%m-%d %H:%M KST")
+    rows = resolve_rows(universe, by_id, top)
+    prev_assets = {str(a.get("ticker", "")).upper(): a for a in prev_universe.get("assets", []) if isinstance(a, dict)}
+    universe_payload = {
+        "as_of": now if any(r is not None for r in rows) else prev_universe.get("as_of", now),
+        "assets": build_universe(universe, rows, prev_assets),
+        "stablecoin_market_cap": stablecoin_market_cap(top) if top else prev_universe.get("stablecoin_market_cap"),
+    }
+    top_payload = {"as_of": now, "assets": build_top20(top, funding)} if top else prev_top
+    if not top:
+        print("warn: coingecko top-of-market page unavailable; keeping the previous top 20")
+    clock.lap("render")
+
+    for paths, payload in (
+        ([OUT_TOP20, OUT_TOP20_API], top_payload),
+        ([OUT_UNIVERSE], universe_payload),
+    ):
+        if not payload:
+            continue
+        changed = write_json(paths, payload)
+        print(f"{'updated' if changed else 'unchanged'} {paths[0]}")
+    clock.lap("write")
+    telemetry.finish_run()
+    source_health.flush()
+    http_client.log_stats()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,21 +3,34 @@
 
 from __future__ import annotations
 
+import argparse
+import codecs
 import html
-import json
 import pathlib
 import re
-import urllib.request
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cassette
+import http_cache
+import http_client
+import source_health
+import telemetry
+from etf_flow_store import EtfFlowStore, FlowRow
+from fetch_stage import StageClock, log_timings, run_hedged, run_sources
+from snapshot_io import read_json, write_json
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 OUT = ROOT / "dashboard" / "data" / "etf.json"
-USER_AGENT = "project-mark-dashboard/1.0"
+
+FETCH_TIMEOUT_SEC = 20
+RUN_DEADLINE_SEC = 45
+HEDGE_DEFAULT_SEC = 3.0  # until farside.co.uk has enough latency samples for a p95
 
 DATE_RE = re.compile(r"\b\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\b")
 NUM_RE = re.compile(r"[-+]?\$?[\d,]+(?:\.\d+)?")
 DEFILLAMA_DATE_RE = re.compile(r"\b([A-Za-z]+ \d{1,2}, \d{4})\b")
+TICKER_RE = re.compile(r"^[A-Z]{2,6}$")
 
 
 def clean_text(raw: str) -> str:
@@ -59,55 +72,193 @@ def parse_any_date(text: str) -> Optional[datetime]:
     return None
 
 
-def latest_total_inflow(url: str) -> Tuple[Optional[str], Optional[float]]:
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        html_body = resp.read().decode("utf-8", errors="ignore")
-
-    rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html_body, flags=re.IGNORECASE | re.DOTALL)
-    best_date_text: Optional[str] = None
-    best_date_obj: Optional[datetime] = None
-    best_value: Optional[float] = None
-
-    for row in rows:
-        cells = re.findall(r"<t[dh][^>]*>(.*?)</t[dh]>", row, flags=re.IGNORECASE | re.DOTALL)
+PARSE_CHUNK_BYTES = 64 * 1024
+TABLE_TAG_RE = re.compile(r"<(/?)(tr|td|th)\b[^>]*>", re.IGNORECASE)
+
+
+class TableRowStream:
+    """Incremental <tr>/<td>/<th> tokenizer over text chunks.
+
+    feed() returns the rows completed by that chunk as lists of raw cell HTML; only the row and
+    cell currently open (plus a possibly split tag at the chunk edge) are held between calls.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def feed(self, text: str) -> List[List[str]]:
+        buf = self._buf + text
+        rows: List[List[str]] = []
+        pos = 0
+        for m in TABLE_TAG_RE.finditer(buf):
+            if self._cell is not None:
+                self._cell.append(buf[pos : m.start()])
+            pos = m.end()
+            closing, tag = m.group(1), m.group(2).lower()
+            if tag == "tr":
+                if closing:
+                    if self._row is not None:
+                        rows.append(self._row)
+                    self._row = None
+                else:
+                    self._row = []
+                self._cell = None
+            elif self._row is None:
+                continue
+            elif closing:
+                if self._cell is not None:
+                    self._row.append("".join(self._cell))
+                self._cell = None
+            else:
+                self._cell = []
+
+        rest = buf[pos:]
+        cut = rest.rfind("<")
+        if cut != -1 and ">" not in rest[cut:]:
+            rest, self._buf = rest[:cut], rest[cut:]
+        else:
+            self._buf = ""
+        if self._cell is not None and rest:
+            self._cell.append(rest)
+        return rows
+
+    def close(self) -> List[List[str]]:
+        return self.feed("")
+
+
+class FarsideTotalParser:
+    """Keeps only the latest dated row's TOTAL while rows stream past.
+
+    The first cell must hold a "DD Mon YYYY" date; the value is the rightmost cell that parses as
+    a number (Farside puts TOTAL in the last column).
+    """
+
+    def __init__(self) -> None:
+        self.rows = TableRowStream()
+        self.best_date_text: Optional[str] = None
+        self.best_date_obj: Optional[datetime] = None
+        self.best_value: Optional[float] = None
+
+    def feed(self, text: str) -> None:
+        for cells in self.rows.feed(text):
+            self._row(cells)
+
+    def close(self) -> None:
+        for cells in self.rows.close():
+            self._row(cells)
+
+    def _row(self, cells: List[str]) -> None:
         if len(cells) < 2:
-            continue
-
-        first = clean_text(cells[0])
-        date_match = DATE_RE.search(first)
+            return
+        date_match = DATE_RE.search(cells[0]) or DATE_RE.search(clean_text(cells[0]))
         if not date_match:
-            continue
-
+            return
         date_text = date_match.group(0)
         date_obj = parse_human_date(date_text)
         if not date_obj:
-            continue
+            return
+        if self.best_date_obj is not None and date_obj <= self.best_date_obj:
+            return
 
-        # Farside tables have TOTAL in the last/near-last column.
-        # We scan from right to left and use the first parseable number.
         value: Optional[float] = None
         for c in reversed(cells):
-            t = clean_text(c)
-            v = parse_value(t)
+            v = parse_value(clean_text(c))
             if v is not None:
                 value = v
                 break
+        self.best_date_text = date_text
+        self.best_date_obj = date_obj
+        self.best_value = value
+
+
+class FarsideFlowParser(FarsideTotalParser):
+    """FarsideTotalParser that also keeps per-issuer flows for rows dated after `watermark`.
+
+    Issuer names come from the most recent ticker header row (e.g. "IBIT FBTC ... Total").
+    """
+
+    def __init__(self, watermark: Optional[str] = None) -> None:
+        super().__init__()
+        self.watermark = watermark
+        self.issuers: List[str] = []
+        self.new_rows: List[FlowRow] = []
+
+    def _row(self, cells: List[str]) -> None:
+        super()._row(cells)
+        if len(cells) < 3:
+            return
+        first = clean_text(cells[0])
+        date_match = DATE_RE.search(first)
+        if not date_match:
+            labels = [clean_text(c) for c in cells[1:-1]]
+            if labels and sum(1 for t in labels if TICKER_RE.match(t)) * 2 > len(labels):
+                self.issuers = labels
+            return
+        date_obj = parse_human_date(date_match.group(0))
+        if not date_obj or not self.issuers:
+            return
+        day = date_obj.strftime("%Y-%m-%d")
+        if self.watermark is not None and day <= self.watermark:
+            return
+        total = parse_value(clean_text(cells[-1]))
+        if total is None:
+            return  # not reported yet; picked up on a later run
+        flows = {issuer: parse_value(clean_text(c)) for issuer, c in zip(self.issuers, cells[1:-1])}
+        self.new_rows.append((day, flows, total))
+
+
+def iter_chunks(body: bytes, size: int = PARSE_CHUNK_BYTES) -> Iterator[bytes]:
+    view = memoryview(body)
+    for i in range(0, len(view), size):
+        yield bytes(view[i : i + size])
+
+
+def latest_total_inflow(url: str) -> Tuple[Optional[str], Optional[float]]:
+    resp = http_client.get(url, timeout=20)
+    date_text, value = http_cache.parsed(resp, "farside_total", lambda: list(parse_total_inflow(iter_chunks(resp.body))))
+    return date_text, value
+
+
+def fetch_farside_flows(url: str, watermark: Optional[str]) -> Tuple[Optional[str], Optional[float], List[FlowRow]]:
+    """Latest (date_text, TOTAL) plus the per-issuer rows newer than `watermark`, from one page fetch."""
+    resp = http_client.get(url, timeout=20)
+
+    def parse() -> list:
+        parser = FarsideFlowParser(watermark)
+        _feed(parser, iter_chunks(resp.body))
+        return [parser.best_date_text, parser.best_value, parser.new_rows]
+
+    date_text, value, rows = http_cache.parsed(resp, "farside_flows", parse)
+    return date_text, value, [(d, flows, total) for d, flows, total in rows]
 
-        if best_date_obj is None or date_obj > best_date_obj:
-            best_date_text = date_text
-            best_date_obj = date_obj
-            best_value = value
 
-    return best_date_text, best_value
+def _feed(parser: FarsideTotalParser, chunks: Iterable[bytes]) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+
+
+def parse_total_inflow(chunks: Iterable[bytes]) -> Tuple[Optional[str], Optional[float]]:
+    """Feed UTF-8 page chunks through FarsideTotalParser; returns (date_text, TOTAL value)."""
+    parser = FarsideTotalParser()
+    _feed(parser, chunks)
+    return parser.best_date_text, parser.best_value
 
 
 def latest_defillama_etf_flows() -> Tuple[Optional[str], Optional[float], Optional[float]]:
     """Fallback source. DefiLlama ETF daily stats (source: Farside)."""
-    req = urllib.request.Request("https://defillama.com/etfs", headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        html_body = resp.read().decode("utf-8", errors="ignore")
+    resp = http_client.get("https://defillama.com/etfs", timeout=20)
+    date_text, btc_flow, eth_flow = http_cache.parsed(
+        resp, "defillama_flows", lambda: list(parse_defillama_etf_flows(resp.text(errors="ignore")))
+    )
+    return date_text, btc_flow, eth_flow
 
+
+def parse_defillama_etf_flows(html_body: str) -> Tuple[Optional[str], Optional[float], Optional[float]]:
     text = clean_text(html_body)
 
     d_match = DEFILLAMA_DATE_RE.search(text)
@@ -148,30 +299,68 @@ def pick_fresher(
     return (cur_date or prev_date_text or "n/a"), cur_btc if cur_btc is not None else prev_btc, cur_eth if cur_eth is not None else prev_eth, "latest"
 
 
-def main() -> int:
-    prev_payload = {}
-    if OUT.exists():
-        try:
-            prev_payload = json.loads(OUT.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            prev_payload = {}
-
-    try:
-        btc_date, btc_flow = latest_total_inflow("https://farside.co.uk/btc/")
-    except Exception as e:
-        print(f"warn: farside btc fetch failed ({e})")
-        btc_date, btc_flow = None, None
-    try:
-        eth_date, eth_flow = latest_total_inflow("https://farside.co.uk/eth/")
-    except Exception as e:
-        print(f"warn: farside eth fetch failed ({e})")
-        eth_date, eth_flow = None, None
+def fetch_farside_latest(stores: Dict[str, EtfFlowStore]) -> Dict[str, Tuple[Optional[str], Optional[float]]]:
+    """Both Farside pages concurrently; ingests new per-issuer rows and returns {asset: (date_text, TOTAL)}.
+
+    Raises when no page could be read, so a hedged caller moves on to the fallback at once.
+    """
+    def one(asset: str) -> Tuple[Optional[str], Optional[float]]:
+        store = stores[asset]
+        date_text, flow, rows = fetch_farside_flows(f"https://farside.co.uk/{asset}/", store.watermark)
+        added = store.ingest(rows)
+        if added:
+            print(f"etf: {asset} ingested {added} new day(s) through {store.watermark}")
+        return date_text, flow
+
+    results = run_sources({asset: (lambda a=asset: one(a), FETCH_TIMEOUT_SEC, (None, None)) for asset in stores}, deadline_sec=FETCH_TIMEOUT_SEC)
+    for r in results.values():
+        if not r.ok:
+            print(f"warn: farside {r.name} fetch failed ({r.error})")
+    if not any(r.ok for r in results.values()):
+        raise OSError("; ".join(f"{r.name}: {r.error}" for r in results.values()))
+    return {asset: r.value for asset, r in results.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update dashboard/data/etf.json from Farside (DefiLlama fallback).")
+    cassette.add_arguments(parser)
+    cassette.apply(parser.parse_args(argv))
+    telemetry.start_run("etf")
+    prev_payload = read_json(OUT, {})
+    clock = StageClock()
+
+    stores = {asset: EtfFlowStore(asset) for asset in ("btc", "eth")}
+    results = run_hedged(
+        "farside",
+        "defillama",
+        {
+            "farside": (lambda: fetch_farside_latest(stores), FETCH_TIMEOUT_SEC, {}),
+            "defillama": (latest_defillama_etf_flows, FETCH_TIMEOUT_SEC, (None, None, None)),
+        },
+        hedge_after_sec=source_health.hedge_delay_sec("farside.co.uk", HEDGE_DEFAULT_SEC),
+        deadline_sec=RUN_DEADLINE_SEC,
+    )
+    log_timings(results)
+    latest = results["farside"].value
+    btc_date, btc_flow = latest.get("btc", (None, None))
+    eth_date, eth_flow = latest.get("eth", (None, None))
 
     source = "farside.co.uk"
     ref_date = btc_date or eth_date
     if ref_date is None or btc_flow is None or eth_flow is None:
-        try:
-            d_date, d_btc, d_eth = latest_defillama_etf_flows()
+        fallback = results["defillama"]
+        if not fallback.ok and results["farside"].ok:
+            # Farside answered first (DefiLlama was skipped or abandoned) but without a usable
+            # total for one of the assets.
+            try:
+                with telemetry.source("defillama"):
+                    fallback.value, fallback.ok = latest_defillama_etf_flows(), True
+            except Exception as e:
+                print(f"warn: defillama fetch failed ({e})")
+        elif not fallback.ok:
+            print(f"warn: defillama fetch failed ({fallback.error})")
+        if fallback.ok:
+            d_date, d_btc, d_eth = fallback.value
             if d_date:
                 ref_date = d_date
             if btc_flow is None:
@@ -179,10 +368,12 @@ def main() -> int:
             if eth_flow is None:
                 eth_flow = d_eth
             source = "defillama.com (source: farside)"
-        except Exception as e:
-            print(f"warn: defillama fetch failed ({e})")
+    clock.lap("fetch")
 
+    live = {"btc_flow": btc_flow is not None, "eth_flow": eth_flow is not None}
     ref_date, btc_flow, eth_flow, freshness = pick_fresher(ref_date, btc_flow, eth_flow, prev_payload)
+    for metric, ok in live.items():
+        telemetry.observe(metric, ok and freshness == "latest", "previous")
     payload = {
         "updated_at": datetime.now(timezone.utc).isoformat(),
         "date": ref_date,
@@ -190,9 +381,15 @@ def main() -> int:
         "eth_us_spot_etf_net_inflow_usd_m": eth_flow,
         "source": source,
         "freshness": freshness,
+        "aggregates": {asset: store.aggregates() for asset, store in stores.items()},
     }
-    OUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    print(f"updated {OUT}")
+    clock.lap("render")
+    changed = write_json(OUT, payload)
+    clock.lap("write")
+    print(f"{'updated' if changed else 'unchanged'} {OUT}")
+    telemetry.finish_run()
+    source_health.flush()
+    http_client.log_stats()
     return 0
 
 
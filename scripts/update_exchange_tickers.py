@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Update dashboard/data/exchange_tickers.json from the Binance, Bybit and OKX spot ticker dumps.
+
+Each dump lists every pair on the exchange (megabytes); only the USDT pairs of the tickers in
+crypto_custom_universe.json are kept, picked out with json_stream.select so the full list is
+never decoded. Per ticker the first venue that quotes it wins, in VENUES order, normalised the
+same way as workers/mode-a-gateway.js (Bybit's ratio and OKX's open/last become percentages).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import pathlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import cassette
+import http_cache
+import http_client
+import json_stream
+import source_health
+import telemetry
+from fetch_stage import StageClock, log_timings, run_sources
+from snapshot_io import read_json, write_json
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "dashboard" / "data"
+UNIVERSE = DATA_DIR / "crypto_custom_universe.json"
+OUT = DATA_DIR / "exchange_tickers.json"
+
+SOURCE_TIMEOUT_SEC = 20
+RUN_DEADLINE_SEC = 30
+
+BINANCE_URL = "https://api.binance.com/api/v3/ticker/24hr"
+BYBIT_URL = "https://api.bybit.com/v5/market/tickers?category=spot"
+OKX_URL = "https://www.okx.com/api/v5/market/tickers?instType=SPOT"
+
+Quote = Dict[str, Any]
+
+
+def to_num(value: Any) -> Optional[float]:
+    try:
+        if value is None or value == "":
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def pct_from_bybit(value: Any) -> Optional[float]:
+    """Bybit's price24hPcnt is a ratio (0.01 = 1%)."""
+    n = to_num(value)
+    return None if n is None else n * 100
+
+
+def pct_from_ohlc(last: Any, open_: Any) -> Optional[float]:
+    l, o = to_num(last), to_num(open_)
+    if l is None or o is None or o == 0:
+        return None
+    return (l - o) / o * 100
+
+
+def load_tickers(path: pathlib.Path = UNIVERSE) -> List[str]:
+    """Universe tickers with the exchange ticker feed enabled, in universe order."""
+    assets = read_json(path, {}).get("assets") or []
+    tickers = [str(a.get("ticker") or "").strip().upper() for a in assets if isinstance(a, dict) and not a.get("disable_ticker_feed")]
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def fetch_dump(url: str, key: str, suffix: str, tickers: List[str]) -> Dict[str, dict]:
+    """Raw records for `tickers` from one exchange dump; the selection is memoised per cached body."""
+    resp = http_client.get(url, timeout=SOURCE_TIMEOUT_SEC)
+    tag = hashlib.sha1(",".join(tickers).encode("utf-8")).hexdigest()[:12]
+    wanted = {f"{t}{suffix}": t for t in tickers}
+    return http_cache.parsed(resp, f"select:{key}:{suffix}:{tag}", lambda: json_stream.select(resp.body, key, wanted))
+
+
+def binance_quote(r: dict) -> Quote:
+    return {"price": to_num(r.get("lastPrice")), "change_24h": to_num(r.get("priceChangePercent")), "volume_24h": to_num(r.get("quoteVolume")), "pair": r.get("symbol")}
+
+
+def bybit_quote(r: dict) -> Quote:
+    return {"price": to_num(r.get("lastPrice")), "change_24h": pct_from_bybit(r.get("price24hPcnt")), "volume_24h": to_num(r.get("turnover24h")), "pair": r.get("symbol")}
+
+
+def okx_quote(r: dict) -> Quote:
+    return {"price": to_num(r.get("last")), "change_24h": pct_from_ohlc(r.get("last"), r.get("open24h")), "volume_24h": to_num(r.get("volCcy24h")), "pair": r.get("instId")}
+
+
+# name -> (dump URL, record key field, pair suffix, record -> normalised quote), in preference order
+VENUES: Dict[str, tuple] = {
+    "binance": (BINANCE_URL, "symbol", "USDT", binance_quote),
+    "bybit": (BYBIT_URL, "symbol", "USDT", bybit_quote),
+    "okx": (OKX_URL, "instId", "-USDT", okx_quote),
+}
+
+
+def fetch_venues(tickers: List[str]) -> Dict[str, Optional[Dict[str, dict]]]:
+    """Selected raw records per venue (None for a venue that failed), fetched concurrently."""
+    sources = {
+        name: (lambda url=url, key=key, suffix=suffix: fetch_dump(url, key, suffix, tickers), SOURCE_TIMEOUT_SEC, None)
+        for name, (url, key, suffix, _) in VENUES.items()
+    }
+    results = run_sources(sources, deadline_sec=RUN_DEADLINE_SEC)
+    log_timings(results)
+    return {name: r.value for name, r in results.items()}
+
+
+def merge(tickers: List[str], records: Dict[str, Optional[Dict[str, dict]]]) -> Dict[str, Quote]:
+    prices: Dict[str, Quote] = {}
+    for t in tickers:
+        for name, (_, _, _, normalise) in VENUES.items():
+            r = (records.get(name) or {}).get(t)
+            if r is None:
+                continue
+            q = normalise(r)
+            if q["price"] is None:
+                continue
+            prices[t] = {**q, "source": name}
+            break
+        telemetry.observe(t, t in prices)
+    return prices
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update the merged exchange ticker snapshot for the dashboard.")
+    cassette.add_arguments(parser)
+    cassette.apply(parser.parse_args(argv))
+    telemetry.start_run("exchanges")
+    clock = StageClock()
+    tickers = load_tickers()
+    if not tickers:
+        print(f"warn: no tickers in {UNIVERSE}; nothing to do")
+        telemetry.finish_run()
+        return 0
+
+    records = fetch_venues(tickers)
+    clock.lap("fetch")
+
+    live = [name for name, r in records.items() if r is not None]
+    if not live:
+        print("warn: every exchange dump failed; keeping the previous snapshot")
+        telemetry.finish_run()
+        source_health.flush()
+        return 0
+    prices = merge(tickers, records)
+    payload = {
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "sources": live,
+        "prices": prices,
+        "missing": [t for t in tickers if t not in prices],
+    }
+    clock.lap("render")
+
+    changed = write_json(OUT, payload, variants=True)
+    print(f"{'updated' if changed else 'unchanged'} {OUT} ({len(prices)}/{len(tickers)} tickers)")
+    clock.lap("write")
+    telemetry.finish_run()
+    source_health.flush()
+    http_client.log_stats()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,15 +3,25 @@
 
 from __future__ import annotations
 
-import csv
+import argparse
 import json
 import pathlib
 import urllib.parse
-import urllib.request
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
 from zoneinfo import ZoneInfo
 
+import cassette
+import fetch_planner
+import fred_store
+import http_client
+import source_health
+import telemetry
+from history_store import HistoryStore
+from snapshot_io import read_json, write_json
+from risk_engine import WINDOWS, RiskEngine, align_closes, log_returns
+from fetch_stage import StageClock, log_timings, run_hedged, run_sources
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "dashboard" / "data"
 API_DIR = ROOT / "dashboard" / "api" / "macro"
@@ -20,41 +30,34 @@ OUT_MACRO = DATA_DIR / "macro_snapshot.json"
 OUT_MACRO_API = API_DIR / "snapshot.json"
 OUT_STOCKS = DATA_DIR / "stocks_watchlist.json"
 OUT_SNAPSHOT = DATA_DIR / "snapshot.json"
-
-USER_AGENT = "project-mark-dashboard/1.0"
+OUT_RISK = DATA_DIR / "risk_metrics.json"
+
+SOURCE_TIMEOUT_SEC = 20
+RUN_DEADLINE_SEC = 45
+HEDGE_DEFAULT_SEC = 3.0  # until a host has enough latency samples for a p95
+USDKRW_YAHOO_SYMBOL = "KRW=X"
+USDKRW_SESSION = "fx"
+WATCHLIST_SESSION = "nyse"  # fetch_planner.SESSIONS key for every watchlist ticker
 KST = ZoneInfo("Asia/Seoul")
 
-YAHOO_SYMBOLS = {
-    "nasdaq": "^IXIC",
-    "dow": "^DJI",
-    "sp500": "^GSPC",
-    "russell2000": "^RUT",
-    "kospi": "^KS11",
-    "kosdaq": "^KQ11",
-    "dxy": "DX-Y.NYB",
-    "gold": "GC=F",
-    "silver": "SI=F",
-    "wti": "CL=F",
-    "copper": "HG=F",
-}
+SYMBOL_REGISTRY = ROOT / "pipelines" / "symbol_registry.json"
+
+YAHOO_CHUNK_SIZE = 50
+YAHOO_MAX_URL_LEN = 1800
+YAHOO_CHUNK_RETRIES = 2
+YAHOO_CHUNK_CONCURRENCY = 4
+
+
+def load_registry(path: pathlib.Path = SYMBOL_REGISTRY) -> Tuple[List[dict], List[Tuple[str, str, str]]]:
+    """Macro Yahoo metrics ({key, symbol, section, display, session}) and (group, name, ticker) watchlist rows."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    macro = [dict(m) for m in data.get("macro", [])]
+    watchlist = [(str(r["group"]), str(r["name"]), str(r["ticker"]).upper()) for r in data.get("watchlist", [])]
+    return macro, watchlist
+
 
-WATCHLIST = [
-    ("Big Tech", "Apple", "AAPL"),
-    ("Big Tech", "Microsoft", "MSFT"),
-    ("Big Tech", "NVIDIA", "NVDA"),
-    ("Big Tech", "Amazon", "AMZN"),
-    ("Big Tech", "Alphabet", "GOOGL"),
-    ("Big Tech", "Meta", "META"),
-    ("Big Tech", "Tesla", "TSLA"),
-    ("Crypto Related", "Robinhood", "HOOD"),
-    ("Crypto Related", "Coinbase", "COIN"),
-    ("Crypto Related", "MicroStrategy/Strategy", "MSTR"),
-    ("Crypto Related", "Marathon Digital", "MARA"),
-    ("Crypto Related", "Riot Platforms", "RIOT"),
-    ("Crypto Related", "Block", "SQ"),
-    ("Crypto Related", "PayPal", "PYPL"),
-    ("Crypto Related", "CME Group", "CME"),
-]
+MACRO_SYMBOLS, WATCHLIST = load_registry()
+YAHOO_SYMBOLS = {m["key"]: m["symbol"] for m in MACRO_SYMBOLS}
 
 FRED_SERIES = {
     "us10y": "DGS10",
@@ -67,31 +70,48 @@ FRED_SERIES = {
 }
 
 
-def read_json(path: pathlib.Path, default: dict) -> dict:
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return default
-
-
-def fetch_json(url: str, timeout: int = 20) -> Optional[dict]:
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except Exception as e:
-        print(f"warn: fetch_json failed: {url} ({e})")
-        return None
-
-
-def fetch_yahoo_quotes(symbols: List[str]) -> Tuple[Dict[str, dict], bool]:
+def yahoo_chunks(symbols: List[str]) -> List[List[str]]:
+    """Split symbols into batches of at most YAHOO_CHUNK_SIZE whose encoded list fits YAHOO_MAX_URL_LEN."""
+    chunks: List[List[str]] = []
+    cur: List[str] = []
+    cur_len = 0
+    for sym in symbols:
+        enc_len = len(urllib.parse.quote(sym, safe="")) + 1
+        if cur and (len(cur) >= YAHOO_CHUNK_SIZE or cur_len + enc_len > YAHOO_MAX_URL_LEN):
+            chunks.append(cur)
+            cur, cur_len = [], 0
+        cur.append(sym)
+        cur_len += enc_len
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def fetch_yahoo_chunk(symbols: List[str], timeout: int = 20) -> Dict[str, dict]:
     joined = urllib.parse.quote(",".join(symbols), safe=",")
     url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={joined}"
-    data = fetch_json(url)
-    if not data:
-        return {}, False
-    results = data.get("quoteResponse", {}).get("result", [])
-    return ({item.get("symbol"): item for item in results if item.get("symbol")}, True)
+    data = http_client.get_json(url, timeout=timeout, retries=YAHOO_CHUNK_RETRIES)
+    results = (data or {}).get("quoteResponse", {}).get("result", []) or []
+    return {item.get("symbol"): item for item in results if item.get("symbol")}
+
+
+def fetch_yahoo_quotes(symbols: List[str], timeout: int = 20) -> Tuple[Dict[str, dict], bool]:
+    """Fetch quotes in concurrent URL-safe chunks; a failed chunk only drops its own symbols."""
+    chunks = yahoo_chunks(symbols)
+    sources = {
+        f"yahoo[{i}]": (lambda c=chunk: fetch_yahoo_chunk(c, timeout=timeout), timeout * (YAHOO_CHUNK_RETRIES + 1), None)
+        for i, chunk in enumerate(chunks)
+    }
+    results = run_sources(sources, deadline_sec=RUN_DEADLINE_SEC - 1, max_workers=YAHOO_CHUNK_CONCURRENCY)
+    quotes: Dict[str, dict] = {}
+    ok = False
+    for chunk, r in zip(chunks, results.values()):
+        if r.ok:
+            quotes.update(r.value)
+            ok = True
+        else:
+            print(f"warn: {r.name} failed: {chunk[0]}..{chunk[-1]} ({len(chunk)} symbols) ({r.error})")
+    return quotes, ok
 
 
 def to_num(value: Any) -> Optional[float]:
@@ -103,33 +123,65 @@ def to_num(value: Any) -> Optional[float]:
         return None
 
 
-def fetch_fred_latest(series_id: str) -> Tuple[Optional[float], Optional[float], bool]:
-    url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+def fetch_usdkrw_er_api(timeout: int = 20) -> float:
+    rate = to_num((http_client.get_json("https://open.er-api.com/v6/latest/USD", timeout=timeout) or {}).get("rates", {}).get("KRW"))
+    if rate is None:
+        raise ValueError("er-api: no KRW rate")
+    return rate
+
+
+def fetch_usdkrw_yahoo(timeout: int = 20) -> float:
+    data = http_client.get_json(f"https://query1.finance.yahoo.com/v8/finance/chart/{USDKRW_YAHOO_SYMBOL}?range=5d&interval=1d", timeout=timeout)
+    result = ((data or {}).get("chart", {}).get("result") or [{}])[0]
+    rate = to_num((result.get("meta") or {}).get("regularMarketPrice"))
+    if rate is None:
+        closes = [c for c in ((result.get("indicators") or {}).get("quote") or [{}])[0].get("close") or [] if c is not None]
+        rate = to_num(closes[-1]) if closes else None
+    if rate is None:
+        raise ValueError(f"yahoo: no {USDKRW_YAHOO_SYMBOL} rate")
+    return rate
+
+
+def fetch_usdkrw(timeout: int = 20) -> Optional[float]:
+    """er-api, hedged with Yahoo's KRW=X once er-api fails or runs past its p95 latency."""
+    results = run_hedged(
+        "er-api",
+        "yahoo-fx",
+        {
+            "er-api": (lambda: fetch_usdkrw_er_api(timeout), timeout, None),
+            "yahoo-fx": (lambda: fetch_usdkrw_yahoo(timeout), timeout, None),
+        },
+        hedge_after_sec=source_health.hedge_delay_sec("open.er-api.com", HEDGE_DEFAULT_SEC),
+        deadline_sec=timeout,
+    )
+    winner = next((r for r in results.values() if r.ok), None)
+    if winner is None:
+        print(f"warn: usdkrw unavailable ({'; '.join(f'{r.name}: {r.error}' for r in results.values())})")
+        return None
+    return winner.value
+
+
+def fetch_fred_latest(series_id: str, timeout: int = 20) -> Tuple[Optional[float], Optional[float], bool]:
+    store = fred_store.open_series(series_id)
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            text = resp.read().decode("utf-8", errors="ignore")
+        store.update(timeout=timeout)
     except Exception as e:
         print(f"warn: fetch_fred failed: {series_id} ({e})")
         return None, None, False
 
-    rows: List[float] = []
-    reader = csv.DictReader(text.splitlines())
-    for row in reader:
-        raw = (row.get(series_id) or row.get("VALUE") or "").strip()
-        if not raw or raw == ".":
-            continue
-        try:
-            rows.append(float(raw))
-        except ValueError:
-            continue
-
-    if not rows:
+    latest, delta = store.latest()
+    if latest is None:
         return None, None, False
+    return latest, delta, True
 
-    latest = rows[-1]
-    prev = rows[-2] if len(rows) >= 2 else rows[-1]
-    return latest, latest - prev, True
+
+def fred_entry(key: str, t: Tuple[Optional[float], float, str]) -> Dict[str, Any]:
+    """Snapshot entry for a FRED metric, with 1w/1m deltas read from the local series store."""
+    store = fred_store.open_series(FRED_SERIES[key])
+    entry: Dict[str, Any] = {"value": t[0], "delta": t[1], "display": t[2]}
+    for name, value in store.deltas().items():
+        entry[f"delta_{name}"] = value
+    return mark_age(entry, store.last_date)
 
 
 def pct_or_zero(value: Optional[float]) -> float:
@@ -159,16 +211,27 @@ def get_quote_fields(quotes: Dict[str, dict], symbol: str) -> Tuple[Optional[flo
     return to_num(q.get("regularMarketPrice")), to_num(q.get("regularMarketChangePercent"))
 
 
-def read_prev_metric(prev_macro: dict, *path: str) -> Tuple[Optional[float], float, str]:
-    cur: Any = prev_macro
-    for p in path:
-        cur = cur.get(p, {}) if isinstance(cur, dict) else {}
-    if not isinstance(cur, dict):
-        return None, 0.0, "—"
-    val = to_num(cur.get("value"))
-    delta = to_num(cur.get("delta"))
-    display = cur.get("display")
-    return val, pct_or_zero(delta), display if isinstance(display, str) else "—"
+def index_prev_metrics(prev_macro: dict) -> Dict[Tuple[str, str], Tuple[Optional[float], float, str]]:
+    """One pass over the previous snapshot: (section, key) -> (value, delta, display)."""
+    index: Dict[Tuple[str, str], Tuple[Optional[float], float, str]] = {}
+    for section, metrics in prev_macro.items():
+        if not isinstance(metrics, dict):
+            continue
+        for key, cur in metrics.items():
+            if not isinstance(cur, dict):
+                continue
+            display = cur.get("display")
+            index[(section, key)] = (
+                to_num(cur.get("value")),
+                pct_or_zero(to_num(cur.get("delta"))),
+                display if isinstance(display, str) else "—",
+            )
+    return index
+
+
+def display_fn(template: str):
+    """Registry display template, e.g. "${int}/oz" or "{f2}", as a value formatter."""
+    return lambda v: template.format(int=fmt_int(v), f2=fmt_2(v), f3=fmt_3(v))
 
 
 def pick_value(live_val: Optional[float], live_delta: Optional[float], prev: Tuple[Optional[float], float, str], display_fn) -> Tuple[Optional[float], float, str]:
@@ -177,119 +240,195 @@ def pick_value(live_val: Optional[float], live_delta: Optional[float], prev: Tup
     return live_val, pct_or_zero(live_delta), display_fn(live_val)
 
 
-def main() -> int:
-    prev_macro = read_json(OUT_MACRO, {})
-    prev_stocks = read_json(OUT_STOCKS, {"rows": []})
-
-    symbols = sorted(set(YAHOO_SYMBOLS.values()) | {t for _, _, t in WATCHLIST})
-    quotes, quotes_ok = fetch_yahoo_quotes(symbols)
+def plan_fetch(planner: fetch_planner.FetchPlanner) -> Set[str]:
+    """Metric keys (macro keys, watchlist tickers, "usdkrw", "fred:<key>") that could have new data now."""
+    due = {m["key"] for m in MACRO_SYMBOLS if planner.market_due(m["key"], m.get("session", WATCHLIST_SESSION))}
+    due.update(t for _, _, t in WATCHLIST if planner.market_due(t, WATCHLIST_SESSION))
+    if planner.market_due("usdkrw", USDKRW_SESSION):
+        due.add("usdkrw")
+    for key, series_id in FRED_SERIES.items():
+        if planner.fred_due(f"fred:{key}", series_id, fred_store.open_series(series_id).last_date):
+            due.add(f"fred:{key}")
+    total = len(MACRO_SYMBOLS) + len(WATCHLIST) + 1 + len(FRED_SERIES)
+    reasons = sorted(set(planner.reasons.values()))
+    print(f"plan: {len(due)}/{total} metrics due" + (f"; skipping ({'; '.join(reasons)})" if reasons else ""))
+    return due
+
+
+def fetch_all_sources(due: Set[str]) -> Tuple[Dict[str, dict], bool, Optional[float], Dict[str, Tuple[Optional[float], Optional[float], bool]]]:
+    """Fetch the due Yahoo quotes, USD/KRW and FRED series concurrently within RUN_DEADLINE_SEC."""
+    symbols = list(dict.fromkeys([
+        *(m["symbol"] for m in MACRO_SYMBOLS if m["key"] in due),
+        *(t for _, _, t in WATCHLIST if t in due),
+    ]))
+    t = SOURCE_TIMEOUT_SEC
+    sources = {}
+    if symbols:
+        sources["yahoo"] = (lambda: fetch_yahoo_quotes(symbols, timeout=t), RUN_DEADLINE_SEC, ({}, False))
+    if "usdkrw" in due:
+        sources["usdkrw"] = (lambda: fetch_usdkrw(timeout=t), t, None)
+    for key, series_id in FRED_SERIES.items():
+        if f"fred:{key}" in due:
+            sources[f"fred:{key}"] = (lambda sid=series_id: fetch_fred_latest(sid, timeout=t), t, (None, None, False))
+
+    results = run_sources(sources, deadline_sec=RUN_DEADLINE_SEC)
+    log_timings(results)
+
+    quotes, quotes_ok = results["yahoo"].value if "yahoo" in results else ({}, False)
+    usdkrw_live = results["usdkrw"].value if "usdkrw" in results else None
+    fred_map = {key: results[f"fred:{key}"].value if f"fred:{key}" in results else (None, None, False) for key in FRED_SERIES}
+    return quotes, quotes_ok, usdkrw_live, fred_map
+
+
+def kst_stamp(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%d %H:%M KST") if ts else None
+
+
+def mark_age(entry: Dict[str, Any], observed_at: Optional[str]) -> Dict[str, Any]:
+    """Stamp an output entry with when its value was observed.
+
+    A value carried from a previous run keeps its old observed_at; readers compare it with the
+    snapshot's as_of rather than reading a per-run flag, so a skipped run doesn't change the content.
+    """
+    entry["observed_at"] = observed_at
+    return entry
+
+
+def record_history(quotes: Dict[str, dict], usdkrw_live: Optional[float], fred_map: Dict[str, Tuple[Optional[float], Optional[float], bool]]) -> None:
+    """Append this run's live values (not carried-forward ones) to the columnar history store."""
+    values: Dict[str, Optional[float]] = {key: get_quote_fields(quotes, sym)[0] for key, sym in YAHOO_SYMBOLS.items()}
+    values.update({ticker: get_quote_fields(quotes, ticker)[0] for _, _, ticker in WATCHLIST})
+    values.update({key: val if ok else None for key, (val, _, ok) in fred_map.items()})
+    values["usdkrw"] = usdkrw_live
+    try:
+        HistoryStore().append(datetime.now(KST), values)
+    except Exception as e:
+        print(f"warn: history append failed ({e})")
 
-    usdkrw_data = fetch_json("https://open.er-api.com/v6/latest/USD")
-    usdkrw_live = to_num((usdkrw_data or {}).get("rates", {}).get("KRW"))
 
-    fred_map: Dict[str, Tuple[Optional[float], Optional[float], bool]] = {
-        key: fetch_fred_latest(series_id) for key, series_id in FRED_SERIES.items()
-    }
+def build_risk_metrics(as_of: str) -> Optional[dict]:
+    """Rolling vol/corr/beta (vs S&P 500) over daily closes from the history store."""
+    assets = list(YAHOO_SYMBOLS) + [ticker for _, _, ticker in WATCHLIST]
+    store = HistoryStore()
+    since = datetime.now(KST) - timedelta(days=max(WINDOWS) * 2)
+    series = {a: store.daily_last(a, since, tz=KST) for a in assets}
+    series = {a: s for a, s in series.items() if s}
+    if "sp500" not in series:
+        return None
+    dates, rows = align_closes(series, ffill=True)
+    returns = log_returns(rows)
+    engine = RiskEngine(list(series))
+    engine.seed(returns)
+    return {"as_of": as_of, "through": dates[-1] if dates else None, "benchmark": "sp500", **engine.snapshot("sp500")}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update macro/stocks snapshot files for the dashboard.")
+    parser.add_argument("--full", action="store_true", help="Ignore the fetch plan and request every source.")
+    cassette.add_arguments(parser)
+    args = parser.parse_args(argv)
+    cassette.apply(args)
+    telemetry.start_run("macro_stocks")
+    prev_macro = read_json(OUT_MACRO, {})
+    prev_stocks = read_json(OUT_STOCKS, {"rows": []})
+    clock = StageClock()
+
+    planner = fetch_planner.FetchPlanner(full=args.full)
+    due = plan_fetch(planner)
+    quotes, quotes_ok, usdkrw_live, fred_map = fetch_all_sources(due)
+    clock.lap("fetch")
+
+    fetched_ts = planner.now.timestamp()
+    for key, symbol in [*((m["key"], m["symbol"]) for m in MACRO_SYMBOLS), *((t, t) for _, _, t in WATCHLIST)]:
+        if key in due and get_quote_fields(quotes, symbol)[0] is not None:
+            planner.mark_fetched(key, to_num(quotes[symbol].get("regularMarketTime")) or fetched_ts)
+    if usdkrw_live is not None:
+        planner.mark_fetched("usdkrw", fetched_ts)
+    for key in FRED_SERIES:
+        if f"fred:{key}" in due and fred_map[key][2]:
+            planner.mark_fetched(f"fred:{key}")
 
     fetched_any = quotes_ok or usdkrw_live is not None or any(x[2] for x in fred_map.values())
     as_of = datetime.now(KST).strftime("%Y-%m-%d %H:%M KST") if fetched_any else prev_macro.get("as_of", datetime.now(KST).strftime("%Y-%m-%d %H:%M KST"))
+    if fetched_any:
+        record_history(quotes, usdkrw_live, fred_map)
+    clock.lap("write")
 
-    prev_us10y = read_prev_metric(prev_macro, "rates", "us10y")
-    prev_us2y = read_prev_metric(prev_macro, "rates", "us2y")
-    prev_sofr = read_prev_metric(prev_macro, "rates", "sofr")
-    prev_iorb = read_prev_metric(prev_macro, "rates", "iorb")
+    prev_index = index_prev_metrics(prev_macro)
+    missing_prev: Tuple[Optional[float], float, str] = (None, 0.0, "—")
 
-    def fred_pick(key: str, prev: Tuple[Optional[float], float, str], fn):
+    def fred_pick(key: str, section: str, fn):
+        prev = prev_index.get((section, key), missing_prev)
         val, delta, ok = fred_map[key]
+        if f"fred:{key}" not in due:
+            # Nothing new can have been published; the local store already holds the latest observation.
+            telemetry.skip(key)
+            val, delta = fred_store.open_series(FRED_SERIES[key]).latest()
+            ok = True
+        else:
+            telemetry.observe(key, ok and val is not None, "previous")
         if not ok or val is None:
             return prev
         return val, pct_or_zero(delta), fn(val)
 
-    us10y = fred_pick("us10y", prev_us10y, fmt_2)
-    us2y = fred_pick("us2y", prev_us2y, fmt_2)
-    sofr = fred_pick("sofr", prev_sofr, fmt_2)
-    iorb = fred_pick("iorb", prev_iorb, fmt_2)
-
-    prev_dxy = read_prev_metric(prev_macro, "fx", "dxy")
-    dxy_price, dxy_delta_live = get_quote_fields(quotes, YAHOO_SYMBOLS["dxy"])
-    dxy = pick_value(dxy_price, dxy_delta_live, prev_dxy, fmt_2)
-
-    prev_usdkrw = read_prev_metric(prev_macro, "fx", "usdkrw")
-    usdkrw = pick_value(usdkrw_live, 0.0, prev_usdkrw, fmt_int)
-
-    def y_pick(key: str, prev_path: Tuple[str, str], disp):
-        prev = read_prev_metric(prev_macro, *prev_path)
-        p, d = get_quote_fields(quotes, YAHOO_SYMBOLS[key])
-        return pick_value(p, d, prev, disp)
-
-    nasdaq = y_pick("nasdaq", ("indices", "nasdaq"), fmt_int)
-    dow = y_pick("dow", ("indices", "dow"), fmt_int)
-    sp500 = y_pick("sp500", ("indices", "sp500"), fmt_int)
-    russell2000 = y_pick("russell2000", ("indices", "russell2000"), fmt_int)
-    kospi = y_pick("kospi", ("indices", "kospi"), fmt_int)
-    kosdaq = y_pick("kosdaq", ("indices", "kosdaq"), fmt_int)
-
-    gold = y_pick("gold", ("commodities", "gold"), lambda v: f"${fmt_int(v)}/oz")
-    silver = y_pick("silver", ("commodities", "silver"), lambda v: f"${fmt_2(v)}/oz")
-    wti = y_pick("wti", ("commodities", "wti"), lambda v: f"${fmt_2(v)}")
-    copper = y_pick("copper", ("commodities", "copper"), lambda v: f"${fmt_2(v)}/lb")
-
-    prev_tga = read_prev_metric(prev_macro, "liquidity", "tga")
-    prev_rrp = read_prev_metric(prev_macro, "liquidity", "rrp")
-    prev_repo = read_prev_metric(prev_macro, "liquidity", "repo")
-
-    def liq_pick(key: str, prev: Tuple[Optional[float], float, str], fn):
-        val, delta, ok = fred_map[key]
-        if not ok or val is None:
-            return prev
-        return val, pct_or_zero(delta), fn(val)
-
-    tga = liq_pick("tga", prev_tga, fmt_int)
-    rrp = liq_pick("rrp", prev_rrp, fmt_2)
-    repo = liq_pick("repo", prev_repo, fmt_3)
+    us10y = fred_pick("us10y", "rates", fmt_2)
+    us2y = fred_pick("us2y", "rates", fmt_2)
+    sofr = fred_pick("sofr", "rates", fmt_2)
+    iorb = fred_pick("iorb", "rates", fmt_2)
+    tga = fred_pick("tga", "liquidity", fmt_int)
+    rrp = fred_pick("rrp", "liquidity", fmt_2)
+    repo = fred_pick("repo", "liquidity", fmt_3)
+
+    def observe_market(key: str, live: bool) -> None:
+        if key in due:
+            telemetry.observe(key, live, "previous")
+        else:
+            telemetry.skip(key)
+
+    usdkrw = pick_value(usdkrw_live, 0.0, prev_index.get(("fx", "usdkrw"), missing_prev), fmt_int)
+    observe_market("usdkrw", usdkrw_live is not None)
+
+    yahoo: Dict[str, Tuple[Optional[float], float, str]] = {}
+    sections: Dict[str, Dict[str, dict]] = {"fx": {}, "indices": {}, "commodities": {}}
+    for m in MACRO_SYMBOLS:
+        p, d = get_quote_fields(quotes, m["symbol"])
+        observe_market(m["key"], p is not None)
+        t = pick_value(p, d, prev_index.get((m["section"], m["key"]), missing_prev), display_fn(m["display"]))
+        yahoo[m["key"]] = t
+        entry = {"value": t[0], "delta": t[1], "display": t[2]}
+        sections.setdefault(m["section"], {})[m["key"]] = mark_age(entry, kst_stamp(planner.observed_at(m["key"])))
+    usdkrw_entry = {"value": usdkrw[0], "delta": usdkrw[1], "display": usdkrw[2]}
+    sections["fx"]["usdkrw"] = mark_age(usdkrw_entry, kst_stamp(planner.observed_at("usdkrw")))
 
     macro = {
         "as_of": as_of,
         "rates": {
-            "us10y": {"value": us10y[0], "delta": us10y[1], "display": us10y[2]},
-            "us2y": {"value": us2y[0], "delta": us2y[1], "display": us2y[2]},
-            "sofr": {"value": sofr[0], "delta": sofr[1], "display": sofr[2]},
-            "iorb": {"value": iorb[0], "delta": iorb[1], "display": iorb[2]},
-        },
-        "fx": {
-            "dxy": {"value": dxy[0], "delta": dxy[1], "display": dxy[2]},
-            "usdkrw": {"value": usdkrw[0], "delta": usdkrw[1], "display": usdkrw[2]},
-        },
-        "indices": {
-            "kospi": {"value": kospi[0], "delta": kospi[1], "display": kospi[2]},
-            "kosdaq": {"value": kosdaq[0], "delta": kosdaq[1], "display": kosdaq[2]},
-            "nasdaq": {"value": nasdaq[0], "delta": nasdaq[1], "display": nasdaq[2]},
-            "dow": {"value": dow[0], "delta": dow[1], "display": dow[2]},
-            "russell2000": {"value": russell2000[0], "delta": russell2000[1], "display": russell2000[2]},
-            "sp500": {"value": sp500[0], "delta": sp500[1], "display": sp500[2]},
-        },
-        "commodities": {
-            "gold": {"value": gold[0], "delta": gold[1], "display": gold[2]},
-            "silver": {"value": silver[0], "delta": silver[1], "display": silver[2]},
-            "wti": {"value": wti[0], "delta": wti[1], "display": wti[2]},
-            "copper": {"value": copper[0], "delta": copper[1], "display": copper[2]},
+            "us10y": fred_entry("us10y", us10y),
+            "us2y": fred_entry("us2y", us2y),
+            "sofr": fred_entry("sofr", sofr),
+            "iorb": fred_entry("iorb", iorb),
         },
+        **sections,
         "liquidity": {
-            "rrp": {"value": rrp[0], "delta": rrp[1], "display": rrp[2]},
-            "tga": {"value": tga[0], "delta": tga[1], "display": tga[2]},
-            "repo": {"value": repo[0], "delta": repo[1], "display": repo[2]},
+            "rrp": fred_entry("rrp", rrp),
+            "tga": fred_entry("tga", tga),
+            "repo": fred_entry("repo", repo),
             "qt_status": prev_macro.get("liquidity", {}).get("qt_status", "진행 중 (대차대조표 축소)"),
         },
     }
+    sp500, nasdaq, kospi, kosdaq = yahoo["sp500"], yahoo["nasdaq"], yahoo["kospi"], yahoo["kosdaq"]
+    gold, silver, copper = yahoo["gold"], yahoo["silver"], yahoo["copper"]
 
     prev_stock_rows = {str(r.get("ticker", "")).upper(): r for r in prev_stocks.get("rows", []) if isinstance(r, dict)}
     stocks_rows = []
     for group, name, ticker in WATCHLIST:
         p_live, d_live = get_quote_fields(quotes, ticker)
+        observe_market(ticker, p_live is not None)
         prev_row = prev_stock_rows.get(ticker, {})
         price = round(p_live, 2) if p_live is not None else prev_row.get("price")
         change = round(pct_or_zero(d_live), 2) if d_live is not None else pct_or_zero(to_num(prev_row.get("change")))
-        stocks_rows.append({"group": group, "name": name, "ticker": ticker, "price": price, "change": change})
+        row = {"group": group, "name": name, "ticker": ticker, "price": price, "change": change}
+        stocks_rows.append(mark_age(row, kst_stamp(planner.observed_at(ticker))))
 
     stocks_payload = {"as_of": as_of, "rows": stocks_rows}
 
@@ -321,15 +460,27 @@ def main() -> int:
             {"label": "Copper 🟤", "value": copper[2], "delta": copper[1]},
         ],
     }
-
-    OUT_MACRO.write_text(json.dumps(macro, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    OUT_MACRO_API.write_text(json.dumps(macro, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    OUT_STOCKS.write_text(json.dumps(stocks_payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    OUT_SNAPSHOT.write_text(json.dumps(snapshot_payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-
-    print(f"updated {OUT_MACRO}")
-    print(f"updated {OUT_STOCKS}")
-    print(f"updated {OUT_SNAPSHOT}")
+    clock.lap("render")
+
+    for paths, payload in (
+        ([OUT_MACRO, OUT_MACRO_API], macro),
+        ([OUT_STOCKS], stocks_payload),
+        ([OUT_SNAPSHOT], snapshot_payload),
+    ):
+        changed = write_json(paths, payload)
+        print(f"{'updated' if changed else 'unchanged'} {paths[0]}")
+    clock.lap("write")
+
+    risk = build_risk_metrics(as_of)
+    clock.lap("render")
+    if risk is not None:
+        changed = write_json(OUT_RISK, risk)
+        print(f"{'updated' if changed else 'unchanged'} {OUT_RISK}")
+    planner.flush()
+    clock.lap("write")
+    telemetry.finish_run()
+    source_health.flush()
+    http_client.log_stats()
     return 0
 
 
@@ -1,50 +1,94 @@
 #!/usr/bin/env python3
-"""Update dashboard/data/news.json from Google News RSS feeds."""
+"""Update dashboard/data/news.json from Google News RSS feeds.
+
+news.json is a rolling feed: each run parses only until it has NEW_PER_RUN items the seen index
+(news_store.py) has not recorded, and merges those ahead of the previously published items.
+"""
 
 from __future__ import annotations
 
-import json
+import argparse
 import pathlib
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+import cassette
+import http_client
+import news_store
+import source_health
+import telemetry
+from fetch_stage import StageClock, timed
+from snapshot_io import read_json, write_json
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 OUT = ROOT / "dashboard" / "data" / "news.json"
-USER_AGENT = "project-mark-dashboard/1.0"
 
+FEED_SIZE = 30  # rolling items kept per bucket in news.json
+NEW_PER_RUN = 8  # parsing stops once a bucket has this many unseen items
+
+
+def feed_url(query: str) -> str:
+    return f"https://news.google.com/rss/search?q={urllib.parse.quote(query)}&hl=en-US&gl=US&ceid=US:en"
+
+
+def fetch_new(name: str, query: str, index: news_store.SeenIndex, limit: int = NEW_PER_RUN) -> List[Dict[str, str]]:
+    """Items of bucket `name` not in the seen index; an RSS body identical to the last one is not parsed."""
+    resp = http_client.get(feed_url(query), timeout=15)
+    if index.feed_unchanged(name, resp.body):
+        return []
+    with timed("parse"):
+        items, _ = index.take_new(resp.body, name, limit)
+    return items
 
-def fetch_rss(query: str, limit: int = 6) -> List[Dict[str, str]]:
-    q = urllib.parse.quote(query)
-    url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        xml_bytes = resp.read()
 
-    root = ET.fromstring(xml_bytes)
-    out: List[Dict[str, str]] = []
-    for item in root.findall(".//item")[:limit]:
-        title = (item.findtext("title") or "").strip()
-        link = (item.findtext("link") or "").strip()
-        pub_date = (item.findtext("pubDate") or "").strip()
-        if title and link:
-            out.append({"title": title, "link": link, "pubDate": pub_date})
-    return out
+def fetch_bucket(name: str, query: str, prev_payload: dict, index: news_store.SeenIndex) -> List[Dict[str, str]]:
+    """Merge new items into the previously published bucket; on failure keep it as is."""
+    prev = prev_payload.get(name) or []
+    try:
+        with telemetry.source(f"news:{name}"):
+            new = fetch_new(name, query, index)
+    except (OSError, ET.ParseError) as e:
+        print(f"warn: news {name} fetch failed ({e})")
+        telemetry.observe(name, False, "previous")
+        return list(prev)
+    feed = news_store.merge_feed(prev, new, FEED_SIZE)
+    telemetry.observe(name, bool(feed))
+    print(f"news {name}: {len(new)} new, {len(feed)} in feed")
+    return feed
 
 
-def main() -> int:
-    macro = fetch_rss("US stock market OR treasury yields OR federal reserve when:1d", limit=8)
-    crypto = fetch_rss("bitcoin OR ethereum OR crypto ETF OR SEC crypto when:1d", limit=8)
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update dashboard/data/news.json from Google News RSS.")
+    cassette.add_arguments(parser)
+    cassette.apply(parser.parse_args(argv))
+    telemetry.start_run("news")
+    clock = StageClock()
+    prev_payload = read_json(OUT, {})
+    index = news_store.SeenIndex()
+    if not len(index):
+        # First run against an empty store: what is already published counts as seen.
+        for name in ("macro", "crypto"):
+            for item in prev_payload.get(name) or []:
+                if isinstance(item, dict):
+                    index.mark(item, name)
+    macro = fetch_bucket("macro", "US stock market OR treasury yields OR federal reserve when:1d", prev_payload, index)
+    crypto = fetch_bucket("crypto", "bitcoin OR ethereum OR crypto ETF OR SEC crypto when:1d", prev_payload, index)
+    index.flush()
+    clock.lap("fetch")
 
     payload = {
         "updated_at": datetime.now(timezone.utc).isoformat(),
         "macro": macro,
         "crypto": crypto,
     }
-    OUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    print(f"updated {OUT}")
+    changed = write_json(OUT, payload)
+    clock.lap("write")
+    print(f"{'updated' if changed else 'unchanged'} {OUT}")
+    telemetry.finish_run()
+    source_health.flush()
+    http_client.log_stats()
     return 0
 
 
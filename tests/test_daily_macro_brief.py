@@ -0,0 +1,94 @@
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+import daily_macro_brief as brief  # noqa: E402
+import telemetry  # noqa: E402
+
+
+def _quotes(labels):
+    return {label: brief.Quote(symbol=label, price=None, change_pct=None, source="test") for label in labels}
+
+
+def _render(**kwargs):
+    return brief.render_markdown(
+        now_kst=datetime(2026, 10, 19, 9, 27, tzinfo=brief.ensure_tz("Asia/Seoul")),
+        indices=_quotes(brief.INDEX_LABELS),
+        commodities=_quotes(brief.COMMODITY_SYMBOLS),
+        equities=_quotes(brief.EQUITY_SYMBOLS),
+        crypto=_quotes(brief.CRYPTO_TICKERS),
+        macro_news=[],
+        crypto_news=[],
+        fear_greed=None,
+        **kwargs,
+    )
+
+
+class EscalationRenderTest(unittest.TestCase):
+    def test_missing_rate_and_latency_escalations(self):
+        escalations = [
+            {"rule": telemetry.MISSING_RATE_RULE, "action": telemetry.MISSING_RATE_ACTION, "symbol": "macro_stocks:gold", "missing_rate": 0.05},
+            {"rule": telemetry.LATENCY_RULE, "action": telemetry.LATENCY_ACTION, "source": "etf:farside", "request_ms_mean": 412.0},
+        ]
+        doc = _render(escalations=escalations)
+        self.assertIn("macro_stocks:gold 5.0%", doc)
+        self.assertIn("etf:farside 412ms", doc)
+
+    def test_latency_escalation_only(self):
+        doc = _render(escalations=[{"rule": telemetry.LATENCY_RULE, "source": "news:macro", "request_ms_mean": 300.0}])
+        self.assertIn("news:macro 300ms", doc)
+        self.assertNotIn("결측률 경보", doc)
+
+
+class RunModeRenderTest(unittest.TestCase):
+    def test_run_mode_is_rendered(self):
+        doc = _render(run_mode="snapshots (no network)")
+        self.assertIn("- Run Mode: snapshots (no network)", doc)
+        self.assertIn("- run_mode: snapshots (no network)", doc)
+        self.assertNotIn("Run Mode: full", doc)
+
+
+class RiskInputsTest(unittest.TestCase):
+    def test_recent_cache_only_fetches_last_month(self):
+        cached = {label: {"2026-09-01": 1.0, "2026-10-14": 2.0} for label in brief.CORRELATION_SYMBOLS}
+        ranges = []
+
+        def closes(symbol, range_="6mo"):
+            ranges.append(range_)
+            return {"2026-10-15": 3.0, "2026-10-16": 4.0}
+
+        with mock.patch.object(brief, "fetch_yahoo_closes", closes):
+            out = brief.fetch_risk_closes(cached, today=date(2026, 10, 18))
+        self.assertEqual(set(ranges), {"1mo"})
+        self.assertEqual(list(out["BTC"]), ["2026-09-01", "2026-10-14", "2026-10-15", "2026-10-16"])
+
+    def test_old_cache_refetches_and_failed_fetch_drops_label(self):
+        cached = {label: {"2026-04-01": 1.0} for label in brief.CORRELATION_SYMBOLS}
+
+        def closes(symbol, range_="6mo"):
+            self.assertEqual(range_, "6mo")
+            return {} if symbol == brief.CORRELATION_SYMBOLS["MSTR"] else {"2026-10-16": 4.0}
+
+        with mock.patch.object(brief, "fetch_yahoo_closes", closes):
+            out = brief.fetch_risk_closes(cached, today=date(2026, 10, 18))
+        self.assertEqual(out["BTC"], {"2026-10-16": 4.0})
+        self.assertEqual(out["MSTR"], {})
+        self.assertIsNone(brief.build_risk_engine(out))
+
+    def test_cache_is_fresh_for_the_utc_day_it_was_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "risk_inputs.json"
+            path.write_text(json.dumps({"date": "2026-10-18", "closes": {}, "fear_greed": 40.0}))
+            with mock.patch.object(brief, "RISK_INPUTS_PATH", path):
+                self.assertTrue(brief.load_risk_inputs(datetime(2026, 10, 18, 23, 0, tzinfo=timezone.utc))[1])
+                self.assertFalse(brief.load_risk_inputs(datetime(2026, 10, 19, 0, 27, tzinfo=timezone.utc))[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
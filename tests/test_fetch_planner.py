@@ -0,0 +1,55 @@
+import pathlib
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+import fetch_planner  # noqa: E402
+from fetch_planner import ET, FetchPlanner  # noqa: E402
+
+
+class FredDueTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.plan = pathlib.Path(tmp.name) / "fetch_plan.json"
+
+    def due_hours(self, series_id, last_date, start, hours):
+        """ET times (hourly from `start`) at which fred_due fires, marking each as fetched like a run would."""
+        fired = []
+        for h in range(hours):
+            now = start + timedelta(hours=h)
+            planner = FetchPlanner(self.plan, now=now)
+            if planner.fred_due("fred:x", series_id, last_date):
+                fired.append(now)
+                planner.mark_fetched("fred:x")
+                planner.flush()
+        return fired
+
+    def test_thursday_sofr_waits_for_monday_morning(self):
+        # Thursday 2026-10-15's SOFR is in; Friday's is published Monday 08:00 ET, not Saturday.
+        fired = self.due_hours("SOFR", "2026-10-15", datetime(2026, 10, 16, 9, tzinfo=ET), 72)
+        self.assertEqual(fired[0], datetime(2026, 10, 19, 8, tzinfo=ET))
+
+    def test_friday_sofr_is_not_retried_over_the_weekend(self):
+        fired = self.due_hours("SOFR", "2026-10-16", datetime(2026, 10, 16, 9, tzinfo=ET), 24 * 4)
+        self.assertEqual(fired[0], datetime(2026, 10, 20, 8, tzinfo=ET))
+
+    def test_fed_holiday_is_skipped(self):
+        # Columbus Day 2026-10-12 has no observation: Friday 10-09's successor is Tuesday 10-13,
+        # published Wednesday.
+        self.assertEqual(fetch_planner.next_business_day(date(2026, 10, 9), fetch_planner.FED_HOLIDAYS), date(2026, 10, 13))
+        planner = FetchPlanner(self.plan, now=datetime(2026, 10, 13, 12, tzinfo=ET))
+        self.assertFalse(planner.fred_due("fred:x", "SOFR", "2026-10-09"))
+        planner = FetchPlanner(self.plan, now=datetime(2026, 10, 14, 8, tzinfo=ET))
+        self.assertTrue(planner.fred_due("fred:x", "SOFR", "2026-10-09"))
+
+    def test_weekly_release_moves_past_thursday_holiday(self):
+        # Wednesday 2026-11-25's H.4.1 would be Thanksgiving; it comes out Friday.
+        self.assertEqual(fetch_planner.fred_publication_date(date(2026, 11, 25), 1), date(2026, 11, 27))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import pathlib
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+from fetch_stage import log_timings, run_hedged  # noqa: E402
+
+
+def _source(value=None, delay=0.0, error=None, calls=None):
+    def fetch():
+        if calls is not None:
+            calls.set()
+        time.sleep(delay)
+        if error:
+            raise OSError(error)
+        return value
+    return fetch
+
+
+class RunHedgedTest(unittest.TestCase):
+    def test_fast_primary_never_starts_fallback(self):
+        fallback_called = threading.Event()
+        results = run_hedged(
+            "primary",
+            "fallback",
+            {
+                "primary": (_source("p"), 2.0, None),
+                "fallback": (_source("f", calls=fallback_called), 2.0, None),
+            },
+            hedge_after_sec=0.5,
+            deadline_sec=2.0,
+        )
+        self.assertTrue(results["primary"].ok)
+        self.assertEqual(results["primary"].value, "p")
+        self.assertFalse(results["fallback"].ok)
+        self.assertTrue(results["fallback"].skipped)
+        self.assertIsNone(results["fallback"].error)
+        time.sleep(0.05)
+        self.assertFalse(fallback_called.is_set())
+
+    def test_primary_win_logs_fallback_as_skipped(self):
+        results = run_hedged(
+            "primary",
+            "fallback",
+            {"primary": (_source("p"), 2.0, None), "fallback": (_source("f"), 2.0, None)},
+            hedge_after_sec=0.5,
+            deadline_sec=2.0,
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            log_timings(results)
+        self.assertIn("fetch: fallback 0ms skipped", out.getvalue())
+        self.assertNotIn("failed", out.getvalue())
+
+    def test_slow_primary_is_hedged(self):
+        results = run_hedged(
+            "primary",
+            "fallback",
+            {
+                "primary": (_source("p", delay=1.0), 2.0, None),
+                "fallback": (_source("f"), 2.0, None),
+            },
+            hedge_after_sec=0.05,
+            deadline_sec=2.0,
+        )
+        self.assertTrue(results["fallback"].ok)
+        self.assertEqual(results["fallback"].value, "f")
+        self.assertFalse(results["primary"].ok)
+        self.assertEqual(results["primary"].error, "abandoned")
+        self.assertFalse(results["primary"].skipped)
+
+    def test_failed_primary_starts_fallback_before_hedge_delay(self):
+        t0 = time.monotonic()
+        results = run_hedged(
+            "primary",
+            "fallback",
+            {
+                "primary": (_source(error="boom"), 2.0, None),
+                "fallback": (_source("f"), 2.0, None),
+            },
+            hedge_after_sec=1.0,
+            deadline_sec=2.0,
+        )
+        self.assertLess(time.monotonic() - t0, 0.5)
+        self.assertEqual(results["primary"].error, "boom")
+        self.assertTrue(results["fallback"].ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import asyncio
+import pathlib
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+import read_api  # noqa: E402
+
+
+class BadRequestTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(read_api.ReadApi().handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def send(self, request: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(request)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return data
+
+    async def test_malformed_content_length(self):
+        for value in (b"abc", b"-5"):
+            with self.subTest(value=value):
+                data = await self.send(b"GET /health HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+                self.assertTrue(data.startswith(b"HTTP/1.1 400 Bad Request\r\n"))
+
+    async def test_valid_request_still_served(self):
+        data = await self.send(b"GET /health HTTP/1.1\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        self.assertTrue(data.startswith(b"HTTP/1.1 200 OK\r\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -210,15 +210,17 @@ async function handleCryptoPrices(url) {
     return json({ as_of: new Date().toISOString(), prices: {}, sources: ["binance", "bybit", "okx"] });
   }
 
-  const [binanceR, bybitR, okxR] = await Promise.allSettled([
-    fetchBinanceMap(tickers),
-    fetchBybitMap(),
-    fetchOkxMap(),
-  ]);
-
-  const binance = binanceR.status === "fulfilled" ? binanceR.value : new Map();
-  const bybit = bybitR.status === "fulfilled" ? bybitR.value : new Map();
-  const okx = okxR.status === "fulfilled" ? okxR.value : new Map();
+  // Bybit/OKX only list everything, so fetch them only for tickers the previous venue missed.
+  const settle = async (fn) => {
+    try {
+      return await fn();
+    } catch (_) {
+      return new Map();
+    }
+  };
+  const binance = await settle(() => fetchBinanceMap(tickers));
+  const bybit = tickers.some((t) => !binance.has(t)) ? await settle(fetchBybitMap) : new Map();
+  const okx = tickers.some((t) => !binance.has(t) && !bybit.has(t)) ? await settle(fetchOkxMap) : new Map();
 
   const prices = {};
   for (const t of tickers) {